@@ -7,22 +7,61 @@ import joblib
 import numpy as np
 from sklearn.ensemble import GradientBoostingRegressor
 
+from aether.ml.compiled import flatten_ensemble, load_compiled, save_compiled
+from aether.ml.features import METHOD_CODES, segment_features
+from aether.sense.engine import load_environment
 
-def load_dataset(path: Path) -> tuple[np.ndarray, np.ndarray]:
+
+def load_dataset(
+    path: Path,
+    feature_set: str = "basic",
+    environment: str = "default",
+    profile_dir: Path | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Load ``features``/``distance`` records.
+
+    Records carrying raw ``samples`` (``{"method", "value", "metadata"}`` dicts) get
+    their features computed by :mod:`aether.ml.features`, the same code inference uses,
+    with the path-loss model of ``environment``; serve the model with the same
+    ``MLConfig.environment``.
+    """
     records = json.loads(path.read_text())
-    X = []
-    y = []
-    for record in records:
-        X.append(record["features"])
-        y.append(record["distance"])
-    return np.array(X), np.array(y)
+    y = np.array([record["distance"] for record in records], dtype=float)
+    if not records or "samples" not in records[0]:
+        return np.array([record["features"] for record in records]), y
+    samples = [sample for record in records for sample in record["samples"]]
+    lengths = np.array([len(record["samples"]) for record in records], dtype=np.int64)
+    values = np.array([sample["value"] for sample in samples], dtype=float)
+    methods = np.array([METHOD_CODES.get(sample.get("method"), -1) for sample in samples], dtype=np.int8)
+    subcarriers = np.array(
+        [sample.get("metadata", {}).get("subcarrier", -1) for sample in samples], dtype=np.int64
+    )
+    preset = load_environment(environment, profile_dir)
+    return segment_features(values, lengths, methods, subcarriers, feature_set, preset), y
+
+
+def export_compiled(model: GradientBoostingRegressor, path: Path, X: np.ndarray) -> None:
+    """Write the ensemble as memory-mappable node arrays and check it against scikit-learn."""
+    save_compiled(path, flatten_ensemble(model))
+    compiled = load_compiled(path)
+    if not np.allclose(compiled.predict(X), model.predict(X), rtol=1e-9, atol=1e-9):
+        raise RuntimeError(f"Compiled model {path} does not match scikit-learn predictions")
 
 
-def train(input_path: str, output_path: str) -> None:
-    X, y = load_dataset(Path(input_path))
+def train(
+    input_path: str,
+    output_path: str,
+    compiled_path: str | None = None,
+    feature_set: str = "basic",
+    environment: str = "default",
+    profile_dir: str | None = None,
+) -> None:
+    X, y = load_dataset(Path(input_path), feature_set, environment, Path(profile_dir) if profile_dir else None)
     model = GradientBoostingRegressor()
     model.fit(X, y)
     joblib.dump(model, output_path)
+    if compiled_path:
+        export_compiled(model, Path(compiled_path), X)
 
 
 if __name__ == "__main__":
@@ -31,6 +70,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--input", required=True)
     parser.add_argument("--output", required=True)
+    parser.add_argument("--compiled-output", help="Also export an .npz for scikit-learn-free inference")
+    parser.add_argument("--feature-set", choices=["basic", "extended"], default="basic")
+    parser.add_argument("--environment", default="default", help="Calibration profile for RSSI-derived features")
+    parser.add_argument("--profile-dir", help="Directory of calibration profiles")
     args = parser.parse_args()
-    train(args.input, args.output)
+    train(args.input, args.output, args.compiled_output, args.feature_set, args.environment, args.profile_dir)
 
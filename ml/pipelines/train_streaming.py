@@ -0,0 +1,211 @@
+"""Out-of-core training from the stores written by ``aether.sense``.
+
+Training data is what a validation run with an archive leaves behind: raw samples in
+the :class:`~aether.sense.storage.SampleArchiveWriter` Parquet archive, each tagged
+with the ``estimate_id`` of its range estimate, and the estimate's tape-measure
+``reference`` in the ``validation_results`` table of the run's DuckDB database. Samples
+are joined to their label in DuckDB and streamed in Arrow record batches ordered by a
+hash of the estimate id. Features are computed per batch with
+:mod:`aether.ml.features`, the same code ``MLRangeRefiner`` uses, and the model only
+ever sees one batch (or a bounded reservoir) at a time.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import duckdb
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import SGDRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from aether.ml.features import FEATURE_SETS, METHOD_CODES, segment_features
+
+
+@dataclass
+class StreamConfig:
+    source: str  # sample archive directory, Parquet file or glob
+    labels: str  # DuckDB database holding validation_results
+    feature_set: str = "basic"
+    batch_rows: int = 500_000
+    model: str = "sgd"
+    epochs: int = 3
+    max_rows: int = 200_000
+    folds: int = 5
+    n_jobs: int = -1
+    memory_limit: str = "1GB"
+    seed: int = 0
+
+
+def _connect(config: StreamConfig) -> duckdb.DuckDBPyConnection:
+    return duckdb.connect(
+        config.labels,
+        read_only=True,
+        config={"memory_limit": config.memory_limit, "threads": 1},
+    )
+
+
+def _pattern(source: str) -> str:
+    path = Path(source)
+    return str(path / "**" / "*.parquet") if path.is_dir() else source
+
+
+def stream_batches(
+    config: StreamConfig,
+    fold: Optional[int] = None,
+    holdout: bool = False,
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Yield ``(X, y)`` feature batches, optionally restricted to one CV fold.
+
+    Only samples of successful validation results with a reference distance are
+    used. ``fold`` selects estimates whose id hashes into that fold; ``holdout``
+    chooses between the fold itself and its complement. Rows arrive grouped by
+    estimate, and a group cut by a batch boundary is carried over to the next batch.
+    """
+    connection = _connect(config)
+    codes = " ".join("WHEN ? THEN ?" for _ in METHOD_CODES)
+    params: list[object] = [item for pair in METHOD_CODES.items() for item in pair]
+    params.append(_pattern(config.source))
+    where = ""
+    if fold is not None:
+        where = f"AND hash(s.estimate_id) % ? {'=' if holdout else '<>'} ?"
+        params += [config.folds, fold]
+    query = f"""
+        SELECT hash(s.estimate_id) AS group_key,
+               s.value AS value,
+               r.reference AS label,
+               CAST(COALESCE(CASE s.method {codes} END, -1) AS TINYINT) AS method,
+               CAST(COALESCE(map_extract(s.metadata, 'subcarrier')[1], -1) AS BIGINT) AS subcarrier
+        FROM read_parquet(?, hive_partitioning = true, union_by_name = true) AS s
+        JOIN validation_results AS r ON r.estimate_id = s.estimate_id
+        WHERE r.reference IS NOT NULL AND r.error IS NULL {where}
+        ORDER BY group_key
+    """
+    reader = connection.execute(query, params).to_arrow_reader(config.batch_rows)
+    carry = [np.empty(0, dtype=dtype) for dtype in (np.uint64, float, float, np.int8, np.int64)]
+    try:
+        for batch in reader:
+            columns = [
+                np.concatenate([kept, batch.column(i).to_numpy(zero_copy_only=False)])
+                for i, kept in enumerate(carry)
+            ]
+            keys = columns[0]
+            boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+            if boundaries.size == 0:
+                carry = columns
+                continue
+            cut = boundaries[-1]
+            carry = [column[cut:] for column in columns]
+            yield _features(config, [column[:cut] for column in columns], boundaries[:-1])
+        if carry[0].size:
+            yield _features(config, carry, np.flatnonzero(carry[0][1:] != carry[0][:-1]) + 1)
+    finally:
+        connection.close()
+
+
+def _features(config: StreamConfig, columns: list[np.ndarray], boundaries: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    _, values, labels, methods, subcarriers = columns
+    starts = np.concatenate(([0], boundaries))
+    lengths = np.diff(np.concatenate((starts, [values.size])))
+    X = segment_features(values, lengths, methods, subcarriers, config.feature_set)
+    return X, labels[starts]
+
+
+def fit_stream(config: StreamConfig, fold: Optional[int] = None) -> Pipeline | HistGradientBoostingRegressor:
+    if config.model == "sgd":
+        scaler = StandardScaler()
+        for X, _ in stream_batches(config, fold):
+            scaler.partial_fit(X)
+        regressor = SGDRegressor(random_state=config.seed)
+        for _ in range(config.epochs):
+            for X, y in stream_batches(config, fold):
+                regressor.partial_fit(scaler.transform(X), y)
+        return Pipeline([("scale", scaler), ("sgd", regressor)])
+    if config.model == "hist":
+        X, y = _reservoir(config, fold)
+        return HistGradientBoostingRegressor(random_state=config.seed).fit(X, y)
+    raise ValueError(f"Unknown model '{config.model}'")
+
+
+def _reservoir(config: StreamConfig, fold: Optional[int]) -> tuple[np.ndarray, np.ndarray]:
+    """Uniform sample of at most ``max_rows`` estimates, keeping the smallest random keys."""
+    rng = np.random.default_rng(config.seed)
+    keys = np.empty(0)
+    X_keep = np.empty((0, len(FEATURE_SETS[config.feature_set])))
+    y_keep = np.empty(0)
+    for X, y in stream_batches(config, fold):
+        keys = np.concatenate([keys, rng.random(len(y))])
+        X_keep = np.concatenate([X_keep, X])
+        y_keep = np.concatenate([y_keep, y])
+        if keys.size > config.max_rows:
+            keep = np.argpartition(keys, config.max_rows)[: config.max_rows]
+            keys, X_keep, y_keep = keys[keep], X_keep[keep], y_keep[keep]
+    return X_keep, y_keep
+
+
+def evaluate_fold(config: StreamConfig, fold: int) -> dict[str, float]:
+    model = fit_stream(config, fold)
+    count = 0
+    abs_error = 0.0
+    squared_error = 0.0
+    for X, y in stream_batches(config, fold, holdout=True):
+        error = model.predict(X) - y
+        count += error.size
+        abs_error += float(np.abs(error).sum())
+        squared_error += float((error * error).sum())
+    if count == 0:
+        return {"fold": fold, "count": 0, "mae": float("nan"), "rmse": float("nan")}
+    return {"fold": fold, "count": count, "mae": abs_error / count, "rmse": float(np.sqrt(squared_error / count))}
+
+
+def cross_validate(config: StreamConfig) -> list[dict[str, float]]:
+    """Run every fold in its own worker process; each streams its own train/test split."""
+    return Parallel(n_jobs=config.n_jobs)(delayed(evaluate_fold)(config, fold) for fold in range(config.folds))
+
+
+def train(config: StreamConfig, output_path: str) -> None:
+    if config.folds > 1:
+        for result in cross_validate(config):
+            print(f"fold {result['fold']}: n={result['count']} mae={result['mae']:.3f} rmse={result['rmse']:.3f}")
+    model = fit_stream(config)
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, output_path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train a range regressor out of core")
+    parser.add_argument("--source", required=True, help="Sample archive directory, Parquet file or glob")
+    parser.add_argument("--labels", required=True, help="Validation DuckDB database with reference distances")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--model", choices=["sgd", "hist"], default="sgd")
+    parser.add_argument("--batch-rows", type=int, default=500_000)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--max-rows", type=int, default=200_000, help="Reservoir size for --model hist")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--memory-limit", default="1GB", help="DuckDB memory limit per worker")
+    parser.add_argument("--feature-set", choices=["basic", "extended"], default="basic")
+    args = parser.parse_args()
+    train(
+        StreamConfig(
+            source=args.source,
+            labels=args.labels,
+            batch_rows=args.batch_rows,
+            model=args.model,
+            epochs=args.epochs,
+            max_rows=args.max_rows,
+            folds=args.folds,
+            n_jobs=args.n_jobs,
+            memory_limit=args.memory_limit,
+            feature_set=args.feature_set,
+        ),
+        args.output,
+    )
@@ -0,0 +1,45 @@
+"""Measure fleet-simulator throughput: vectorized batches versus per-target calls."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from aether.core.interface import WiFiInterface
+
+
+def timed(label: str, count: int, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<26}: {count / elapsed:>14,.0f} measurements/s")
+    return elapsed
+
+
+def run(devices: int, mobility: str, seed: int) -> None:
+    iface = WiFiInterface.open(f"simulate:fleet?devices={devices}&mobility={mobility}&seed={seed}&realtime=0")
+    targets = list(iface.enumerate_devices())
+    sample = targets[: min(len(targets), 2_000)]
+    print(f"devices={devices} mobility={mobility}")
+    start = time.perf_counter()
+    for _ in range(10):
+        iface.fleet.step(0.1)
+    print(f"  {'mobility step':<26}: {(time.perf_counter() - start) / 10 * 1000:>11.2f} ms/step")
+    timed("rtt, per target", len(sample), lambda: [iface.measure_rtt(t) for t in sample])
+    timed("rtt, batched", len(targets), lambda: iface.measure_rtt_many(targets))
+    timed("rssi, batched", len(targets), lambda: iface.measure_rssi_many(targets))
+    timed("csi frames, batched", len(sample) * 5, lambda: iface.capture_csi_many(sample))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fleet simulator benchmark")
+    parser.add_argument("--devices", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--mobility", choices=["waypoint", "corridor", "static"], default="waypoint")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for count in args.devices:
+        run(count, args.mobility, args.seed)
+
+
+if __name__ == "__main__":
+    main()
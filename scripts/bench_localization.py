@@ -0,0 +1,54 @@
+"""Time anchor-free relative localization on simulated meshes."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from aether.mesh.localization import LocalizerConfig, RelativeLocalizer
+
+
+def run(devices: int, neighbours: float, noise: float, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    spacing = 3.0
+    coords = rng.uniform(0.0, np.sqrt(devices) * spacing, size=(devices, 2))
+    radio_range = spacing * np.sqrt(neighbours / np.pi)
+    pairs = cKDTree(coords).query_pairs(radio_range, output_type="ndarray")
+    distances = np.linalg.norm(coords[pairs[:, 0]] - coords[pairs[:, 1]], axis=1)
+    distances *= 1.0 + rng.normal(0.0, noise, size=distances.size)
+    names = [f"node-{i}" for i in range(devices)]
+    ranges = {(names[a], names[b]): d for (a, b), d in zip(pairs.tolist(), distances.tolist())}
+
+    localizer = RelativeLocalizer(LocalizerConfig(seed=seed))
+    start = time.perf_counter()
+    layout = localizer.localize(names, ranges)
+    elapsed = time.perf_counter() - start
+
+    # The layout is only defined up to rotation and reflection; align before scoring.
+    embedded = layout.positions - layout.positions.mean(axis=0)
+    truth = coords - coords.mean(axis=0)
+    u, _, vt = np.linalg.svd(embedded.T @ truth)
+    error = np.linalg.norm(embedded @ (u @ vt) - truth, axis=1)
+
+    print(f"devices={devices} ranges={len(ranges)} noise={noise:.0%}")
+    print(f"  solve                 : {elapsed:.2f}s, {layout.iterations} iterations, converged={layout.converged}")
+    print(f"  normalized stress     : {layout.stress:.2e}")
+    print(f"  localization error    : median {np.median(error):.2f}m, p90 {np.quantile(error, 0.9):.2f}m")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Relative localization benchmark")
+    parser.add_argument("--devices", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--neighbours", type=float, default=28.0, help="mean ranged neighbours per device")
+    parser.add_argument("--noise", type=float, default=0.02, help="relative range noise (std)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for count in args.devices:
+        run(count, args.neighbours, args.noise, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare per-item, batched and micro-batched ML range refinement."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor
+
+from aether.ml.model import MicroBatchRefiner, MLConfig, MLRangeRefiner
+from aether.sense.models import RangeEstimate, SignalSample
+
+
+def make_estimates(count: int, samples: int, rng: np.random.Generator) -> list[RangeEstimate]:
+    now = datetime.utcnow()
+    estimates = []
+    for _ in range(count):
+        values = rng.normal(-55.0, 3.0, size=samples)
+        raw = [SignalSample(timestamp=now, method="rssi", value=float(v), metadata={}) for v in values]
+        estimates.append(RangeEstimate(timestamp=now, method="rssi", distance=3.0, variance=1.0, raw=raw))
+    return estimates
+
+
+def report(label: str, count: int, elapsed: float, latencies: list[float] | None = None) -> None:
+    line = f"{label:<22} {count / elapsed:>10,.0f} est/s"
+    if latencies:
+        p50, p99 = np.percentile(np.array(latencies) * 1e3, [50, 99])
+        line += f"   latency p50 {p50:.3f} ms  p99 {p99:.3f} ms"
+    else:
+        line += f"   latency {elapsed / count * 1e3:.3f} ms/est"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ML refinement benchmark")
+    parser.add_argument("--estimates", type=int, default=500)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 4))
+    y = X @ np.array([0.5, 0.2, 0.1, 0.3]) + 3.0
+    model = GradientBoostingRegressor(random_state=0).fit(X, y)
+    estimates = make_estimates(args.estimates, args.samples, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "model.joblib"
+        joblib.dump(model, path)
+        refiner = MLRangeRefiner(MLConfig(model_path=path))
+
+    latencies = []
+    start = time.perf_counter()
+    for estimate in estimates:
+        began = time.perf_counter()
+        refiner.refine(estimate)
+        latencies.append(time.perf_counter() - began)
+    report("refine (per item)", len(estimates), time.perf_counter() - start, latencies)
+
+    start = time.perf_counter()
+    refiner.refine_many(estimates)
+    report("refine_many", len(estimates), time.perf_counter() - start)
+
+    def timed(batcher: MicroBatchRefiner, estimate: RangeEstimate) -> float:
+        began = time.perf_counter()
+        batcher.refine(estimate)
+        return time.perf_counter() - began
+
+    with MicroBatchRefiner(refiner, args.max_batch, args.max_delay_ms / 1e3) as batcher:
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            start = time.perf_counter()
+            latencies = list(pool.map(lambda estimate: timed(batcher, estimate), estimates))
+            elapsed = time.perf_counter() - start
+    report(f"micro-batch x{args.threads}", len(estimates), elapsed, latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Throughput of the vectorized particle-filter tracker."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from aether.mesh.tracking import ParticleFilterConfig, ParticleFilterTracker
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Particle filter benchmark")
+    parser.add_argument("--tracks", type=int, default=1000)
+    parser.add_argument("--particles", type=int, default=1000)
+    parser.add_argument("--anchors", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    anchors = rng.uniform(0.0, 20.0, size=(args.anchors, 3))
+    anchors[:, 2] = 2.5
+    truth = rng.uniform(0.0, 20.0, size=(args.tracks, 3))
+    truth[:, 2] = 1.0
+    config = ParticleFilterConfig(
+        particles=args.particles,
+        bounds=((0.0, 0.0, 0.0), (20.0, 20.0, 3.0)),
+        seed=args.seed,
+    )
+    tracker = ParticleFilterTracker(anchors, args.tracks, config)
+
+    def observe() -> np.ndarray:
+        ranges = np.linalg.norm(truth[:, None, :] - anchors[None, :, :], axis=2)
+        ranges += rng.normal(0.0, 0.3, size=ranges.shape)
+        spikes = rng.random(ranges.shape) < 0.05
+        ranges[spikes] += rng.uniform(2.0, 10.0, size=spikes.sum())
+        return ranges
+
+    tracker.step(observe(), dt=0.5)
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        truth[:, :2] = np.clip(truth[:, :2] + rng.normal(0.0, 0.2, size=(args.tracks, 2)), 0.0, 20.0)
+        estimate = tracker.step(observe(), dt=0.5)
+    elapsed = time.perf_counter() - start
+
+    error = np.linalg.norm(estimate[:, :2] - truth[:, :2], axis=1)
+    steps_per_sec = args.steps / elapsed
+    print(f"tracks={args.tracks} particles={args.particles} anchors={args.anchors}")
+    print(f"  {steps_per_sec:.1f} steps/sec, {steps_per_sec * args.tracks:,.0f} track updates/sec")
+    print(f"  horizontal error: median {np.median(error):.2f}m, p90 {np.quantile(error, 0.9):.2f}m")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare rollup-backed range statistics queries against raw scans of ``range_estimates``."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import duckdb
+
+from aether.sense.storage import ensure_rollups, query_range_stats, update_rollups
+
+START = datetime(2024, 1, 1)
+
+
+def populate(connection: duckdb.DuckDBPyConnection, rows: int, targets: int, days: int) -> None:
+    ensure_rollups(connection)
+    step = days * 86_400 / rows
+    connection.execute(
+        f"""
+        INSERT INTO range_estimates
+        SELECT TIMESTAMP '{START.isoformat()}' + to_microseconds(CAST(i * {step * 1e6} AS BIGINT)),
+               'rtt', 1.0 + (hash(i) % 2000) / 100.0, 0.1, 'device-' || (i % {targets})
+        FROM range({rows}) t(i)
+        """
+    )
+
+
+def raw_query(connection: duckdb.DuckDBPyConnection, start: datetime, end: datetime) -> int:
+    return len(
+        connection.execute(
+            """
+            SELECT time_bucket(INTERVAL 60 SECOND, timestamp), target, count(*), avg(distance), var_pop(distance)
+            FROM range_estimates WHERE timestamp >= ? AND timestamp < ?
+            GROUP BY ALL
+            """,
+            [start, end],
+        ).fetchall()
+    )
+
+
+def timed(label: str, fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<28}: {best * 1000:9.1f} ms  ({result} rows)")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rollup query benchmark")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--targets", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database", help="DuckDB file to use (default: a temporary file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection = duckdb.connect(args.database or str(Path(tmp) / "rollups.duckdb"))
+        start = time.perf_counter()
+        populate(connection, args.rows, args.targets, args.days)
+        print(f"populated {args.rows:,} rows in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        folded = update_rollups(connection)
+        print(f"rolled up {folded:,} rows in {time.perf_counter() - start:.1f}s")
+
+        end = START + timedelta(days=args.days)
+        week = end - timedelta(days=7)
+        print("per-target stats, last 7 days")
+        raw = timed("raw scan, per minute", lambda: raw_query(connection, week, end), args.repeat)
+        minute = timed(
+            "minute rollup, per minute",
+            lambda: query_range_stats(connection, week, end, timedelta(minutes=1)).num_rows,
+            args.repeat,
+        )
+        hour = timed(
+            "hour rollup, per hour",
+            lambda: query_range_stats(connection, week, end, timedelta(hours=1)).num_rows,
+            args.repeat,
+        )
+        print(f"  speedup: minute {raw / minute:.1f}x, hour {raw / hour:.1f}x")
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare per-row ``register_estimate`` inserts with the buffered ``EstimateWriter``."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import duckdb
+import numpy as np
+
+from aether.sense.models import RangeEstimate
+from aether.sense.storage import EstimateWriter, register_estimate
+
+
+def make_estimates(count: int, seed: int) -> list[RangeEstimate]:
+    rng = np.random.default_rng(seed)
+    start = datetime.utcnow()
+    distances = rng.uniform(0.5, 20.0, count)
+    return [
+        RangeEstimate(
+            timestamp=start + timedelta(milliseconds=i),
+            method="rtt",
+            distance=float(distance),
+            variance=0.1,
+            raw=[],
+        )
+        for i, distance in enumerate(distances)
+    ]
+
+
+def bench_per_row(path: Path, estimates: list[RangeEstimate]) -> float:
+    connection = duckdb.connect(str(path))
+    start = time.perf_counter()
+    for estimate in estimates:
+        register_estimate(connection, estimate, target="192.168.1.10")
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return len(estimates) / elapsed
+
+
+def bench_writer(path: Path, estimates: list[RangeEstimate], batch_size: int) -> float:
+    connection = duckdb.connect(str(path))
+    start = time.perf_counter()
+    with EstimateWriter(connection, batch_size=batch_size) as writer:
+        for estimate in estimates:
+            writer.write(estimate, target="192.168.1.10")
+    elapsed = time.perf_counter() - start
+    rows = connection.execute("SELECT COUNT(*) FROM range_estimates").fetchone()[0]
+    assert rows == len(estimates), rows
+    connection.close()
+    return len(estimates) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Range-estimate storage benchmark")
+    parser.add_argument("--per-row", type=int, default=2_000, help="Rows inserted with register_estimate")
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows written through EstimateWriter")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        per_row = bench_per_row(Path(tmp) / "per_row.duckdb", make_estimates(args.per_row, args.seed))
+        buffered = bench_writer(Path(tmp) / "buffered.duckdb", make_estimates(args.rows, args.seed), args.batch_size)
+    print(f"register_estimate : {per_row:>12,.0f} rows/s ({args.per_row} rows)")
+    print(f"EstimateWriter    : {buffered:>12,.0f} rows/s ({args.rows} rows, batch {args.batch_size})")
+    print(f"speedup           : {buffered / per_row:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
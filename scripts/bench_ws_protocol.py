@@ -0,0 +1,80 @@
+"""Compare /ws/scan protocol encodings: bytes/sec and server CPU per client."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aether.core.simulated import FleetConfig, FleetSimulation  # noqa: E402
+from services.api.protocol import make_encoder  # noqa: E402
+
+ENCODINGS = {
+    "v1 json (per device)": {"protocol": 1},
+    "v2 json (deltas)": {"protocol": 2, "encoding": "json"},
+    "v2 binary (deltas)": {"protocol": 2, "encoding": "binary"},
+}
+
+
+def make_cycles(devices: int, cycles: int, interval: float, mobility: str, noise: float, seed: int) -> list[dict]:
+    fleet = FleetSimulation(FleetConfig(devices=devices, mobility=mobility, realtime=False, seed=seed))
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    out = []
+    for i in range(cycles):
+        fleet.step(interval)
+        distance = np.linalg.norm(fleet.positions() - fleet.origin, axis=1) + rng.normal(0.0, noise, devices)
+        out.append(
+            {
+                "timestamp": (start + timedelta(seconds=i * interval)).isoformat(),
+                "devices": [
+                    {"ip": ip, "distance": float(d), "method": "rtt"} for ip, d in zip(fleet.ids, distance.tolist())
+                ],
+            }
+        )
+    return out
+
+
+def measure(config: dict, cycles: list[dict], interval: float) -> tuple[float, float, int]:
+    encoder = make_encoder(config)
+    total = 0
+    frames = 0
+    start = time.process_time()
+    for cycle in cycles:
+        for frame in encoder.encode(cycle):
+            # The server serializes JSON frames once per client in send_json.
+            payload = frame if isinstance(frame, bytes) else json.dumps(frame, separators=(",", ":")).encode()
+            total += len(payload)
+            frames += 1
+    cpu = time.process_time() - start
+    duration = len(cycles) * interval
+    return total / duration, cpu / len(cycles) * 1000, frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="WebSocket scan protocol benchmark")
+    parser.add_argument("--devices", type=int, default=500)
+    parser.add_argument("--cycles", type=int, default=60)
+    parser.add_argument("--interval", type=float, default=2.0)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--noise", type=float, default=0.05, help="Range noise (m) added per cycle")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for mobility in ("static", "corridor"):
+        cycles = make_cycles(args.devices, args.cycles, args.interval, mobility, args.noise, args.seed)
+        print(f"{args.devices} devices, {mobility} fleet, {args.cycles} cycles every {args.interval:.0f}s")
+        for label, config in ENCODINGS.items():
+            rate, cpu, frames = measure(dict(config, threshold=args.threshold), cycles, args.interval)
+            print(f"  {label:<22}: {rate / 1024:>9.1f} KiB/s  {cpu:>7.2f} ms CPU/cycle  {frames:>6} frames")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,8 @@ from pathlib import Path
 import duckdb
 
 from aether.api import Aether
-from aether.sense.storage import register_estimate
+from aether.sense.storage import SampleArchiveWriter
+from aether.sense.validation import ValidationConfig, ValidationRunner, format_report, load_targets, validation_report
 
 
 def main() -> None:
@@ -15,23 +16,39 @@ def main() -> None:
     parser.add_argument("--interface", required=True)
     parser.add_argument("--targets", required=True, help="JSON file with target list")
     parser.add_argument("--database", default="data/validation/runs.duckdb")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--report", type=Path, help="Also write the report as JSON to this path")
+    parser.add_argument("--archive", type=Path, help="Also archive each estimate's raw samples under this directory")
     args = parser.parse_args()
 
-    targets = json.loads(Path(args.targets).read_text())
+    targets = load_targets(Path(args.targets))
     client = Aether(interface=args.interface)
 
     db_path = Path(args.database)
     db_path.parent.mkdir(parents=True, exist_ok=True)
     conn = duckdb.connect(str(db_path))
 
-    for target in targets:
-        estimate = client.range(target["ip"], method=target.get("method", "auto"))
-        register_estimate(conn, estimate)
-
-    client.close()
+    archive = SampleArchiveWriter(args.archive, args.interface) if args.archive is not None else None
+    runner = ValidationRunner(
+        conn,
+        client.range,
+        ValidationConfig(repetitions=args.repetitions, workers=args.workers),
+        archive=archive,
+    )
+    try:
+        run_id = runner.run(targets, interface=args.interface)
+    finally:
+        client.close()
+        if archive is not None:
+            archive.close()
+    report = validation_report(conn, run_id)
+    print(f"run {run_id}: {len(targets)} targets x {args.repetitions} repetitions")
+    print(format_report(report))
+    if args.report is not None:
+        args.report.write_text(json.dumps({"run_id": run_id, "groups": report.to_pylist()}, indent=2))
     conn.close()
 
 
 if __name__ == "__main__":
     main()
-
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+from concurrent.futures import Executor
 from contextlib import AbstractContextManager
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Any, Iterable, Optional
 
 from .core.interface import WiFiInterface
@@ -26,7 +27,10 @@ class Aether:
         interface: str,
         collector_config: Optional[CollectorConfig] = None,
         csi_backend: Optional[str] = None,
+        environment: Optional[str] = None,
     ) -> None:
+        if environment is not None:
+            collector_config = replace(collector_config or CollectorConfig(), environment=environment)
         self._iface = WiFiInterface.open(interface, csi_backend=csi_backend)
         self._collector = SignalCollector(self._iface, collector_config)
 
@@ -34,11 +38,15 @@ class Aether:
         """Estimate distance to ``target`` using chosen method."""
         return self._collector.estimate_range(target, method=method)
 
-    def scan(self) -> Iterable[DeviceRecord]:
-        """Discover reachable devices and provide coarse range estimates."""
-        for record in self._collector.enumerate_devices():
+    def scan(self, executor: Optional[Executor] = None) -> Iterable[DeviceRecord]:
+        """Discover reachable devices and provide coarse range estimates.
+
+        Targets are ranged one after another, or concurrently on ``executor``.
+        """
+        for record in self._collector.enumerate_devices(executor):
             metadata = dict(record.metadata)
             metadata["method"] = record.estimate.method
+            metadata["variance"] = record.estimate.variance
             yield DeviceRecord(
                 ip=record.ip,
                 distance=record.estimate.distance,
@@ -58,8 +66,14 @@ class AetherSession(AbstractContextManager["AetherSession"]):
         interface: str,
         collector_config: Optional[CollectorConfig] = None,
         csi_backend: Optional[str] = None,
+        environment: Optional[str] = None,
     ) -> None:
-        self._aether = Aether(interface=interface, collector_config=collector_config, csi_backend=csi_backend)
+        self._aether = Aether(
+            interface=interface,
+            collector_config=collector_config,
+            csi_backend=csi_backend,
+            environment=environment,
+        )
 
     def __enter__(self) -> "AetherSession":
         return self
@@ -75,8 +89,8 @@ class AetherSession(AbstractContextManager["AetherSession"]):
     def range(self, target: str, method: str = "auto") -> RangeEstimate:
         return self._aether.range(target, method=method)
 
-    def scan(self) -> Iterable[DeviceRecord]:
-        return self._aether.scan()
+    def scan(self, executor: Optional[Executor] = None) -> Iterable[DeviceRecord]:
+        return self._aether.scan(executor)
 
     def close(self) -> None:
         self._aether.close()
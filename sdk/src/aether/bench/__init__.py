@@ -0,0 +1,21 @@
+"""Performance benchmarks for the ranging pipeline with stored history."""
+
+from .cases import CASES
+from .runner import BenchConfig, BenchResult, Case, run_case, run_suite, select_cases
+from .store import Comparison, RunInfo, collect_run_info, compare, load_baseline, record_run
+
+__all__ = [
+    "CASES",
+    "BenchConfig",
+    "BenchResult",
+    "Case",
+    "run_case",
+    "run_suite",
+    "select_cases",
+    "Comparison",
+    "RunInfo",
+    "collect_run_info",
+    "compare",
+    "load_baseline",
+    "record_run",
+]
@@ -0,0 +1,189 @@
+"""Benchmark cases covering the ranging pipeline.
+
+Every case builds a deterministic workload from the seed, so runs on the same
+machine and revision are comparable.
+"""
+
+from __future__ import annotations
+
+import struct
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from .runner import Case
+
+CSI_FRAMES = 256
+FUSION_INPUTS = 3
+TRACKS = 100
+PARTICLES = 500
+REFINE_BATCH = 256
+STORAGE_ROWS = 5_000
+EXPORT_FEATURES = 10_000
+
+
+def _csi_parse(seed: int) -> Callable[[], object]:
+    from ..core.csi import parse_csi_frame
+
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(CSI_FRAMES, 60)).astype("<f4")
+    frames = [struct.pack("<60f", *row) for row in values.tolist()]
+
+    def run() -> object:
+        return [parse_csi_frame(frame) for frame in frames]
+
+    return run
+
+
+def _collector(method: str) -> Callable[[int], Callable[[], object]]:
+    def setup(seed: int) -> Callable[[], object]:
+        from ..core.simulated import SimulatedWiFiInterface
+        from ..sense.collectors import SignalCollector
+
+        collector = SignalCollector(SimulatedWiFiInterface("simulate", seed=seed))
+
+        def run() -> object:
+            return collector.estimate_range("192.168.1.11", method=method)
+
+        return run
+
+    return setup
+
+
+def _estimates(rng: np.random.Generator, count: int, samples: int = 5) -> list:
+    from ..sense.models import RangeEstimate, SignalSample
+
+    start = datetime(2024, 5, 1)
+    rssi = rng.normal(-55.0, 3.0, size=(count, samples))
+    estimates = []
+    for row, values in enumerate(rssi.tolist()):
+        stamp = start + timedelta(seconds=row)
+        raw = [SignalSample(stamp, "rssi", value, {}) for value in values]
+        distance = 10 ** ((-40.0 - float(np.mean(values))) / 22.0)
+        estimates.append(RangeEstimate(stamp, "rssi", distance, float(np.var(values)), raw))
+    return estimates
+
+
+def _fusion(seed: int) -> Callable[[], object]:
+    from ..sense.engine import RangingEngine
+
+    engine = RangingEngine()
+    estimates = _estimates(np.random.default_rng(seed), FUSION_INPUTS)
+
+    def run() -> object:
+        return engine.fuse(estimates)
+
+    return run
+
+
+def _trilateration(seed: int) -> Callable[[], object]:
+    from ..mesh.trilateration import Anchor, trilaterate
+    from ..sense.models import RangeEstimate
+
+    rng = np.random.default_rng(seed)
+    anchors = [Anchor(f"a{i}", tuple(rng.uniform(0.0, 20.0, size=3).tolist())) for i in range(4)]
+    point = rng.uniform(0.0, 20.0, size=3)
+    now = datetime(2024, 5, 1)
+    ranges = {
+        anchor.device_id: RangeEstimate(now, "rtt", float(np.linalg.norm(point - anchor.position)), 0.1, [])
+        for anchor in anchors
+    }
+
+    def run() -> object:
+        return trilaterate(anchors, ranges)
+
+    return run
+
+
+def _tracking(seed: int) -> Callable[[], object]:
+    from ..mesh.tracking import ParticleFilterConfig, ParticleFilterTracker
+
+    rng = np.random.default_rng(seed)
+    anchors = rng.uniform(0.0, 20.0, size=(4, 3))
+    truth = rng.uniform(0.0, 20.0, size=(TRACKS, 3))
+    config = ParticleFilterConfig(particles=PARTICLES, bounds=((0.0, 0.0, 0.0), (20.0, 20.0, 3.0)), seed=seed)
+    tracker = ParticleFilterTracker(anchors, TRACKS, config)
+    ranges = np.linalg.norm(truth[:, None, :] - anchors[None, :, :], axis=2)
+    ranges += rng.normal(0.0, 0.3, size=ranges.shape)
+
+    def run() -> object:
+        return tracker.step(ranges, dt=0.5)
+
+    return run
+
+
+def _ml_refine(seed: int) -> Callable[[], object]:
+    from sklearn.ensemble import GradientBoostingRegressor
+
+    from ..ml.compiled import flatten_ensemble, save_compiled
+    from ..ml.features import extract_features
+    from ..ml.model import MLConfig, MLRangeRefiner
+
+    rng = np.random.default_rng(seed)
+    training = _estimates(rng, 500)
+    model = GradientBoostingRegressor(n_estimators=100, max_depth=3, random_state=seed).fit(
+        extract_features(training), [estimate.distance for estimate in training]
+    )
+    # The compiled model is memory-mapped, so its directory lives as long as the case.
+    directory = tempfile.TemporaryDirectory()
+    path = Path(directory.name) / "range_gbm.npz"
+    save_compiled(path, flatten_ensemble(model))
+    refiner = MLRangeRefiner(MLConfig(model_path=path))
+    batch = _estimates(rng, REFINE_BATCH)
+
+    def run(_directory: tempfile.TemporaryDirectory = directory) -> object:
+        return refiner.refine_many(batch)
+
+    return run
+
+
+def _storage(seed: int) -> Callable[[], object]:
+    import duckdb
+
+    from ..sense.storage import EstimateWriter
+
+    estimates = _estimates(np.random.default_rng(seed), STORAGE_ROWS, samples=1)
+    targets = [f"10.0.{index // 256}.{index % 256}" for index in range(STORAGE_ROWS)]
+    connection = duckdb.connect()
+    writer = EstimateWriter(connection, batch_size=STORAGE_ROWS * 2, background=False)
+
+    def run() -> object:
+        # Start every call from an empty table so later iterations don't time
+        # appends into an ever larger one; the delete costs about a tenth of the flush.
+        connection.execute("DELETE FROM range_estimates")
+        writer.write_many(estimates, targets)
+        return writer.flush()
+
+    return run
+
+
+def _geojson_export(seed: int) -> Callable[[], object]:
+    from ..viz.export import GeoJSONWriter
+
+    positions = np.random.default_rng(seed).uniform(0.0, 20.0, size=(EXPORT_FEATURES, 3))
+    device_ids = [f"track-{index}" for index in range(EXPORT_FEATURES)]
+    directory = tempfile.TemporaryDirectory()
+    path = Path(directory.name) / "tracks.ndjson"
+
+    def run(_directory: tempfile.TemporaryDirectory = directory) -> object:
+        with GeoJSONWriter(path, format="ndjson") as writer:
+            return writer.write_array(device_ids, positions)
+
+    return run
+
+
+CASES: list[Case] = [
+    Case("csi.parse", _csi_parse, items=CSI_FRAMES, unit="frames"),
+    Case("collector.rssi", _collector("rssi"), unit="estimates"),
+    Case("collector.rtt", _collector("rtt"), unit="estimates"),
+    Case("collector.csi", _collector("csi"), unit="estimates"),
+    Case("engine.fuse", _fusion, unit="fusions"),
+    Case("mesh.trilaterate", _trilateration, unit="solves"),
+    Case("mesh.track", _tracking, items=TRACKS, unit="track updates"),
+    Case("ml.refine", _ml_refine, items=REFINE_BATCH, unit="estimates"),
+    Case("storage.write", _storage, items=STORAGE_ROWS, unit="rows"),
+    Case("viz.geojson", _geojson_export, items=EXPORT_FEATURES, unit="features"),
+]
@@ -0,0 +1,99 @@
+"""Timing loop shared by the benchmark cases."""
+
+from __future__ import annotations
+
+import fnmatch
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+
+@dataclass
+class BenchConfig:
+    warmup: int = 3
+    min_iterations: int = 10
+    max_iterations: int = 10_000
+    min_time: float = 1.0  # seconds of timed calls per case
+    seed: int = 0
+
+
+@dataclass
+class Case:
+    """A named benchmark.
+
+    ``setup(seed)`` builds the workload once and returns the callable that is timed.
+    Each call processes ``items`` items (frames, estimates, tracks, rows, ...), which
+    turns call latency into throughput.
+    """
+
+    name: str
+    setup: Callable[[int], Callable[[], object]]
+    items: int = 1
+    unit: str = "ops"
+
+
+@dataclass
+class BenchResult:
+    name: str
+    iterations: int
+    items: int
+    unit: str
+    throughput: float  # items per second
+    mean: float  # seconds per call
+    p50: float
+    p90: float
+    p99: float
+
+
+def run_case(case: Case, config: Optional[BenchConfig] = None) -> BenchResult:
+    """Time ``case`` for at least ``min_iterations`` calls and ``min_time`` seconds."""
+    config = config or BenchConfig()
+    fn = case.setup(config.seed)
+    for _ in range(config.warmup):
+        fn()
+    durations: list[float] = []
+    deadline = time.perf_counter() + config.min_time
+    while len(durations) < config.max_iterations and (
+        len(durations) < config.min_iterations or time.perf_counter() < deadline
+    ):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    samples = np.asarray(durations)
+    p50, p90, p99 = np.quantile(samples, [0.5, 0.9, 0.99]).tolist()
+    total = float(samples.sum())
+    return BenchResult(
+        name=case.name,
+        iterations=samples.size,
+        items=case.items,
+        unit=case.unit,
+        throughput=samples.size * case.items / total if total > 0 else float("inf"),
+        mean=total / samples.size,
+        p50=p50,
+        p90=p90,
+        p99=p99,
+    )
+
+
+def select_cases(cases: Iterable[Case], patterns: Optional[Iterable[str]] = None) -> list[Case]:
+    """Keep cases whose name matches any glob in ``patterns`` (``"ml.*"``, ``"collector.rtt"``)."""
+    patterns = list(patterns or [])
+    if not patterns:
+        return list(cases)
+    return [case for case in cases if any(fnmatch.fnmatchcase(case.name, pattern) for pattern in patterns)]
+
+
+def run_suite(
+    cases: Iterable[Case],
+    config: Optional[BenchConfig] = None,
+    progress: Optional[Callable[[BenchResult], None]] = None,
+) -> list[BenchResult]:
+    results = []
+    for case in cases:
+        result = run_case(case, config)
+        if progress is not None:
+            progress(result)
+        results.append(result)
+    return results
@@ -0,0 +1,192 @@
+"""Benchmark history in DuckDB and regression checks against a baseline run."""
+
+from __future__ import annotations
+
+import os
+import platform
+import socket
+import subprocess
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+import duckdb
+
+from .runner import BenchResult
+
+RESULT_COLUMNS = ("name", "iterations", "items", "unit", "throughput", "mean", "p50", "p90", "p99")
+
+
+@dataclass
+class RunInfo:
+    git_revision: Optional[str] = None
+    git_dirty: bool = False
+    hostname: str = field(default_factory=socket.gethostname)
+    system: str = field(default_factory=lambda: f"{platform.system()} {platform.release()}")
+    machine: str = field(default_factory=platform.machine)
+    processor: str = field(default_factory=platform.processor)
+    cpu_count: int = field(default_factory=lambda: os.cpu_count() or 1)
+    python: str = field(default_factory=platform.python_version)
+
+
+@dataclass
+class Comparison:
+    name: str
+    throughput: float
+    baseline_throughput: float
+    change: float  # relative median throughput change; negative is slower
+    p99_change: float  # relative p99 latency change; positive is slower
+    regression: bool
+
+
+def collect_run_info(repo: Optional[Path] = None) -> RunInfo:
+    """Describe this machine and the git checkout at ``repo`` (default: cwd)."""
+    revision = _git(repo, "rev-parse", "HEAD")
+    status = _git(repo, "status", "--porcelain", "--untracked-files=no")
+    return RunInfo(git_revision=revision, git_dirty=bool(status))
+
+
+def ensure_bench_schema(connection: duckdb.DuckDBPyConnection) -> None:
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS bench_runs (
+            run_id VARCHAR PRIMARY KEY,
+            started_at TIMESTAMP,
+            git_revision VARCHAR,
+            git_dirty BOOLEAN,
+            hostname VARCHAR,
+            system VARCHAR,
+            machine VARCHAR,
+            processor VARCHAR,
+            cpu_count INTEGER,
+            python VARCHAR,
+            baseline BOOLEAN DEFAULT FALSE
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS bench_results (
+            run_id VARCHAR,
+            name VARCHAR,
+            iterations INTEGER,
+            items INTEGER,
+            unit VARCHAR,
+            throughput DOUBLE,
+            mean DOUBLE,
+            p50 DOUBLE,
+            p90 DOUBLE,
+            p99 DOUBLE
+        )
+        """
+    )
+
+
+def record_run(
+    connection: duckdb.DuckDBPyConnection,
+    results: Iterable[BenchResult],
+    info: RunInfo,
+    baseline: bool = False,
+    started_at: Optional[datetime] = None,
+) -> str:
+    """Store one run; with ``baseline=True`` it replaces this host's baseline."""
+    ensure_bench_schema(connection)
+    run_id = uuid.uuid4().hex
+    connection.execute("BEGIN TRANSACTION")
+    try:
+        if baseline:
+            connection.execute("UPDATE bench_runs SET baseline = FALSE WHERE hostname = ?", [info.hostname])
+        connection.execute(
+            "INSERT INTO bench_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                run_id,
+                started_at or datetime.utcnow(),
+                info.git_revision,
+                info.git_dirty,
+                info.hostname,
+                info.system,
+                info.machine,
+                info.processor,
+                info.cpu_count,
+                info.python,
+                baseline,
+            ],
+        )
+        rows = [[run_id, *(getattr(result, column) for column in RESULT_COLUMNS)] for result in results]
+        if rows:
+            connection.executemany("INSERT INTO bench_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    return run_id
+
+
+def load_baseline(
+    connection: duckdb.DuckDBPyConnection, hostname: str
+) -> tuple[Optional[str], dict[str, BenchResult]]:
+    """Return the baseline run id for ``hostname`` and its results keyed by case name.
+
+    Baselines are per host: numbers from different machines are not comparable.
+    """
+    ensure_bench_schema(connection)
+    row = connection.execute(
+        "SELECT run_id, git_revision FROM bench_runs WHERE hostname = ? AND baseline "
+        "ORDER BY started_at DESC LIMIT 1",
+        [hostname],
+    ).fetchone()
+    if row is None:
+        return None, {}
+    rows = connection.execute(
+        f"SELECT {', '.join(RESULT_COLUMNS)} FROM bench_results WHERE run_id = ?", [row[0]]
+    ).fetchall()
+    return row[1] or row[0], {values[0]: BenchResult(*values) for values in rows}
+
+
+def compare(
+    results: Iterable[BenchResult],
+    baseline: dict[str, BenchResult],
+    tolerance: float = 0.1,
+) -> list[Comparison]:
+    """Flag cases whose median throughput fell by more than ``tolerance`` against ``baseline``.
+
+    The median call latency is used rather than the mean so a few scheduler hiccups
+    do not flag a regression.
+    """
+    comparisons = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None or reference.p50 <= 0 or result.p50 <= 0:
+            continue
+        change = reference.p50 / result.p50 - 1.0
+        comparisons.append(
+            Comparison(
+                name=result.name,
+                throughput=result.throughput,
+                baseline_throughput=reference.throughput,
+                change=change,
+                p99_change=result.p99 / reference.p99 - 1.0 if reference.p99 > 0 else 0.0,
+                regression=change < -tolerance,
+            )
+        )
+    return comparisons
+
+
+# --- internal helpers ---
+
+
+def _git(repo: Optional[Path], *args: str) -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", *args],
+            cwd=repo,
+            capture_output=True,
+            text=True,
+            timeout=10,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip()
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from typing import Optional
+import sys
+from pathlib import Path
+from typing import List, Optional
 
 import typer
 
@@ -26,12 +28,52 @@ def range(
 @app.command()
 def scan(
     interface: str = typer.Option(..., help="Wi-Fi interface identifier"),
+    watch: bool = typer.Option(False, "--watch", help="Keep scanning every --interval seconds until interrupted"),
+    interval: float = typer.Option(2.0, help="Seconds between scans in --watch mode"),
+    output_format: str = typer.Option("text", "--format", help="Output format: text, jsonl or parquet"),
+    output: Optional[Path] = typer.Option(
+        None, help="JSONL file to append to (default stdout), or Parquet archive directory"
+    ),
+    changes_only: bool = typer.Option(False, help="Only report new, lost and moved devices"),
+    threshold: float = typer.Option(0.1, help="Metres a device must move to count as changed"),
+    workers: int = typer.Option(4, help="Targets ranged concurrently per scan"),
 ) -> None:
+    if not watch and output_format == "text" and not changes_only:
+        client = Aether(interface=interface)
+        for record in client.scan():
+            distance = f"{record.distance:.2f}" if record.distance is not None else "unknown"
+            typer.echo(f"{record.ip}\t{distance} m")
+        client.close()
+        return
+
+    from .watch import JsonlSink, ParquetSink, ScanWatcher, TextSink, WatchConfig, stop_on_signals
+
+    if output_format == "parquet":
+        if output is None:
+            raise typer.BadParameter("--format parquet needs --output <archive directory>")
+        sink = ParquetSink(output, interface)
+    elif output_format in ("jsonl", "text"):
+        sink_type = JsonlSink if output_format == "jsonl" else TextSink
+        if output is None:
+            sink = sink_type(sys.stdout)
+        else:
+            sink = sink_type(open(output, "a", encoding="utf-8"), close_stream=True)
+    else:
+        raise typer.BadParameter(f"Unknown format '{output_format}'; expected text, jsonl or parquet")
+
     client = Aether(interface=interface)
-    for record in client.scan():
-        distance = f"{record.distance:.2f}" if record.distance is not None else "unknown"
-        typer.echo(f"{record.ip}\t{distance} m")
-    client.close()
+    config = WatchConfig(interval=interval, workers=workers, changes_only=changes_only, threshold=threshold)
+    watcher = ScanWatcher(client, config)
+    try:
+        if watch:
+            with stop_on_signals(watcher):
+                watcher.run(sink)
+        else:
+            sink.write(watcher.scan_once())
+    finally:
+        watcher.close()
+        sink.close()
+        client.close()
 
 
 @app.command()
@@ -44,3 +86,74 @@ def info(
     typer.echo(f"Capabilities: {info.capabilities}")
     client.close()
 
+
+@app.command()
+def bench(
+    case: Optional[List[str]] = typer.Option(None, "--case", help="Glob of case names to run (repeatable)"),
+    min_time: float = typer.Option(1.0, help="Seconds of timed calls per case"),
+    database: Path = typer.Option(Path("data/bench/results.duckdb"), help="DuckDB file holding benchmark history"),
+    store: bool = typer.Option(True, help="Record this run in the database"),
+    set_baseline: bool = typer.Option(False, help="Make this run the baseline for this host"),
+    tolerance: float = typer.Option(0.1, help="Throughput drop versus baseline flagged as a regression"),
+    seed: int = typer.Option(0, help="Workload seed"),
+) -> None:
+    """Benchmark the pipeline and compare against this host's stored baseline."""
+    import duckdb
+
+    from .bench import (
+        CASES,
+        BenchConfig,
+        BenchResult,
+        collect_run_info,
+        compare,
+        load_baseline,
+        record_run,
+        run_suite,
+        select_cases,
+    )
+
+    cases = select_cases(CASES, case)
+    if not cases:
+        raise typer.BadParameter(f"No benchmark matches {case}; available: {', '.join(c.name for c in CASES)}")
+    info = collect_run_info()
+    typer.echo(f"revision {info.git_revision or 'unknown'}{' (dirty)' if info.git_dirty else ''} on {info.hostname}")
+    typer.echo(f"{'case':<18}{'throughput':>14} {'':<14}{'p50':>11}{'p90':>11}{'p99':>11}")
+
+    def report(result: BenchResult) -> None:
+        typer.echo(
+            f"{result.name:<18}{result.throughput:>14,.0f} {result.unit + '/s':<14}"
+            f"{_ms(result.p50):>11}{_ms(result.p90):>11}{_ms(result.p99):>11}"
+        )
+
+    results = run_suite(cases, BenchConfig(min_time=min_time, seed=seed), progress=report)
+    record = store or set_baseline
+    baseline_id, baseline = None, {}
+    # A dry run still compares against an existing history but never creates one.
+    if record or database.exists():
+        database.parent.mkdir(parents=True, exist_ok=True)
+        connection = duckdb.connect(str(database))
+        try:
+            baseline_id, baseline = load_baseline(connection, info.hostname)
+            if record:
+                record_run(connection, results, info, baseline=set_baseline)
+        finally:
+            connection.close()
+    if set_baseline:
+        typer.echo(f"Recorded as the baseline for {info.hostname}.")
+    if not baseline:
+        if not set_baseline:
+            typer.echo("No stored baseline for this host; record one with --set-baseline.")
+        return
+    comparisons = compare(results, baseline, tolerance)
+    typer.echo(f"Against baseline {baseline_id[:12]}:")
+    for comparison in comparisons:
+        flag = "REGRESSION" if comparison.regression else ""
+        typer.echo(
+            f"  {comparison.name:<18}{comparison.change:>+8.1%} median throughput{comparison.p99_change:>+8.1%} p99  {flag}"
+        )
+    if any(comparison.regression for comparison in comparisons):
+        raise typer.Exit(code=1)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1e3:.3f}ms"
@@ -3,7 +3,8 @@
 from .interface import InterfaceError, InterfaceInfo, WiFiInterface
 from .linux import LinuxWiFiInterface
 from .macos import MacOSWiFiInterface
-from .simulated import SimulatedWiFiInterface
+from .replay import ReplayWiFiInterface
+from .simulated import FleetConfig, FleetSimulation, SimulatedFleetInterface, SimulatedWiFiInterface
 from .windows import WindowsWiFiInterface
 
 __all__ = [
@@ -14,5 +15,9 @@ __all__ = [
     "MacOSWiFiInterface",
     "WindowsWiFiInterface",
     "SimulatedWiFiInterface",
+    "SimulatedFleetInterface",
+    "FleetSimulation",
+    "FleetConfig",
+    "ReplayWiFiInterface",
 ]
 
@@ -60,11 +60,17 @@ class WiFiInterface(abc.ABC):
 
         from .linux import LinuxWiFiInterface
         from .macos import MacOSWiFiInterface
-        from .simulated import SimulatedWiFiInterface
+        from .simulated import SimulatedFleetInterface, SimulatedWiFiInterface
         from .windows import WindowsWiFiInterface
 
         if name == "simulate":
             return SimulatedWiFiInterface(name)
+        if name == "simulate:fleet" or name.startswith("simulate:fleet?"):
+            return SimulatedFleetInterface.from_uri(name)
+        if name.startswith("replay:"):
+            from .replay import ReplayWiFiInterface
+
+            return ReplayWiFiInterface.from_uri(name)
 
         system = platform.system()
         if system == "Linux":
@@ -0,0 +1,217 @@
+"""Replay backend serving measurements from recorded captures."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional
+from urllib.parse import parse_qs, unquote
+
+import numpy as np
+
+from .interface import InterfaceError, InterfaceInfo, WiFiInterface
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+@dataclass
+class ReplayConfig:
+    speed: float = 1.0  # 0 replays as fast as possible
+    loop: bool = False
+    interface: Optional[str] = None
+    csi_format: str = "nexmon"
+    csi_target: str = "csi-log"
+
+    @classmethod
+    def from_query(cls, query: str) -> "ReplayConfig":
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        speed = params.get("speed", "1")
+        return cls(
+            speed=0.0 if speed in ("max", "0") else float(speed),
+            loop=params.get("loop", "0").lower() in ("1", "true", "yes"),
+            interface=params.get("interface"),
+            csi_format=params.get("format", "nexmon"),
+            csi_target=params.get("target", "csi-log"),
+        )
+
+
+class _Stream:
+    """Recorded samples of one (target, method) pair with a replay cursor."""
+
+    def __init__(self, offsets: np.ndarray, values: list, loop: bool) -> None:
+        self.offsets = offsets
+        self.values = values
+        self.loop = loop
+        self.duration = 0.0
+        self.position = 0
+        self.laps = 0
+        self.lock = threading.Lock()
+
+    def take(self) -> tuple[float, object]:
+        with self.lock:
+            if self.position >= len(self.values):
+                if not self.loop:
+                    raise InterfaceError("Replay capture exhausted")
+                self.position = 0
+                self.laps += 1
+            index = self.position
+            self.position += 1
+            laps = self.laps
+        # Looped passes keep the clock moving forward by one capture length per lap.
+        return float(self.offsets[index]) + laps * self.duration, self.values[index]
+
+
+class ReplayWiFiInterface(WiFiInterface):
+    """Serve RSSI/RTT/CSI measurements recorded in a sample archive or CSI log.
+
+    ``path`` is a Parquet file or a directory written by
+    :class:`aether.sense.storage.SampleArchiveWriter`, or a raw nexmon/Intel 5300 CSI
+    log. Every ``(target, method)`` pair replays its samples in recorded order. A
+    measurement is held back until the replay clock, started by the first measurement
+    and running at ``speed`` times real time, reaches the sample's recorded offset, so
+    the capture's timing is reproduced; ``speed=0`` disables pacing. Archived CSI only
+    keeps subcarrier magnitudes, so replayed frames have zero phase.
+
+    Open through :meth:`WiFiInterface.open` with
+    ``"replay:<path>?speed=N&loop=1&interface=wlan0"``.
+    """
+
+    def __init__(self, path: Path, config: Optional[ReplayConfig] = None) -> None:
+        super().__init__("replay")
+        self._path = Path(path)
+        self._config = config or ReplayConfig()
+        self._clock_start: Optional[float] = None
+        self._clock_lock = threading.Lock()
+        if not self._path.exists():
+            raise InterfaceError(f"Replay capture not found: {self._path}")
+        if self._path.is_dir() or self._path.suffix == ".parquet":
+            self._streams = self._load_archive()
+        else:
+            self._streams = self._load_csi_log()
+        # A looped lap lasts the capture span plus one mean sample interval, so the
+        # first sample of a lap does not land on top of the last one of the previous.
+        stamps = np.unique(np.concatenate([stream.offsets for stream in self._streams.values()]))
+        duration = float(stamps[-1] + (stamps[-1] / (stamps.size - 1) if stamps.size > 1 else 0.0))
+        for stream in self._streams.values():
+            stream.duration = duration
+        self._targets = sorted({target for target, _ in self._streams})
+
+    @classmethod
+    def from_uri(cls, uri: str) -> "ReplayWiFiInterface":
+        """Build from ``replay:<path>[?speed=N&loop=1&interface=...&format=...&target=...]``."""
+        spec = uri.removeprefix("replay:")
+        path, _, query = spec.partition("?")
+        return cls(Path(unquote(path)), ReplayConfig.from_query(query))
+
+    def measure_rssi(self, target: str) -> float:
+        return float(self._next(target, "rssi"))
+
+    def measure_rtt(self, target: str) -> float:
+        return float(self._next(target, "rtt"))
+
+    def capture_csi(self, target: str) -> Iterable[list[complex]]:
+        while True:
+            yield self._next(target, "csi")
+
+    def enumerate_devices(self) -> Iterable[str]:
+        return list(self._targets)
+
+    def info(self) -> InterfaceInfo:
+        methods = {method for _, method in self._streams}
+        return InterfaceInfo(
+            name=self.name,
+            driver=str(self._path),
+            capabilities={method: method in methods for method in ("rssi", "rtt", "csi")},
+        )
+
+    def close(self) -> None:
+        return None
+
+    # --- internal helpers ---
+
+    def _next(self, target: str, method: str) -> object:
+        stream = self._streams.get((target, method))
+        if stream is None:
+            raise InterfaceError(f"No recorded {method} samples for {target}")
+        offset, value = stream.take()
+        self._wait_until(offset)
+        return value
+
+    def _wait_until(self, offset: float) -> None:
+        if self._config.speed <= 0:
+            return
+        with self._clock_lock:
+            if self._clock_start is None:
+                self._clock_start = time.monotonic()
+        delay = self._clock_start + offset / self._config.speed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _load_archive(self) -> dict[tuple[str, str], _Stream]:
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(self._path, format="parquet", partitioning="hive")
+        if self._config.interface is not None:
+            if "interface" not in dataset.schema.names:
+                raise InterfaceError(f"{self._path} is not partitioned by interface")
+            dataset = dataset.filter(pc.field("interface") == self._config.interface)
+        if "method" not in dataset.schema.names:
+            raise InterfaceError(f"{self._path} has no method partition; pass the archive root directory")
+        table = dataset.to_table(columns=["timestamp", "target", "value", "metadata", "method"])
+        if table.num_rows == 0:
+            raise InterfaceError(f"Replay capture {self._path} has no samples")
+        table = table.sort_by([("timestamp", "ascending")])
+
+        timestamps = table.column("timestamp").cast("int64").to_numpy()
+        offsets = (timestamps - timestamps.min()) / 1e6
+        targets = np.asarray(table.column("target").fill_null("").to_numpy(zero_copy_only=False), dtype=object)
+        methods = np.asarray(table.column("method").cast("string").to_numpy(zero_copy_only=False), dtype=object)
+        values = table.column("value").to_numpy()
+
+        streams: dict[tuple[str, str], _Stream] = {}
+        keys = np.char.add(np.char.add(targets.astype(str), "\x1f"), methods.astype(str))
+        unique, inverse = np.unique(keys, return_inverse=True)
+        for code, key in enumerate(unique.tolist()):
+            target, method = key.split("\x1f")
+            rows = np.flatnonzero(inverse == code)
+            if method == "csi":
+                streams[(target, method)] = self._csi_frames(table, rows, offsets)
+            else:
+                streams[(target, method)] = _Stream(offsets[rows], values[rows].tolist(), self._config.loop)
+        return streams
+
+    def _csi_frames(self, table: "pa.Table", rows: np.ndarray, offsets: np.ndarray) -> _Stream:
+        """Regroup per-subcarrier CSI magnitudes into frames keyed by (timestamp, frame)."""
+        subset = table.take(rows)
+        metadata = subset.column("metadata").to_pylist()
+        frame = np.array([dict(entry or []).get("frame", 0.0) for entry in metadata])
+        subcarrier = np.array([dict(entry or []).get("subcarrier", 0.0) for entry in metadata])
+        order = np.lexsort((subcarrier, frame, offsets[rows]))
+        stamps = offsets[rows][order]
+        frame = frame[order]
+        values = subset.column("value").to_numpy()[order]
+        starts = np.flatnonzero(np.r_[True, (stamps[1:] != stamps[:-1]) | (frame[1:] != frame[:-1])])
+        frames = [
+            [complex(value, 0.0) for value in chunk.tolist()]
+            for chunk in np.split(values, starts[1:])
+        ]
+        return _Stream(stamps[starts], frames, self._config.loop)
+
+    def _load_csi_log(self) -> dict[tuple[str, str], _Stream]:
+        from .csi import Intel5300CSIBackend, NexmonCSIBackend, parse_csi_frame
+
+        if self._config.csi_format == "nexmon":
+            backend = NexmonCSIBackend(self.name, csi_path=str(self._path))
+        elif self._config.csi_format == "intel5300":
+            backend = Intel5300CSIBackend(self.name, log_path=str(self._path))
+        else:
+            raise InterfaceError(f"Unknown CSI log format: {self._config.csi_format}")
+        frames = [parse_csi_frame(raw) for raw in backend.capture_csi_raw(self._config.csi_target)]
+        if not frames:
+            raise InterfaceError(f"Replay capture {self._path} has no CSI frames")
+        # Raw logs carry no timestamps; frames are served back to back.
+        return {(self._config.csi_target, "csi"): _Stream(np.zeros(len(frames)), frames, self._config.loop)}
@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
-import math
-import random
+import threading
+import time
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Iterable, Optional, Sequence
+from urllib.parse import parse_qs
 
-from .interface import InterfaceInfo, WiFiInterface
+import numpy as np
+
+from .interface import InterfaceError, InterfaceInfo, WiFiInterface
+
+SPEED_OF_LIGHT = 299_792_458.0
+WAVELENGTH = 0.125  # metres at 2.4 GHz
 
 
 @dataclass
@@ -17,55 +23,39 @@ class SimulatedDevice:
 
 
 class SimulatedWiFiInterface(WiFiInterface):
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, seed: Optional[int] = None) -> None:
         super().__init__(name)
         self._devices = [
             SimulatedDevice("192.168.1.10", (0.0, 0.0, 0.0)),
             SimulatedDevice("192.168.1.11", (2.5, 1.0, 0.0)),
             SimulatedDevice("192.168.1.12", (4.0, -1.0, 1.0)),
         ]
+        self._index = {device.ip: device for device in self._devices}
         self._self = SimulatedDevice("192.168.1.2", (0.0, 0.0, 0.5))
+        self._rng = np.random.default_rng(seed)
 
     def _distance(self, target: str) -> float:
-        device = next((d for d in self._devices if d.ip == target), None)
-        if not device:
+        device = self._index.get(target)
+        if device is None:
             raise ValueError(f"Unknown target {target}")
-        dx = device.position[0] - self._self.position[0]
-        dy = device.position[1] - self._self.position[1]
-        dz = device.position[2] - self._self.position[2]
-        return math.sqrt(dx * dx + dy * dy + dz * dz)
+        return float(np.linalg.norm(np.subtract(device.position, self._self.position)))
 
     def measure_rssi(self, target: str) -> float:
         distance = self._distance(target)
         # Log-distance path loss model placeholder
-        path_loss = 27.55 + 20 * math.log10(2400) - 20 * math.log10(max(distance, 0.1))
-        noise = random.gauss(0, 2)
-        return -(path_loss + noise)
+        path_loss = 27.55 + 20 * np.log10(2400) - 20 * np.log10(max(distance, 0.1))
+        noise = self._rng.normal(0, 2)
+        return float(-(path_loss + noise))
 
     def measure_rtt(self, target: str) -> float:
         distance = self._distance(target)
-        speed_of_light = 299_792_458.0
-        base = (distance * 2) / speed_of_light
-        jitter = random.gauss(0, 1e-7)
-        return base + jitter
+        base = (distance * 2) / SPEED_OF_LIGHT
+        jitter = self._rng.normal(0, 1e-7)
+        return float(base + jitter)
 
     def capture_csi(self, target: str) -> Iterable[list[complex]]:
-        distance = self._distance(target)
-        subcarriers = 30
-        # Phase offset proportional to distance (wavelength ~ 0.125m at 2.4GHz)
-        phase_offset = (distance / 0.125) * 2 * math.pi
-        # Magnitude decreases with distance (inverse square law approximation)
-        magnitude = 1.0 / max(distance, 0.1)
-        noise_scale = 0.1
-        
-        for _ in range(5):
-            yield [
-                complex(
-                    magnitude * math.cos(phase_offset + i * 0.1 + random.gauss(0, noise_scale)),
-                    magnitude * math.sin(phase_offset + i * 0.1 + random.gauss(0, noise_scale))
-                )
-                for i in range(subcarriers)
-            ]
+        frames = _csi_frames(np.array([self._distance(target)]), 5, 30, 0.1, self._rng)[0]
+        return frames.tolist()
 
     def enumerate_devices(self) -> Iterable[str]:
         return [device.ip for device in self._devices]
@@ -79,3 +69,272 @@ class SimulatedWiFiInterface(WiFiInterface):
     def close(self) -> None:
         return None
 
+
+@dataclass
+class FleetConfig:
+    devices: int = 1000
+    width: float = 100.0
+    height: float = 100.0
+    mobility: str = "waypoint"  # "waypoint", "corridor" or "static"
+    min_speed: float = 0.5
+    max_speed: float = 1.5
+    corridors: int = 8
+    corridor_width: float = 2.0
+    radio_range: Optional[float] = None
+    realtime: bool = True
+    tx_power: float = -40.0
+    path_loss_exponent: float = 2.2
+    rssi_noise: float = 2.0
+    rtt_jitter: float = 1e-9
+    csi_frames: int = 5
+    subcarriers: int = 30
+    csi_noise: float = 0.1
+    seed: int = 0
+
+    @classmethod
+    def from_query(cls, query: str) -> "FleetConfig":
+        config = cls()
+        for key, values in parse_qs(query).items():
+            if not hasattr(config, key):
+                raise InterfaceError(f"Unknown fleet simulation option '{key}'")
+            current = getattr(config, key)
+            raw = values[-1]
+            if isinstance(current, bool):
+                value: object = raw.lower() in ("1", "true", "yes")
+            elif isinstance(current, int):
+                value = int(raw)
+            elif isinstance(current, float) or current is None:
+                value = float(raw)
+            else:
+                value = raw
+            setattr(config, key, value)
+        return config
+
+
+class FleetSimulation:
+    """Positions of a fleet of simulated devices moving under a mobility model.
+
+    State lives in ``(N, 3)`` arrays and every step updates all devices at once.
+    ``waypoint`` moves each device in a straight line to a random waypoint and then
+    draws a new one; ``corridor`` keeps devices on ``corridors`` evenly spaced
+    horizontal or vertical corridors, walking back and forth along them. With
+    ``realtime`` the simulation advances to the wall clock before every read;
+    otherwise it only moves on :meth:`step`.
+    """
+
+    def __init__(self, config: Optional[FleetConfig] = None) -> None:
+        self._config = config or FleetConfig()
+        config = self._config
+        self._rng = np.random.default_rng(config.seed)
+        self._lock = threading.Lock()
+        count = config.devices
+        self.ids = [_device_ip(i) for i in range(count)]
+        self.index = {ip: i for i, ip in enumerate(self.ids)}
+        self._extent = np.array([config.width, config.height])
+        self._speed = self._rng.uniform(config.min_speed, config.max_speed, count)
+        self._positions = np.zeros((count, 3))
+        self._positions[:, :2] = self._rng.uniform(0.0, 1.0, (count, 2)) * self._extent
+        if config.mobility == "waypoint":
+            self._waypoints = self._rng.uniform(0.0, 1.0, (count, 2)) * self._extent
+        elif config.mobility == "corridor":
+            self._setup_corridors()
+        elif config.mobility != "static":
+            raise InterfaceError(f"Unknown mobility model '{config.mobility}'")
+        self.origin = np.array([config.width / 2, config.height / 2, 0.5])
+        self.time = 0.0
+        self._clock: Optional[float] = None
+
+    @property
+    def config(self) -> FleetConfig:
+        return self._config
+
+    def positions(self) -> np.ndarray:
+        """Current ``(N, 3)`` device positions."""
+        self._sync()
+        return self._positions.copy()
+
+    def position(self, index: int) -> np.ndarray:
+        self._sync()
+        return self._positions[index].copy()
+
+    def lookup(self, targets: Sequence[str]) -> np.ndarray:
+        try:
+            return np.fromiter((self.index[target] for target in targets), dtype=np.int64, count=len(targets))
+        except KeyError as exc:
+            raise InterfaceError(f"Unknown target {exc.args[0]}") from None
+
+    def distances(self, targets: np.ndarray, origin: np.ndarray) -> np.ndarray:
+        self._sync()
+        return np.linalg.norm(self._positions[targets] - origin, axis=1)
+
+    def step(self, dt: float) -> None:
+        with self._lock:
+            self._advance(dt)
+
+    # --- internal helpers ---
+
+    def _sync(self) -> None:
+        if not self._config.realtime:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._clock is not None:
+                self._advance(now - self._clock)
+            self._clock = now
+
+    def _advance(self, dt: float) -> None:
+        if dt <= 0 or self._config.mobility == "static":
+            return
+        self.time += dt
+        if self._config.mobility == "waypoint":
+            self._advance_waypoint(dt)
+        else:
+            self._advance_corridor(dt)
+
+    def _advance_waypoint(self, dt: float) -> None:
+        position = self._positions[:, :2]
+        offset = self._waypoints - position
+        remaining = np.linalg.norm(offset, axis=1)
+        travel = self._speed * dt
+        arrived = remaining <= travel
+        scale = np.divide(travel, remaining, out=np.zeros_like(remaining), where=remaining > 0)
+        position += offset * np.minimum(scale, 1.0)[:, None]
+        count = int(arrived.sum())
+        if count:
+            self._waypoints[arrived] = self._rng.uniform(0.0, 1.0, (count, 2)) * self._extent
+            self._speed[arrived] = self._rng.uniform(self._config.min_speed, self._config.max_speed, count)
+
+    def _setup_corridors(self) -> None:
+        config = self._config
+        count = config.devices
+        corridor = self._rng.integers(0, config.corridors, count)
+        self._axis = (corridor % 2).astype(np.int64)  # 0: along x, 1: along y
+        lanes = np.maximum((config.corridors + 1) // 2, 1)
+        lane = corridor // 2
+        across = 1 - self._axis
+        centre = (lane + 0.5) / lanes * self._extent[across]
+        rows = np.arange(count)
+        jitter = self._rng.uniform(-0.5, 0.5, count) * config.corridor_width
+        self._positions[rows, across] = np.clip(centre + jitter, 0.0, self._extent[across])
+        self._direction = self._rng.choice([-1.0, 1.0], count)
+
+    def _advance_corridor(self, dt: float) -> None:
+        rows = np.arange(self._positions.shape[0])
+        length = self._extent[self._axis]
+        # Unfold the back-and-forth walk onto a circle of twice the corridor length.
+        along = self._positions[rows, self._axis] + self._direction * self._speed * dt
+        along = np.mod(along, 2 * length)
+        turned = along > length
+        along = np.where(turned, 2 * length - along, along)
+        self._direction = np.where(turned, -self._direction, self._direction)
+        self._positions[rows, self._axis] = along
+
+
+class SimulatedFleetInterface(WiFiInterface):
+    """Interface onto a :class:`FleetSimulation`, measuring from ``origin``.
+
+    The ``*_many`` methods measure many targets with one vectorized call; the
+    single-target methods are thin wrappers. :meth:`node` returns an interface
+    located at one of the fleet's devices, sharing the same simulation, so mesh and
+    tracking layers can be load-tested with realistic fleet sizes. Open through
+    ``WiFiInterface.open("simulate:fleet?devices=10000&mobility=corridor&seed=1")``.
+    """
+
+    def __init__(self, name: str, fleet: Optional[FleetSimulation] = None, origin: Optional[str] = None) -> None:
+        super().__init__(name)
+        self._fleet = fleet or FleetSimulation()
+        self._origin = None if origin is None else self._fleet.index[origin]
+        config = self._fleet.config
+        # Each node draws measurement noise from its own stream of the fleet seed.
+        self._rng = np.random.default_rng([config.seed, 0 if self._origin is None else self._origin + 1])
+
+    @classmethod
+    def from_uri(cls, uri: str) -> "SimulatedFleetInterface":
+        _, _, query = uri.partition("?")
+        return cls(uri, FleetSimulation(FleetConfig.from_query(query)))
+
+    @property
+    def fleet(self) -> FleetSimulation:
+        return self._fleet
+
+    def node(self, device: str) -> "SimulatedFleetInterface":
+        return SimulatedFleetInterface(device, self._fleet, origin=device)
+
+    def distances(self, targets: Sequence[str]) -> np.ndarray:
+        return self._fleet.distances(self._fleet.lookup(targets), self._origin_position())
+
+    def measure_rssi_many(self, targets: Sequence[str]) -> np.ndarray:
+        config = self._fleet.config
+        distance = np.maximum(self.distances(targets), 0.1)
+        rssi = config.tx_power - 10 * config.path_loss_exponent * np.log10(distance)
+        return rssi + self._rng.normal(0.0, config.rssi_noise, distance.shape)
+
+    def measure_rtt_many(self, targets: Sequence[str]) -> np.ndarray:
+        distance = self.distances(targets)
+        return 2 * distance / SPEED_OF_LIGHT + self._rng.normal(0.0, self._fleet.config.rtt_jitter, distance.shape)
+
+    def capture_csi_many(self, targets: Sequence[str], frames: Optional[int] = None) -> np.ndarray:
+        """Complex CSI of shape ``(len(targets), frames, subcarriers)``."""
+        config = self._fleet.config
+        return _csi_frames(
+            self.distances(targets),
+            frames or config.csi_frames,
+            config.subcarriers,
+            config.csi_noise,
+            self._rng,
+        )
+
+    def measure_rssi(self, target: str) -> float:
+        return float(self.measure_rssi_many([target])[0])
+
+    def measure_rtt(self, target: str) -> float:
+        return float(self.measure_rtt_many([target])[0])
+
+    def capture_csi(self, target: str) -> Iterable[list[complex]]:
+        return self.capture_csi_many([target])[0].tolist()
+
+    def enumerate_devices(self) -> Iterable[str]:
+        radio_range = self._fleet.config.radio_range
+        ids = self._fleet.ids
+        if radio_range is None:
+            return [ip for i, ip in enumerate(ids) if i != self._origin]
+        distance = self._fleet.distances(np.arange(len(ids)), self._origin_position())
+        visible = distance <= radio_range
+        if self._origin is not None:
+            visible[self._origin] = False
+        return [ids[i] for i in np.flatnonzero(visible).tolist()]
+
+    def info(self) -> InterfaceInfo:
+        return InterfaceInfo(name=self.name, capabilities={"rssi": True, "rtt": True, "csi": True})
+
+    def close(self) -> None:
+        return None
+
+    def _origin_position(self) -> np.ndarray:
+        if self._origin is None:
+            return self._fleet.origin
+        return self._fleet.position(self._origin)
+
+
+def _device_ip(index: int) -> str:
+    host = index + 1
+    return f"10.{(host >> 16) & 255}.{(host >> 8) & 255}.{host & 255}"
+
+
+def _csi_frames(
+    distance: np.ndarray,
+    frames: int,
+    subcarriers: int,
+    noise: float,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Complex CSI of shape ``(targets, frames, subcarriers)`` for the given distances."""
+    # Phase offset proportional to distance, magnitude falling off inversely.
+    phase_offset = (distance / WAVELENGTH) * 2 * np.pi
+    magnitude = 1.0 / np.maximum(distance, 0.1)
+    phase = (
+        phase_offset[:, None, None]
+        + np.arange(subcarriers) * 0.1
+        + rng.normal(0.0, noise, (distance.size, frames, subcarriers))
+    )
+    return magnitude[:, None, None] * np.exp(1j * phase)
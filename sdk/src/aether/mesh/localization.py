@@ -0,0 +1,289 @@
+"""Anchor-free relative localization from pairwise ranges."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import dijkstra
+from scipy.sparse.linalg import LinearOperator, cg
+
+from .trilateration import Anchor
+
+
+@dataclass
+class LocalizerConfig:
+    dims: int = 2
+    max_iter: int = 300
+    tol: float = 1e-5  # stop when an iteration lowers stress by less than this fraction
+    fit_tol: float = 1e-7  # or when normalized stress (mean squared relative range error) drops below this
+    cg_iter: int = 40
+    pivots: int = 50
+    min_distance: float = 1e-3
+    seed: Optional[int] = None
+
+
+@dataclass
+class Layout:
+    devices: List[str]
+    positions: np.ndarray
+    stress: float
+    iterations: int
+    converged: bool
+
+    def as_dict(self) -> Dict[str, Tuple[float, ...]]:
+        return {device: tuple(row) for device, row in zip(self.devices, self.positions.tolist())}
+
+
+class RelativeLocalizer:
+    """Embed devices from sparse pairwise ranges using stress majorization (SMACOF).
+
+    Each iteration applies the Guttman transform ``L X = B(Z) Z`` where ``L`` is the
+    weighted graph Laplacian of the measured edges. ``B(Z) Z`` and the stress come from
+    one pass through the signed edge incidence matrix, and the linear system is solved
+    with warm-started conjugate gradients, so cost per iteration is linear in the
+    number of edges. Known anchors are pinned by
+    moving their columns to the right-hand side. The last layout is kept and used as the
+    starting point of the next call, so re-localizing after a few new ranges only needs
+    a handful of iterations.
+    """
+
+    def __init__(self, config: Optional[LocalizerConfig] = None) -> None:
+        self._config = config or LocalizerConfig()
+        self._rng = np.random.default_rng(self._config.seed)
+        self._layout: Dict[str, np.ndarray] = {}
+
+    def reset(self) -> None:
+        self._layout = {}
+
+    def localize(
+        self,
+        devices: Iterable[str],
+        pairwise_ranges: Dict[tuple[str, str], float],
+        weights: Optional[Dict[tuple[str, str], float]] = None,
+        anchors: Optional[Iterable[Anchor]] = None,
+    ) -> Layout:
+        cfg = self._config
+        names = list(dict.fromkeys(devices))
+        index = {name: i for i, name in enumerate(names)}
+        n = len(names)
+        if n == 0:
+            raise ValueError("No devices to localize")
+
+        src, dst, dist, weight = self._edge_arrays(index, pairwise_ranges, weights)
+
+        fixed = np.zeros(n, dtype=bool)
+        anchor_positions = np.zeros((n, cfg.dims))
+        for anchor in anchors or []:
+            if anchor.device_id in index:
+                i = index[anchor.device_id]
+                fixed[i] = True
+                anchor_positions[i] = np.asarray(anchor.position, dtype=float)[: cfg.dims]
+
+        laplacian = self._laplacian(n, src, dst, weight)
+        degree = laplacian.diagonal()
+        # Devices without any measured edge cannot move; keep them where they are.
+        free = ~fixed & (degree > 0)
+
+        X = self._initial_layout(names, src, dst, dist, weight, fixed, anchor_positions)
+        X[fixed] = anchor_positions[fixed]
+
+        normalizer = float(np.sum(weight * dist**2)) or 1.0
+        if src.size == 0 or not free.any():
+            positions = X
+            self._remember(names, positions)
+            return Layout(names, positions, self._stress(X, src, dst, dist, weight) / normalizer, 0, True)
+
+        incidence = self._incidence(n, src, dst)
+        free_idx = np.flatnonzero(free)
+        fixed_idx = np.flatnonzero(~free)
+        L_ff = laplacian[free_idx][:, free_idx].tocsr()
+        L_fa = laplacian[free_idx][:, fixed_idx].tocsr()
+        pinned = L_fa @ X[fixed_idx]
+        inv_diag = 1.0 / L_ff.diagonal()
+        preconditioner = LinearOperator(L_ff.shape, matvec=lambda v: inv_diag * v)
+
+        rhs, stress = self._majorize(X, incidence, dist, weight)
+        converged = False
+        iterations = 0
+        for iterations in range(1, cfg.max_iter + 1):
+            rhs = rhs[free_idx] - pinned
+            for axis in range(cfg.dims):
+                X[free_idx, axis], _ = cg(
+                    L_ff,
+                    rhs[:, axis],
+                    x0=X[free_idx, axis],
+                    maxiter=cfg.cg_iter,
+                    M=preconditioner,
+                )
+            rhs, new_stress = self._majorize(X, incidence, dist, weight)
+            settled = stress - new_stress <= cfg.tol * max(stress, 1e-12)
+            stress = new_stress
+            if settled or stress <= cfg.fit_tol * normalizer:
+                converged = True
+                break
+
+        if not fixed.any():
+            X -= X[free].mean(axis=0)
+        self._remember(names, X)
+        return Layout(names, X, stress / normalizer, iterations, converged)
+
+    # --- internal helpers ---
+
+    def _edge_arrays(
+        self,
+        index: Dict[str, int],
+        pairwise_ranges: Dict[tuple[str, str], float],
+        weights: Optional[Dict[tuple[str, str], float]],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        src: list[int] = []
+        dst: list[int] = []
+        dist: list[float] = []
+        weight: list[float] = []
+        for (a, b), distance in pairwise_ranges.items():
+            if a == b or a not in index or b not in index:
+                continue
+            d = max(float(distance), self._config.min_distance)
+            src.append(index[a])
+            dst.append(index[b])
+            dist.append(d)
+            if weights is not None and (a, b) in weights:
+                weight.append(float(weights[(a, b)]))
+            else:
+                weight.append(1.0 / (d * d))
+        return (
+            np.asarray(src, dtype=np.int64),
+            np.asarray(dst, dtype=np.int64),
+            np.asarray(dist, dtype=float),
+            np.asarray(weight, dtype=float),
+        )
+
+    @staticmethod
+    def _laplacian(n: int, src: np.ndarray, dst: np.ndarray, weight: np.ndarray) -> sparse.csr_matrix:
+        degree = np.bincount(src, weight, minlength=n) + np.bincount(dst, weight, minlength=n)
+        rows = np.concatenate([src, dst, np.arange(n)])
+        cols = np.concatenate([dst, src, np.arange(n)])
+        data = np.concatenate([-weight, -weight, degree])
+        return sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+
+    @staticmethod
+    def _incidence(n: int, src: np.ndarray, dst: np.ndarray) -> sparse.csr_matrix:
+        """Signed edge-node incidence matrix: row ``e`` of ``E @ X`` is ``X[src[e]] - X[dst[e]]``."""
+        edges = np.arange(src.size)
+        return sparse.csr_matrix(
+            (np.repeat([1.0, -1.0], src.size), (np.concatenate([edges, edges]), np.concatenate([src, dst]))),
+            shape=(src.size, n),
+        )
+
+    @staticmethod
+    def _majorize(
+        X: np.ndarray, incidence: sparse.csr_matrix, dist: np.ndarray, weight: np.ndarray
+    ) -> tuple[np.ndarray, float]:
+        """Guttman right-hand side ``B(X) X`` and the stress of ``X``, in one pass over the edges."""
+        delta = incidence @ X
+        norm = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+        stress = float(np.sum(weight * (norm - dist) ** 2))
+        coeff = np.divide(weight * dist, norm, out=np.zeros_like(norm), where=norm > 1e-12)
+        return incidence.T @ (coeff[:, None] * delta), stress
+
+    @staticmethod
+    def _stress(X: np.ndarray, src: np.ndarray, dst: np.ndarray, dist: np.ndarray, weight: np.ndarray) -> float:
+        delta = X[src] - X[dst]
+        norm = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+        return float(np.sum(weight * (norm - dist) ** 2))
+
+    def _initial_layout(
+        self,
+        names: List[str],
+        src: np.ndarray,
+        dst: np.ndarray,
+        dist: np.ndarray,
+        weight: np.ndarray,
+        fixed: np.ndarray,
+        anchor_positions: np.ndarray,
+    ) -> np.ndarray:
+        n = len(names)
+        known = np.array([name in self._layout for name in names])
+        if known.sum() >= max(n // 2, 1):
+            return self._warm_start(names, known, src, dst)
+
+        X = self._pivot_mds(n, src, dst, dist)
+        if src.size:
+            delta = X[src] - X[dst]
+            norm = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+            denom = float(np.sum(weight * norm * norm))
+            if denom > 0:
+                X *= float(np.sum(weight * dist * norm)) / denom
+        if fixed.sum() >= 2:
+            X = self._align(X, fixed, anchor_positions)
+        elif fixed.any():
+            X += anchor_positions[fixed][0] - X[fixed][0]
+        return X
+
+    def _warm_start(self, names: List[str], known: np.ndarray, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        dims = self._config.dims
+        X = np.zeros((len(names), dims))
+        for i in np.flatnonzero(known):
+            X[i] = self._layout[names[i]][:dims]
+        missing = np.flatnonzero(~known)
+        if missing.size == 0:
+            return X
+        # Seed new devices at the centroid of their already placed neighbours.
+        both_src = np.concatenate([src, dst])
+        both_dst = np.concatenate([dst, src])
+        usable = known[both_dst]
+        sums = np.zeros_like(X)
+        for axis in range(dims):
+            sums[:, axis] = np.bincount(both_src[usable], X[both_dst[usable], axis], minlength=len(names))
+        counts = np.bincount(both_src[usable], minlength=len(names))
+        centroid = X[known].mean(axis=0)
+        spread = float(X[known].std()) or 1.0
+        for i in missing:
+            base = sums[i] / counts[i] if counts[i] else centroid
+            X[i] = base + self._rng.normal(0.0, 0.1 * spread, size=dims)
+        return X
+
+    def _pivot_mds(self, n: int, src: np.ndarray, dst: np.ndarray, dist: np.ndarray) -> np.ndarray:
+        dims = self._config.dims
+        if src.size == 0 or n <= dims:
+            return self._rng.normal(size=(n, dims))
+        graph = sparse.csr_matrix((dist, (src, dst)), shape=(n, n))
+        k = min(n, self._config.pivots)
+        pivots = self._rng.choice(n, size=k, replace=False)
+        D = dijkstra(graph, directed=False, indices=pivots).T
+        finite = np.isfinite(D)
+        D[~finite] = D[finite].max() if finite.any() else 1.0
+        D2 = D * D
+        C = -0.5 * (D2 - D2.mean(axis=0) - D2.mean(axis=1, keepdims=True) + D2.mean())
+        eigvals, eigvecs = np.linalg.eigh(C.T @ C)
+        order = np.argsort(eigvals)[::-1][:dims]
+        X = C @ eigvecs[:, order]
+        if X.shape[1] < dims:
+            X = np.hstack([X, np.zeros((n, dims - X.shape[1]))])
+        # Break exact ties so the Guttman transform has well-defined directions.
+        return X + self._rng.normal(0.0, 1e-6, size=X.shape)
+
+    @staticmethod
+    def _align(X: np.ndarray, fixed: np.ndarray, anchor_positions: np.ndarray) -> np.ndarray:
+        source = X[fixed]
+        target = anchor_positions[fixed]
+        source_mean = source.mean(axis=0)
+        target_mean = target.mean(axis=0)
+        u, _, vt = np.linalg.svd((source - source_mean).T @ (target - target_mean))
+        rotation = u @ vt
+        return (X - source_mean) @ rotation + target_mean
+
+    def _remember(self, names: List[str], positions: np.ndarray) -> None:
+        for name, row in zip(names, positions):
+            self._layout[name] = row.copy()
+
+
+def localize(
+    devices: Iterable[str],
+    pairwise_ranges: Dict[tuple[str, str], float],
+    anchors: Optional[Iterable[Anchor]] = None,
+    dims: int = 2,
+) -> Dict[str, Tuple[float, ...]]:
+    return RelativeLocalizer(LocalizerConfig(dims=dims)).localize(devices, pairwise_ranges, anchors=anchors).as_dict()
@@ -0,0 +1,358 @@
+"""Planning which device pairs to range during a mesh survey."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from ..core.interface import InterfaceError
+from ..sense.collectors import SignalCollector
+
+Pair = Tuple[str, str]
+
+
+def canonical_pair(a: str, b: str) -> Pair:
+    return (a, b) if a <= b else (b, a)
+
+
+@dataclass
+class PlannerConfig:
+    dims: int = 2
+    target_degree: Optional[int] = None
+    constraint_tolerance: float = 0.25
+    redundancy: int = 2
+    max_measurements: Optional[int] = None
+    round_size: int = 64
+    max_workers: int = 8
+    method: str = "auto"
+
+
+@dataclass
+class RangingPlan:
+    pairs: List[Pair]
+    inferred: Dict[Pair, float]
+    skipped_symmetric: int
+    skipped_constrained: int
+    full_pairwise: int
+
+
+@dataclass
+class SurveyResult:
+    ranges: Dict[Pair, float]
+    inferred: Dict[Pair, float]
+    measured: int
+    failed: List[Pair] = field(default_factory=list)
+    full_pairwise: int = 0
+
+    @property
+    def measurements_saved(self) -> int:
+        return self.full_pairwise - self.measured - len(self.failed)
+
+    @property
+    def savings_ratio(self) -> float:
+        return self.measurements_saved / self.full_pairwise if self.full_pairwise else 0.0
+
+
+class _Components:
+    """Union-find over devices, used to favour edges that join disconnected pieces."""
+
+    def __init__(self, devices: Iterable[str]) -> None:
+        self._parent = {device: device for device in devices}
+
+    def find(self, device: str) -> str:
+        root = device
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[device] != root:
+            self._parent[device], device = root, self._parent[device]
+        return root
+
+    def union(self, a: str, b: str) -> None:
+        self._parent[self.find(a)] = self.find(b)
+
+
+class _Rigidity:
+    """Grow rigid bodies in trilateration order.
+
+    A device joins the body once it has ranges to ``dims + 1`` devices already in it
+    (fewer while the body itself is smaller than that), which keeps every body
+    generically rigid as it grows.
+    """
+
+    def __init__(self, devices: Iterable[str], dims: int) -> None:
+        self._required = dims + 1
+        self.core: set[str] = set()
+        self.links: Dict[str, int] = {device: 0 for device in devices}
+        self._adjacent: Dict[str, set[str]] = {device: set() for device in self.links}
+        self._body: Dict[str, str] = {}
+        self._body_size: Dict[str, int] = {}
+
+    def seed(self, device: str) -> None:
+        self._body_size[device] = 1
+        self._join(device, device)
+
+    def add_edge(self, a: str, b: str) -> List[str]:
+        self._adjacent[a].add(b)
+        self._adjacent[b].add(a)
+        if (a in self.core) == (b in self.core):
+            return []
+        inside, outside = (a, b) if a in self.core else (b, a)
+        self.links[outside] += 1
+        return self._cascade(outside, self._body[inside])
+
+    def _cascade(self, device: str, body: str) -> List[str]:
+        joined: List[str] = []
+        queue = [device]
+        while queue:
+            candidate = queue.pop()
+            if candidate in self.core:
+                continue
+            if self.links[candidate] < min(self._required, self._body_size[body]):
+                continue
+            self._join(candidate, body)
+            joined.append(candidate)
+            for neighbour in self._adjacent[candidate]:
+                if neighbour not in self.core:
+                    self.links[neighbour] += 1
+                    queue.append(neighbour)
+        return joined
+
+    def _join(self, device: str, body: str) -> None:
+        if device != body:
+            self._body_size[body] += 1
+        self.core.add(device)
+        self._body[device] = body
+
+
+class RangingPlanner:
+    """Choose a small set of pairwise range measurements that still localizes the mesh.
+
+    Ranging is symmetric, so a full survey measures every unordered pair, ``N * (N - 1) / 2``
+    measurements, and savings are reported against that. The planner measures each pair
+    at most once (ranges given in both directions are merged), skips pairs whose distance
+    is already pinned by triangle bounds through common measured neighbours, and greedily
+    spends the remaining budget on edges that grow a rigid body in trilateration order:
+    each new device is ranged against ``dims + 1`` devices that are already rigidly
+    placed, and devices closest to being placed go first. ``redundancy`` extra edges per
+    device are added afterwards to absorb range noise.
+    """
+
+    def __init__(self, config: Optional[PlannerConfig] = None) -> None:
+        self._config = config or PlannerConfig()
+
+    @property
+    def target_degree(self) -> int:
+        return self._config.target_degree or self._config.dims + 1 + self._config.redundancy
+
+    def plan(
+        self,
+        devices: Iterable[str],
+        known: Optional[Mapping[Pair, float]] = None,
+        candidates: Optional[Iterable[Pair]] = None,
+        limit: Optional[int] = None,
+        exclude: Optional[set[Pair]] = None,
+    ) -> RangingPlan:
+        names = list(dict.fromkeys(devices))
+        measured, duplicates = self._canonical_ranges(known or {})
+        neighbours: Dict[str, Dict[str, float]] = {name: {} for name in names}
+        for (a, b), distance in measured.items():
+            if a in neighbours and b in neighbours:
+                neighbours[a][b] = distance
+                neighbours[b][a] = distance
+
+        if candidates is None:
+            candidate_pairs = itertools.combinations(sorted(names), 2)
+        else:
+            candidate_pairs = (canonical_pair(a, b) for a, b in candidates)
+
+        inferred: Dict[Pair, float] = {}
+        pending: Dict[str, List[Pair]] = {name: [] for name in names}
+        components = _Components(names)
+        seen: set[Pair] = set(exclude or ())
+        for pair in candidate_pairs:
+            a, b = pair
+            if a == b or pair in measured or pair in seen or a not in pending or b not in pending:
+                continue
+            seen.add(pair)
+            bounds = self._triangle_bounds(neighbours[a], neighbours[b])
+            if bounds is not None and bounds[1] - bounds[0] <= self._config.constraint_tolerance:
+                inferred[pair] = (bounds[0] + bounds[1]) / 2
+                continue
+            pending[a].append(pair)
+            pending[b].append(pair)
+            components.union(a, b)
+        for a, b in measured:
+            if a in pending and b in pending:
+                components.union(a, b)
+
+        rigidity = _Rigidity(names, self._config.dims)
+        degree = {name: len(neighbours[name]) for name in names}
+        target = self.target_degree
+        heap: list[tuple[int, int, Pair]] = []
+        counter = itertools.count()
+
+        def push_pairs(devices_joined: Iterable[str]) -> None:
+            for device in devices_joined:
+                for pair in pending[device]:
+                    score = self._score(pair, degree, rigidity, target)
+                    if score > 0:
+                        heapq.heappush(heap, (-score, next(counter), pair))
+
+        # Seed one rigid body per connected piece of the candidate graph, starting from
+        # the best-connected device, then replay what is already measured.
+        seeded: set[str] = set()
+        for name in sorted(names, key=lambda item: -(degree[item] * len(names) + len(pending[item]))):
+            root = components.find(name)
+            if root not in seeded:
+                seeded.add(root)
+                rigidity.seed(name)
+        for a, b in measured:
+            if a in pending and b in pending:
+                rigidity.add_edge(a, b)
+        push_pairs(rigidity.core)
+
+        budget = self._config.max_measurements
+        if limit is not None:
+            budget = limit if budget is None else min(budget, limit)
+        selected: List[Pair] = []
+        chosen: set[Pair] = set()
+        while heap and (budget is None or len(selected) < budget):
+            neg_score, order, pair = heapq.heappop(heap)
+            if pair in chosen:
+                continue
+            score = self._score(pair, degree, rigidity, target)
+            if score <= 0:
+                continue
+            if score < -neg_score:
+                heapq.heappush(heap, (-score, order, pair))
+                continue
+            selected.append(pair)
+            chosen.add(pair)
+            degree[pair[0]] += 1
+            degree[pair[1]] += 1
+            push_pairs(rigidity.add_edge(*pair))
+
+        n = len(names)
+        return RangingPlan(
+            pairs=selected,
+            inferred=inferred,
+            skipped_symmetric=duplicates,
+            skipped_constrained=len(inferred),
+            full_pairwise=n * (n - 1) // 2,
+        )
+
+    def execute(
+        self,
+        pairs: Iterable[Pair],
+        collectors: Mapping[str, SignalCollector],
+    ) -> tuple[Dict[Pair, float], List[Pair]]:
+        """Range ``pairs`` concurrently, using whichever endpoint has a collector.
+
+        Pairs whose measurement raises :class:`InterfaceError`, or that have no
+        collector at either end, are returned as failed; other errors propagate.
+        """
+        jobs = []
+        failed: List[Pair] = []
+        for a, b in pairs:
+            if a in collectors:
+                jobs.append(((a, b), collectors[a], b))
+            elif b in collectors:
+                jobs.append(((a, b), collectors[b], a))
+            else:
+                failed.append((a, b))
+
+        ranges: Dict[Pair, float] = {}
+        if not jobs:
+            return ranges, failed
+        with ThreadPoolExecutor(max_workers=self._config.max_workers) as pool:
+            futures = {
+                pool.submit(collector.estimate_range, target, self._config.method): pair
+                for pair, collector, target in jobs
+            }
+            for future in as_completed(futures):
+                pair = futures[future]
+                try:
+                    ranges[canonical_pair(*pair)] = future.result().distance
+                except InterfaceError:
+                    failed.append(pair)
+        return ranges, failed
+
+    def survey(
+        self,
+        devices: Iterable[str],
+        collectors: Mapping[str, SignalCollector],
+        known: Optional[Mapping[Pair, float]] = None,
+        candidates: Optional[Iterable[Pair]] = None,
+    ) -> SurveyResult:
+        """Plan and measure in rounds so each round is planned against fresh ranges."""
+        names = list(dict.fromkeys(devices))
+        candidate_list = list(candidates) if candidates is not None else None
+        ranges, _ = self._canonical_ranges(known or {})
+        attempted: set[Pair] = set()
+        failed: List[Pair] = []
+        inferred: Dict[Pair, float] = {}
+        measured = 0
+        budget = self._config.max_measurements
+        while budget is None or measured + len(failed) < budget:
+            remaining = None if budget is None else budget - measured - len(failed)
+            limit = self._config.round_size if remaining is None else min(self._config.round_size, remaining)
+            plan = self.plan(names, ranges, candidate_list, limit=limit, exclude=attempted)
+            inferred.update(plan.inferred)
+            if not plan.pairs:
+                break
+            attempted.update(plan.pairs)
+            results, errors = self.execute(plan.pairs, collectors)
+            ranges.update(results)
+            measured += len(results)
+            failed.extend(canonical_pair(*pair) for pair in errors)
+
+        n = len(names)
+        return SurveyResult(
+            ranges=ranges,
+            inferred={pair: value for pair, value in inferred.items() if pair not in ranges},
+            measured=measured,
+            failed=failed,
+            full_pairwise=n * (n - 1) // 2,
+        )
+
+    # --- internal helpers ---
+
+    @staticmethod
+    def _canonical_ranges(ranges: Mapping[Pair, float]) -> tuple[Dict[Pair, float], int]:
+        totals: Dict[Pair, list[float]] = {}
+        for (a, b), distance in ranges.items():
+            totals.setdefault(canonical_pair(a, b), []).append(float(distance))
+        merged = {pair: sum(values) / len(values) for pair, values in totals.items()}
+        return merged, len(ranges) - len(merged)
+
+    @staticmethod
+    def _triangle_bounds(left: Dict[str, float], right: Dict[str, float]) -> Optional[tuple[float, float]]:
+        if len(left) > len(right):
+            left, right = right, left
+        lower = 0.0
+        upper = float("inf")
+        found = False
+        for device, d_left in left.items():
+            d_right = right.get(device)
+            if d_right is None:
+                continue
+            found = True
+            lower = max(lower, abs(d_left - d_right))
+            upper = min(upper, d_left + d_right)
+        return (lower, upper) if found else None
+
+    @staticmethod
+    def _score(pair: Pair, degree: Dict[str, int], rigidity: "_Rigidity", target: int) -> int:
+        a, b = pair
+        a_rigid = a in rigidity.core
+        b_rigid = b in rigidity.core
+        if a_rigid != b_rigid:
+            # Edges into the rigid body, most valuable for devices closest to being placed.
+            return 2 + rigidity.links[b if a_rigid else a]
+        if a_rigid and (degree[a] < target or degree[b] < target):
+            # Redundant edges inside the rigid body, to absorb range noise.
+            return 1
+        return 0
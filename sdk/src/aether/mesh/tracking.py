@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Iterable, List, Mapping, Optional, Sequence, Tuple
 
 import numpy as np
 
+from ..sense.models import RangeEstimate
+from .trilateration import Anchor
+
 
 @dataclass
 class TrackState:
@@ -63,3 +66,186 @@ class ConstantVelocityFilter:
     def get_state(self) -> TrackState | None:
         return self._state
 
+
+@dataclass
+class ParticleFilterConfig:
+    particles: int = 1000
+    dims: int = 3
+    dt: float = 1.0
+    process_noise: float = 0.3
+    range_noise: float = 0.5
+    outlier_probability: float = 0.1
+    outlier_range: float = 30.0
+    resample_threshold: float = 0.5
+    bounds: Optional[Tuple[Sequence[float], Sequence[float]]] = None
+    seed: Optional[int] = None
+
+
+class ParticleFilterTracker:
+    """Track many devices at once from raw anchor ranges with a particle filter.
+
+    State is held in ``(tracks, particles, dims)`` arrays for position and velocity plus
+    ``(tracks, particles)`` log-weights, so every step is a handful of array operations
+    regardless of track count. The range likelihood is a Gaussian line-of-sight term
+    mixed with a uniform outlier term, which keeps multipath spikes from collapsing the
+    particle cloud, and particles reflect off ``bounds`` (e.g. room walls) instead of
+    leaving them. Systematic resampling runs for all degenerate tracks in one
+    ``searchsorted`` call.
+
+    Performance target: 1,000 tracks x 1,000 particles against 4 anchors sustains at
+    least 4 predict+update steps per second (4,000 track updates/sec) on a single CPU
+    core; check with ``scripts/bench_particle_filter.py``.
+    """
+
+    def __init__(
+        self,
+        anchors: Iterable[Anchor] | np.ndarray,
+        tracks: int,
+        config: Optional[ParticleFilterConfig] = None,
+    ) -> None:
+        self._config = config or ParticleFilterConfig()
+        dims = self._config.dims
+        if isinstance(anchors, np.ndarray):
+            self._anchor_ids: List[str] = [str(i) for i in range(len(anchors))]
+            positions = anchors
+        else:
+            anchors = list(anchors)
+            self._anchor_ids = [anchor.device_id for anchor in anchors]
+            positions = np.array([anchor.position for anchor in anchors], dtype=float)
+        self._anchors = np.asarray(positions, dtype=np.float32)[:, :dims]
+        self._rng = np.random.default_rng(self._config.seed)
+        shape = (tracks, self._config.particles, dims)
+        self._positions = np.zeros(shape, dtype=np.float32)
+        self._velocities = np.zeros(shape, dtype=np.float32)
+        self._log_weights = np.full(shape[:2], -np.log(self._config.particles), dtype=np.float32)
+        if self._config.bounds is not None:
+            low, high = self._config.bounds
+            self._low = np.asarray(low, dtype=np.float32)[:dims]
+            self._high = np.asarray(high, dtype=np.float32)[:dims]
+            self._positions[:] = self._rng.uniform(self._low, self._high, size=shape)
+
+    @property
+    def particles(self) -> np.ndarray:
+        return self._positions
+
+    @property
+    def weights(self) -> np.ndarray:
+        return np.exp(self._log_weights)
+
+    def initialize(self, positions: np.ndarray, spread: float = 1.0) -> None:
+        """Scatter each track's particles around ``positions`` of shape ``(tracks, dims)``."""
+        centres = np.asarray(positions, dtype=np.float32)[:, None, :]
+        noise = self._rng.standard_normal(self._positions.shape, dtype=np.float32)
+        self._positions[:] = centres + spread * noise
+        self._velocities[:] = 0.0
+        self._log_weights[:] = -np.log(self._config.particles)
+        self._reflect()
+
+    def predict(self, dt: Optional[float] = None) -> None:
+        dt = self._config.dt if dt is None else dt
+        noise = self._rng.standard_normal(self._velocities.shape, dtype=np.float32)
+        noise *= np.float32(self._config.process_noise * np.sqrt(dt))
+        self._velocities += noise
+        np.multiply(self._velocities, np.float32(dt), out=noise)
+        self._positions += noise
+        self._reflect()
+
+    def update(self, ranges: np.ndarray, range_noise: Optional[np.ndarray] = None) -> None:
+        """Weight particles by ``ranges`` of shape ``(tracks, anchors)``; NaN marks a missing range."""
+        cfg = self._config
+        ranges = np.asarray(ranges, dtype=np.float32)
+        observed = ~np.isnan(ranges)
+        sigma = np.float32(cfg.range_noise) if range_noise is None else np.asarray(range_noise, dtype=np.float32)
+
+        # |x - a|^2 = |x|^2 - 2 x.a + |a|^2, with the cross term as one matrix product.
+        tracks, particles, dims = self._positions.shape
+        flat = self._positions.reshape(-1, dims)
+        distance = (flat @ (-2 * self._anchors.T)).reshape(tracks, particles, -1)
+        distance += np.einsum("ij,ij->i", flat, flat).reshape(tracks, particles, 1)
+        distance += np.einsum("ij,ij->i", self._anchors, self._anchors)
+        np.maximum(distance, 0.0, out=distance)
+        np.sqrt(distance, out=distance)
+
+        # log((1 - eps) * N(error; 0, sigma) + eps / outlier_range), computed in place.
+        likelihood = np.subtract(np.where(observed, ranges, 0.0)[:, None, :], distance, out=distance)
+        if np.ndim(sigma) == 2:
+            likelihood /= sigma[:, None, :]
+            scale = ((1 - cfg.outlier_probability) / (np.sqrt(2 * np.pi) * sigma))[:, None, :]
+        else:
+            likelihood /= sigma
+            scale = np.float32((1 - cfg.outlier_probability) / (np.sqrt(2 * np.pi) * sigma))
+        np.square(likelihood, out=likelihood)
+        likelihood *= np.float32(-0.5)
+        np.exp(likelihood, out=likelihood)
+        likelihood *= scale
+        likelihood += np.float32(cfg.outlier_probability / cfg.outlier_range)
+        np.log(likelihood, out=likelihood)
+        likelihood *= observed[:, None, :]
+        self._log_weights += likelihood.sum(axis=2)
+        self._log_weights -= _logsumexp(self._log_weights)[:, None]
+
+        ess = 1.0 / np.sum(np.exp(2 * self._log_weights), axis=1)
+        degenerate = np.flatnonzero(ess < cfg.resample_threshold * cfg.particles)
+        if degenerate.size:
+            self._resample(degenerate)
+
+    def update_estimates(self, estimates: Sequence[Mapping[str, RangeEstimate]]) -> None:
+        """Update from per-track ``{anchor_id: RangeEstimate}`` maps, using estimate variance as noise."""
+        ranges = np.full((len(estimates), len(self._anchor_ids)), np.nan, dtype=np.float32)
+        noise = np.full(ranges.shape, self._config.range_noise, dtype=np.float32)
+        for row, per_anchor in enumerate(estimates):
+            for column, anchor_id in enumerate(self._anchor_ids):
+                estimate = per_anchor.get(anchor_id)
+                if estimate is not None:
+                    ranges[row, column] = estimate.distance
+                    noise[row, column] = max(np.sqrt(max(estimate.variance, 0.0)), 1e-2)
+        self.update(ranges, noise)
+
+    def step(self, ranges: np.ndarray, dt: Optional[float] = None) -> np.ndarray:
+        self.predict(dt)
+        self.update(ranges)
+        return self.estimate()
+
+    def estimate(self) -> np.ndarray:
+        """Weighted mean position per track, shape ``(tracks, dims)``."""
+        weights = np.exp(self._log_weights)
+        return np.einsum("tp,tpd->td", weights, self._positions)
+
+    # --- internal helpers ---
+
+    def _resample(self, tracks: np.ndarray) -> None:
+        count = self._config.particles
+        indices = systematic_resample(np.exp(self._log_weights[tracks]), self._rng)
+        flat = (indices + tracks[:, None] * count).ravel()
+        dims = self._positions.shape[2]
+        self._positions[tracks] = self._positions.reshape(-1, dims).take(flat, axis=0).reshape(len(tracks), count, dims)
+        self._velocities[tracks] = self._velocities.reshape(-1, dims).take(flat, axis=0).reshape(len(tracks), count, dims)
+        self._log_weights[tracks] = -np.log(count)
+
+    def _reflect(self) -> None:
+        if self._config.bounds is None:
+            return
+        below = self._positions < self._low
+        above = self._positions > self._high
+        np.subtract(2 * self._low, self._positions, out=self._positions, where=below)
+        np.subtract(2 * self._high, self._positions, out=self._positions, where=above)
+        below |= above
+        np.negative(self._velocities, out=self._velocities, where=below)
+
+
+def systematic_resample(weights: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Systematic resampling indices for each row of ``weights`` (rows need not be normalized)."""
+    rows, count = weights.shape
+    cumulative = np.cumsum(weights, axis=1, dtype=np.float64)
+    cumulative /= cumulative[:, -1:]
+    # Points (u + j) / count below each cumulative weight; differences are copy counts.
+    below = np.ceil(cumulative * count - rng.random((rows, 1)))
+    np.clip(below, 0, count, out=below)
+    below[:, -1] = count
+    copies = np.diff(below, axis=1, prepend=0).astype(np.int64).ravel()
+    return np.repeat(np.tile(np.arange(count), rows), copies).reshape(rows, count)
+
+
+def _logsumexp(values: np.ndarray) -> np.ndarray:
+    peak = values.max(axis=1)
+    return peak + np.log(np.exp(values - peak[:, None]).sum(axis=1))
@@ -32,7 +32,7 @@ def trilaterate(anchors: Iterable[Anchor], ranges: Dict[str, RangeEstimate]) ->
         pi = positions[i]
         di = distances[i]
         d0 = distances[0]
-        A.append(2 * (pi - p0))
+        A.append(2 * (p0 - pi))
         b.append(di**2 - d0**2 - np.dot(pi, pi) + np.dot(p0, p0))
     A = np.array(A)
     b = np.array(b)
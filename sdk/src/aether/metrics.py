@@ -0,0 +1,263 @@
+"""In-process timing spans, counters and fixed-bucket latency histograms.
+
+Instrumentation is off by default and then costs one flag check per call: :func:`span`
+hands back a shared no-op context manager and :func:`count` returns immediately.
+Enable it with :func:`enable` or ``AETHER_METRICS=1``. Read the collected values with
+:func:`snapshot`, or as Prometheus text with :func:`render_prometheus`.
+
+Spans in the pipeline:
+
+    interface.measure   one WiFiInterface measurement call (label ``method``)
+    collector.collect   sample collection for one estimate (label ``method``)
+    collector.distance  distance computation from the samples (label ``method``)
+    engine.fuse         RangingEngine.fuse
+    ml.refine           one MLRangeRefiner batch
+    storage.flush       one storage writer flush (label ``writer``)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Optional, Type
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = tuple[tuple[str, str], ...]
+MetricKey = tuple[str, Labels]
+
+
+@dataclass
+class HistogramSnapshot:
+    bounds: tuple[float, ...]
+    counts: list[int]  # per bucket; the last entry counts observations above every bound
+    count: int
+    sum: float
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            if bucket and seen + bucket >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                if index == len(self.bounds):
+                    return lower
+                return lower + (self.bounds[index] - lower) * (rank - seen) / bucket
+            seen += bucket
+        return self.bounds[-1]
+
+
+@dataclass
+class MetricsSnapshot:
+    counters: dict[MetricKey, float]
+    spans: dict[MetricKey, HistogramSnapshot]
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self.counters.get((name, _labels(labels)), 0.0)
+
+    def span(self, name: str, **labels: str) -> Optional[HistogramSnapshot]:
+        return self.spans.get((name, _labels(labels)))
+
+
+class Histogram:
+    """Thread-safe histogram over fixed bucket upper bounds."""
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> HistogramSnapshot:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        return HistogramSnapshot(self._bounds, counts, sum(counts), total)
+
+
+class MetricsRegistry:
+    """Named counters and span histograms, keyed by name and label values."""
+
+    def __init__(self, enabled: bool = False, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.enabled = enabled
+        self._bounds = bounds
+        self._counters: dict[MetricKey, float] = {}
+        self._histograms: dict[MetricKey, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, value: float = 1.0, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def span(self, name: str, **labels: str) -> "_Span | _NoopSpan":
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, (name, _labels(labels)))
+
+    def histogram(self, key: MetricKey) -> Histogram:
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self._bounds))
+        return histogram
+
+    def snapshot(self) -> MetricsSnapshot:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = dict(self._histograms)
+        return MetricsSnapshot(counters, {key: histogram.snapshot() for key, histogram in histograms.items()})
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self, prefix: str = "aether") -> str:
+        """Render every metric in the Prometheus text exposition format (0.0.4)."""
+        snapshot = self.snapshot()
+        lines: list[str] = []
+        families: dict[str, list[tuple[Labels, float]]] = {}
+        for (name, labels), value in sorted(snapshot.counters.items()):
+            families.setdefault(f"{prefix}_{_metric_name(name)}_total", []).append((labels, value))
+        for family, samples in families.items():
+            lines.append(f"# TYPE {family} counter")
+            lines.extend(f"{family}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        if snapshot.spans:
+            family = f"{prefix}_span_duration_seconds"
+            lines.append(f"# HELP {family} Wall time spent inside instrumented spans.")
+            lines.append(f"# TYPE {family} histogram")
+            for (name, labels), histogram in sorted(snapshot.spans.items()):
+                labels = (("span", name),) + labels
+                cumulative = 0
+                for bound, bucket in zip(histogram.bounds, histogram.counts):
+                    cumulative += bucket
+                    lines.append(
+                        f"{family}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {cumulative}"
+                    )
+                lines.append(f"{family}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{family}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                lines.append(f"{family}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+class _Span:
+    __slots__ = ("_registry", "_key", "_start")
+
+    def __init__(self, registry: MetricsRegistry, key: MetricKey) -> None:
+        self._registry = registry
+        self._key = key
+        self._start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self._registry.histogram(self._key).observe(time.perf_counter() - self._start)
+        if exc_type is not None:
+            name, labels = self._key
+            self._registry.count(f"{name}.errors", **dict(labels))
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+REGISTRY = MetricsRegistry(enabled=os.environ.get("AETHER_METRICS", "0").lower() in ("1", "true", "yes"))
+
+
+def enable() -> None:
+    REGISTRY.enabled = True
+
+
+def disable() -> None:
+    REGISTRY.enabled = False
+
+
+def enabled() -> bool:
+    return REGISTRY.enabled
+
+
+def span(name: str, **labels: str) -> "_Span | _NoopSpan":
+    """Time a ``with`` block into the ``name`` histogram of the default registry."""
+    if not REGISTRY.enabled:
+        return _NOOP
+    return _Span(REGISTRY, (name, _labels(labels)))
+
+
+def count(name: str, value: float = 1.0, **labels: str) -> None:
+    if REGISTRY.enabled:
+        REGISTRY.count(name, value, **labels)
+
+
+def snapshot() -> MetricsSnapshot:
+    return REGISTRY.snapshot()
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render_prometheus()
+
+
+def reset() -> None:
+    REGISTRY.reset()
+
+
+# --- internal helpers ---
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items())) if labels else ()
+
+
+def _metric_name(name: str) -> str:
+    return "".join(char if char.isalnum() else "_" for char in name)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
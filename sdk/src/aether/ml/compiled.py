@@ -0,0 +1,151 @@
+"""Dependency-free inference for exported tree-ensemble range models."""
+
+from __future__ import annotations
+
+import struct
+import zipfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+FORMAT_VERSION = 1
+_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+
+def flatten_ensemble(model: Any) -> dict[str, np.ndarray]:
+    """Flatten a fitted gradient-boosted regressor into node arrays.
+
+    All trees are concatenated into one node table. ``left``/``right`` hold absolute
+    node indices; leaves point to themselves so traversal can run a fixed number of
+    steps without branching. ``value`` already includes the learning rate and
+    ``base`` is the ensemble's initial prediction. Only fitted attributes are read, so
+    scikit-learn is needed by whoever trained the model, not here.
+    """
+    trees = [estimator.tree_ for estimator in np.ravel(model.estimators_)]
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    depth = 0
+    for tree in trees:
+        count = tree.node_count
+        nodes = np.arange(offset, offset + count, dtype=np.int64)
+        leaf = tree.children_left == -1
+        features.append(np.where(leaf, 0, tree.feature).astype(np.int64))
+        thresholds.append(np.where(leaf, np.inf, tree.threshold).astype(np.float64))
+        lefts.append(np.where(leaf, nodes, tree.children_left + offset).astype(np.int64))
+        rights.append(np.where(leaf, nodes, tree.children_right + offset).astype(np.int64))
+        values.append(tree.value.reshape(count, -1)[:, 0] * model.learning_rate)
+        roots.append(offset)
+        depth = max(depth, int(tree.max_depth))
+        offset += count
+
+    if model.init_ == "zero":
+        base = 0.0
+    else:
+        base = float(np.ravel(model.init_.predict(np.zeros((1, model.n_features_in_))))[0])
+    return {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.int64),
+        "meta": np.array([FORMAT_VERSION, depth, model.n_features_in_], dtype=np.int64),
+        "base": np.array([base], dtype=np.float64),
+    }
+
+
+def save_compiled(path: Path, arrays: dict[str, np.ndarray]) -> None:
+    """Write node arrays uncompressed so :func:`load_compiled` can memory-map them."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as handle:
+        np.savez(handle, **arrays)
+
+
+def load_compiled(path: Path, mmap: bool = True) -> "CompiledEnsemble":
+    arrays = _mmap_npz(path) if mmap else dict(np.load(path))
+    version, depth, n_features = (int(v) for v in arrays["meta"])
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compiled model version {version}")
+    return CompiledEnsemble(
+        *(arrays[name] for name in _ARRAYS),
+        base=float(arrays["base"][0]),
+        depth=depth,
+        n_features=n_features,
+    )
+
+
+class CompiledEnsemble:
+    """Vectorized evaluator over flattened tree arrays."""
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        base: float,
+        depth: int,
+        n_features: int,
+        chunk_size: int = 4096,
+    ) -> None:
+        # Plain ndarray views over the (possibly memory-mapped) buffers avoid memmap
+        # subclass overhead on every fancy-indexing step.
+        self._feature = np.asarray(feature)
+        self._threshold = np.asarray(threshold)
+        self._value = np.asarray(value)
+        # Interleaved children let one gather pick the branch: children[2 * node + went_right].
+        self._children = np.stack([np.asarray(left), np.asarray(right)], axis=1).ravel()
+        self._roots = np.asarray(roots, dtype=np.intp)
+        self._base = base
+        self._depth = depth
+        self._chunk_size = chunk_size
+        self.n_features_in_ = n_features
+
+    def predict(self, X: Any) -> np.ndarray:
+        # Trees split on float32 inputs, so compare in the same precision they were trained on.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input of shape (n, {self.n_features_in_}), got {X.shape}")
+        out = np.empty(X.shape[0])
+        for start in range(0, X.shape[0], self._chunk_size):
+            out[start : start + self._chunk_size] = self._predict_chunk(X[start : start + self._chunk_size])
+        return out
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        flat = X.ravel()
+        row_offset = (np.arange(X.shape[0], dtype=np.intp) * X.shape[1])[:, None]
+        node = np.broadcast_to(self._roots, (X.shape[0], self._roots.size))
+        for _ in range(self._depth):
+            went_right = flat.take(row_offset + self._feature.take(node)) > self._threshold.take(node)
+            node = self._children.take(2 * node + went_right)
+        return self._base + self._value.take(node).sum(axis=1)
+
+
+def _mmap_npz(path: Path) -> dict[str, np.ndarray]:
+    """Memory-map each member of an uncompressed ``.npz`` archive."""
+    arrays: dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as handle:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path} member {info.filename} is compressed and cannot be memory-mapped")
+            handle.seek(info.header_offset)
+            local_header = handle.read(30)
+            name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+            handle.seek(info.header_offset + 30 + name_length + extra_length)
+            major, _ = np.lib.format.read_magic(handle)
+            if major == 1:
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(handle)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(handle)
+            arrays[info.filename.removesuffix(".npy")] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=handle.tell(),
+                shape=shape,
+                order="F" if fortran else "C",
+            )
+    return arrays
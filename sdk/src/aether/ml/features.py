@@ -0,0 +1,175 @@
+"""Feature extraction shared by range-model training and inference."""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+from ..sense.collectors import SPEED_OF_LIGHT
+from ..sense.engine import ENVIRONMENTS, EnvironmentPreset
+from ..sense.models import RangeEstimate
+
+BASIC_FEATURES = ("mean", "std", "min", "max")
+EXTENDED_FEATURES = BASIC_FEATURES + (
+    "q10",
+    "q50",
+    "q90",
+    "mad",
+    "csi_subcarrier_std",
+    "csi_temporal_std",
+    "rssi_rtt_disagreement",
+)
+FEATURE_SETS: dict[str, tuple[str, ...]] = {"basic": BASIC_FEATURES, "extended": EXTENDED_FEATURES}
+METHOD_CODES = {"rssi": 0, "rtt": 1, "csi": 2}
+
+
+def feature_set_for(n_features: int) -> str:
+    for name, columns in FEATURE_SETS.items():
+        if len(columns) == n_features:
+            return name
+    raise ValueError(f"No feature set with {n_features} features")
+
+
+def segment_features(
+    values: np.ndarray,
+    lengths: np.ndarray,
+    methods: Optional[np.ndarray] = None,
+    subcarriers: Optional[np.ndarray] = None,
+    feature_set: str = "basic",
+    environment: Optional[EnvironmentPreset] = None,
+) -> np.ndarray:
+    """Features over consecutive segments of ``values`` with the given ``lengths``.
+
+    ``methods`` holds per-sample :data:`METHOD_CODES` and ``subcarriers`` the CSI
+    subcarrier index (negative when unknown); both only feed the extended set, as does
+    ``environment``, whose path-loss model converts RSSI to distance (the uncalibrated
+    ``"default"`` preset when omitted). Every
+    statistic is computed for all segments at once with segment reductions, so the
+    cost is a couple of sorts over the flattened samples. Empty segments produce NaN.
+    """
+    columns = FEATURE_SETS[feature_set]
+    features = np.full((len(lengths), len(columns)), np.nan)
+    nonempty = lengths > 0
+    if not nonempty.any():
+        return features
+    counts = lengths[nonempty]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    mean = np.add.reduceat(values, starts) / counts
+    deviation = values - np.repeat(mean, counts)
+    features[nonempty, 0] = mean
+    features[nonempty, 1] = np.sqrt(np.add.reduceat(deviation * deviation, starts) / counts)
+    features[nonempty, 2] = np.minimum.reduceat(values, starts)
+    features[nonempty, 3] = np.maximum.reduceat(values, starts)
+    if feature_set == "basic":
+        return features
+
+    group = np.repeat(np.arange(counts.size), counts)
+    ordered = values[np.lexsort((values, group))]
+    median = _segment_quantile(ordered, starts, counts, 0.5)
+    features[nonempty, 4] = _segment_quantile(ordered, starts, counts, 0.1)
+    features[nonempty, 5] = median
+    features[nonempty, 6] = _segment_quantile(ordered, starts, counts, 0.9)
+    spread = np.abs(values - np.repeat(median, counts))
+    features[nonempty, 7] = _segment_quantile(spread[np.lexsort((spread, group))], starts, counts, 0.5)
+
+    if methods is None:
+        methods = np.full(values.size, -1, dtype=np.int8)
+    if subcarriers is None:
+        subcarriers = np.full(values.size, -1, dtype=np.int64)
+    features[nonempty, 8], features[nonempty, 9] = _csi_statistics(values, group, methods, subcarriers, counts.size)
+    features[nonempty, 10] = _rssi_rtt_disagreement(
+        values, group, methods, counts.size, environment or ENVIRONMENTS["default"]
+    )
+    return features
+
+
+def extract_features(
+    estimates: Sequence[RangeEstimate],
+    feature_set: str = "basic",
+    environment: Optional[EnvironmentPreset] = None,
+) -> np.ndarray:
+    """Feature matrix for ``estimates``, computed in one vectorized pass over their samples."""
+    lengths = np.fromiter((len(estimate.raw) for estimate in estimates), dtype=np.int64, count=len(estimates))
+    total = int(lengths.sum())
+    values = np.fromiter(
+        (sample.value for estimate in estimates for sample in estimate.raw),
+        dtype=float,
+        count=total,
+    )
+    if feature_set == "basic":
+        return segment_features(values, lengths)
+    methods = np.fromiter(
+        (METHOD_CODES.get(sample.method, -1) for estimate in estimates for sample in estimate.raw),
+        dtype=np.int8,
+        count=total,
+    )
+    subcarriers = np.fromiter(
+        (sample.metadata.get("subcarrier", -1) for estimate in estimates for sample in estimate.raw),
+        dtype=np.int64,
+        count=total,
+    )
+    return segment_features(values, lengths, methods, subcarriers, feature_set, environment)
+
+
+def _segment_quantile(ordered: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """Linear-interpolated quantile of each sorted segment (NumPy's default method)."""
+    position = q * (counts - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    fraction = position - lower
+    return ordered[starts + lower] * (1 - fraction) + ordered[starts + upper] * fraction
+
+
+def _csi_statistics(
+    values: np.ndarray,
+    group: np.ndarray,
+    methods: np.ndarray,
+    subcarriers: np.ndarray,
+    groups: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Spread of mean magnitude across subcarriers, and mean spread of each subcarrier over frames."""
+    mask = (methods == METHOD_CODES["csi"]) & (subcarriers >= 0)
+    if not mask.any():
+        return np.zeros(groups), np.zeros(groups)
+    width = int(subcarriers[mask].max()) + 1
+    key = group[mask] * width + subcarriers[mask]
+    size = groups * width
+    count = np.bincount(key, minlength=size)
+    total = np.bincount(key, values[mask], minlength=size)
+    squares = np.bincount(key, values[mask] ** 2, minlength=size)
+    present = count > 0
+    cell_mean = np.divide(total, count, out=np.zeros(size), where=present)
+    cell_var = np.divide(squares, count, out=np.zeros(size), where=present) - cell_mean**2
+    cell_std = np.sqrt(np.maximum(cell_var, 0.0))
+
+    owner = np.arange(size) // width
+    cells = np.bincount(owner, present.astype(float), minlength=groups)
+    mean_of_means = np.divide(np.bincount(owner, cell_mean, minlength=groups), cells, out=np.zeros(groups), where=cells > 0)
+    spread = np.where(present, cell_mean - mean_of_means[owner], 0.0)
+    subcarrier_std = np.sqrt(
+        np.divide(np.bincount(owner, spread**2, minlength=groups), cells, out=np.zeros(groups), where=cells > 0)
+    )
+    temporal_std = np.divide(np.bincount(owner, cell_std, minlength=groups), cells, out=np.zeros(groups), where=cells > 0)
+    return subcarrier_std, temporal_std
+
+
+def _rssi_rtt_disagreement(
+    values: np.ndarray,
+    group: np.ndarray,
+    methods: np.ndarray,
+    groups: int,
+    environment: EnvironmentPreset,
+) -> np.ndarray:
+    """Relative gap between RSSI- and RTT-implied distances; 0 unless both are present."""
+    means = []
+    for code in (METHOD_CODES["rssi"], METHOD_CODES["rtt"]):
+        mask = methods == code
+        count = np.bincount(group[mask], minlength=groups)
+        total = np.bincount(group[mask], values[mask], minlength=groups)
+        means.append(np.divide(total, count, out=np.full(groups, np.nan), where=count > 0))
+    rssi_distance = 10 ** ((environment.tx_power - means[0]) / (10 * environment.path_loss_exponent))
+    rtt_distance = means[1] * SPEED_OF_LIGHT / 2
+    scale = np.maximum(np.maximum(rssi_distance, rtt_distance), 1e-6)
+    gap = np.abs(rssi_distance - rtt_distance) / scale
+    return np.nan_to_num(gap, nan=0.0)
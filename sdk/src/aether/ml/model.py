@@ -2,19 +2,29 @@
 
 from __future__ import annotations
 
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, Optional, Sequence
 
-import joblib
 import numpy as np
 
-from ..sense.models import RangeEstimate, SignalSample
+from .. import metrics
+from ..sense.engine import load_environment
+from ..sense.models import RangeEstimate
+from .compiled import load_compiled
+from .features import extract_features, feature_set_for
 
 
 @dataclass
 class MLConfig:
     model_path: Optional[Path] = None
+    feature_set: str = "auto"
+    environment: str = "default"  # calibration profile for the RSSI-derived features
+    profile_dir: Optional[Path] = None
 
 
 class MLRangeRefiner:
@@ -22,29 +32,145 @@ class MLRangeRefiner:
 
     def __init__(self, config: Optional[MLConfig] = None) -> None:
         self._config = config or MLConfig()
+        self._environment = load_environment(self._config.environment, self._config.profile_dir)
         self._model = None
+        self._feature_set = "basic" if self._config.feature_set == "auto" else self._config.feature_set
         if self._config.model_path and self._config.model_path.exists():
-            self._model = joblib.load(self._config.model_path)
+            self._model = load_model(self._config.model_path)
+            if self._config.feature_set == "auto" and hasattr(self._model, "n_features_in_"):
+                self._feature_set = feature_set_for(self._model.n_features_in_)
+
+    @property
+    def has_model(self) -> bool:
+        return self._model is not None
+
+    def refine(self, estimate: RangeEstimate) -> RangeEstimate:
+        return self.refine_many([estimate])[0]
+
+    def refine_many(self, estimates: Sequence[RangeEstimate]) -> list[RangeEstimate]:
+        """Refine a batch of estimates with a single ``predict`` call."""
+        estimates = list(estimates)
+        if self._model is None or not estimates:
+            return estimates
+        with metrics.span("ml.refine"):
+            refined = self._refine(estimates)
+        metrics.count("ml.estimates", len(estimates))
+        return refined
+
+    def _refine(self, estimates: list[RangeEstimate]) -> list[RangeEstimate]:
+        features = extract_features(estimates, self._feature_set, self._environment)
+        usable = np.flatnonzero(~np.isnan(features).any(axis=1))
+        refined = list(estimates)
+        if usable.size == 0:
+            return refined
+        distances = self._model.predict(features[usable])
+        for row, distance in zip(usable.tolist(), distances.tolist()):
+            estimate = estimates[row]
+            refined[row] = RangeEstimate(
+                timestamp=estimate.timestamp,
+                method="ml",
+                distance=float(distance),
+                variance=estimate.variance,
+                raw=estimate.raw,
+            )
+        return refined
+
+
+def load_model(path: Path) -> Any:
+    """Load a compiled ``.npz`` ensemble, or fall back to a pickled scikit-learn model."""
+    if path.suffix == ".npz":
+        return load_compiled(path)
+    import joblib
+
+    return joblib.load(path)
+
+
+class MicroBatchRefiner:
+    """Coalesce concurrent ``refine`` calls into batched ``refine_many`` calls.
+
+    Callers block on their own result while a worker thread gathers up to
+    ``max_batch`` pending estimates, waiting at most ``max_delay`` seconds after the
+    first one arrives, and refines them with one ``predict``.
+    """
+
+    _STOP = object()
+
+    def __init__(self, refiner: MLRangeRefiner, max_batch: int = 64, max_delay: float = 0.002) -> None:
+        self._refiner = refiner
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="aether-ml-batcher", daemon=True)
+        self._worker.start()
+
+    def __enter__(self) -> "MicroBatchRefiner":
+        return self
+
+    def __exit__(self, *exc: Any) -> Optional[bool]:
+        self.close()
+        return None
+
+    def submit(self, estimate: RangeEstimate) -> "Future[RangeEstimate]":
+        future: "Future[RangeEstimate]" = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatchRefiner is closed")
+            self._queue.put((estimate, future))
+        return future
 
     def refine(self, estimate: RangeEstimate) -> RangeEstimate:
-        if self._model is None:
-            return estimate
-        features = self._extract_features(estimate.raw)
-        distance = float(self._model.predict([features])[0])
-        return RangeEstimate(
-            timestamp=estimate.timestamp,
-            method="ml",
-            distance=distance,
-            variance=estimate.variance,
-            raw=estimate.raw,
-        )
-
-    def _extract_features(self, samples: Iterable[SignalSample]) -> list[float]:
-        values = np.array([sample.value for sample in samples])
-        return [
-            float(values.mean()),
-            float(values.std()),
-            float(values.min()),
-            float(values.max()),
-        ]
+        return self.submit(estimate).result()
+
+    def close(self) -> None:
+        """Refine everything already submitted, then stop the worker."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(self._STOP)
+        self._worker.join()
+
+    def _run(self) -> None:
+        try:
+            self._serve()
+        finally:
+            # Whatever stopped the worker, nothing queued now would ever be answered.
+            with self._lock:
+                self._closed = True
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not self._STOP:
+                    item[1].set_exception(RuntimeError("MicroBatchRefiner stopped before refining this estimate"))
 
+    def _serve(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self._max_delay
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                results = self._refiner.refine_many([estimate for estimate, _ in batch])
+            except BaseException as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                if not isinstance(exc, Exception):
+                    raise
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
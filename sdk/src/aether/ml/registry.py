@@ -0,0 +1,282 @@
+"""Versioned local model registry with hot-swapping refinement."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from ..sense.models import RangeEstimate
+from .model import MLConfig, MLRangeRefiner
+
+MANIFEST_NAME = "manifest.json"
+
+logger = logging.getLogger(__name__)
+
+
+class ModelIntegrityError(ValueError):
+    """A model file no longer matches the checksum recorded when it was published."""
+
+
+@dataclass
+class ModelVersion:
+    version: int
+    filename: str
+    created: str
+    sha256: str
+
+
+class ModelRegistry:
+    """Directory of immutable model versions plus a manifest naming the current one.
+
+    Layout::
+
+        root/manifest.json
+        root/v1/range_gbm.npz
+        root/v2/range_gbm.npz
+
+    Version directories are written completely before the manifest is replaced with an
+    atomic ``os.replace``, so readers only ever see a manifest pointing at a finished
+    model file. Readers load models through :meth:`verified_path`, which checks the
+    file against the SHA-256 recorded at publish time.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self._root = Path(root)
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def publish(self, model_path: Path, activate: bool = True) -> ModelVersion:
+        manifest = self._read_manifest()
+        version = max((entry["version"] for entry in manifest["versions"]), default=0) + 1
+        target_dir = self._root / f"v{version}"
+        target_dir.mkdir(parents=True, exist_ok=False)
+        target = target_dir / Path(model_path).name
+        shutil.copyfile(model_path, target)
+        entry = ModelVersion(
+            version=version,
+            filename=str(target.relative_to(self._root)),
+            created=datetime.utcnow().isoformat(),
+            sha256=_sha256(target),
+        )
+        manifest["versions"].append(asdict(entry))
+        if activate:
+            manifest["current"] = version
+        self._write_manifest(manifest)
+        return entry
+
+    def activate(self, version: int) -> None:
+        manifest = self._read_manifest()
+        if all(entry["version"] != version for entry in manifest["versions"]):
+            raise ValueError(f"Unknown model version {version}")
+        manifest["current"] = version
+        self._write_manifest(manifest)
+
+    def versions(self) -> list[ModelVersion]:
+        return [ModelVersion(**entry) for entry in self._read_manifest()["versions"]]
+
+    def current(self) -> Optional[ModelVersion]:
+        manifest = self._read_manifest()
+        for entry in manifest["versions"]:
+            if entry["version"] == manifest.get("current"):
+                return ModelVersion(**entry)
+        return None
+
+    def path_for(self, version: ModelVersion) -> Path:
+        return self._root / version.filename
+
+    def verified_path(self, version: ModelVersion) -> Path:
+        """Path of ``version``'s model file; raises :class:`ModelIntegrityError` on a checksum mismatch."""
+        path = self.path_for(version)
+        digest = _sha256(path)
+        if digest != version.sha256:
+            raise ModelIntegrityError(
+                f"Model v{version.version} at {path} has SHA-256 {digest}, expected {version.sha256}"
+            )
+        return path
+
+    def _read_manifest(self) -> dict[str, Any]:
+        path = self._root / MANIFEST_NAME
+        if not path.exists():
+            return {"current": None, "versions": []}
+        return json.loads(path.read_text())
+
+    def _write_manifest(self, manifest: dict[str, Any]) -> None:
+        self._root.mkdir(parents=True, exist_ok=True)
+        tmp = self._root / f".{MANIFEST_NAME}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, self._root / MANIFEST_NAME)
+
+
+@dataclass
+class VersionMetrics:
+    predictions: int = 0
+    calls: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        mean = self.total_latency / self.calls if self.calls else 0.0
+        return {
+            "predictions": self.predictions,
+            "calls": self.calls,
+            "mean_latency": mean,
+            "max_latency": self.max_latency,
+        }
+
+
+@dataclass
+class _Active:
+    version: Optional[int]
+    refiner: MLRangeRefiner
+    metrics: VersionMetrics
+
+
+class HotSwapRefiner:
+    """Refine with the registry's current model, picking up new versions in the background.
+
+    A daemon thread polls the manifest every ``poll_interval`` seconds. New versions are
+    loaded on that thread and published by replacing a single reference, so ``refine``
+    callers never wait on a load: each call reads the reference once and uses that
+    model for the whole call, even if a swap happens mid-flight. A version that fails
+    to load, for example because its file fails its checksum, is logged and
+    remembered as :attr:`rejected`. It is not retried, and the active model keeps
+    serving until the manifest names another version. Metrics count
+    only estimates a model actually predicted, not fallback pass-throughs. ``config``
+    supplies everything but the model path, such as the feature environment.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        poll_interval: float = 5.0,
+        background: bool = True,
+        config: Optional[MLConfig] = None,
+    ) -> None:
+        self._registry = registry
+        self._poll_interval = poll_interval
+        self._config = replace(config or MLConfig(), model_path=None)
+        self._metrics: dict[Optional[int], VersionMetrics] = {}
+        self._metrics_lock = threading.Lock()
+        self._active = self._make_active(None, MLRangeRefiner(self._config))
+        self._rejected: Optional[int] = None
+        self._stop = threading.Event()
+        self.poll_once()
+        self._thread: Optional[threading.Thread] = None
+        if background:
+            self._thread = threading.Thread(target=self._poll_loop, name="aether-model-registry", daemon=True)
+            self._thread.start()
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._active.version
+
+    @property
+    def rejected(self) -> Optional[int]:
+        """The last version that failed to load; cleared once another version loads."""
+        return self._rejected
+
+    def refine(self, estimate: RangeEstimate) -> RangeEstimate:
+        active = self._active
+        start = time.perf_counter()
+        refined = active.refiner.refine(estimate)
+        self._record(active, [estimate], [refined], time.perf_counter() - start)
+        return refined
+
+    def refine_many(self, estimates: Sequence[RangeEstimate]) -> list[RangeEstimate]:
+        active = self._active
+        estimates = list(estimates)
+        start = time.perf_counter()
+        refined = active.refiner.refine_many(estimates)
+        self._record(active, estimates, refined, time.perf_counter() - start)
+        return refined
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        with self._metrics_lock:
+            return {
+                "none" if version is None else f"v{version}": metrics.as_dict()
+                for version, metrics in self._metrics.items()
+            }
+
+    def poll_once(self) -> bool:
+        """Load and activate the registry's current version if it changed.
+
+        Raises :class:`ModelIntegrityError`, leaving the active model in place, when
+        the new version's file does not match its checksum. A version that failed
+        to load is skipped on later polls.
+        """
+        current = self._registry.current()
+        version = None if current is None else current.version
+        if version == self._active.version or (version is not None and version == self._rejected):
+            return False
+        if current is None:
+            refiner = MLRangeRefiner(self._config)
+        else:
+            try:
+                refiner = MLRangeRefiner(replace(self._config, model_path=self._registry.verified_path(current)))
+            except Exception:
+                self._rejected = version
+                raise
+        self._rejected = None
+        self._active = self._make_active(version, refiner)
+        return True
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _make_active(self, version: Optional[int], refiner: MLRangeRefiner) -> _Active:
+        with self._metrics_lock:
+            metrics = self._metrics.setdefault(version, VersionMetrics())
+        return _Active(version, refiner, metrics)
+
+    def _record(
+        self,
+        active: _Active,
+        estimates: Sequence[RangeEstimate],
+        refined: Sequence[RangeEstimate],
+        latency: float,
+    ) -> None:
+        if not active.refiner.has_model:
+            return
+        # The refiner returns an estimate unchanged when it could not predict it.
+        predictions = sum(after is not before for before, after in zip(estimates, refined))
+        metrics = active.metrics
+        with self._metrics_lock:
+            metrics.calls += 1
+            metrics.predictions += predictions
+            metrics.total_latency += latency
+            metrics.max_latency = max(metrics.max_latency, latency)
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self._poll_interval):
+            try:
+                self.poll_once()
+            except Exception:
+                # A broken version must not take down refinement; keep serving the
+                # active model. poll_once has recorded it, so it is not retried.
+                logger.warning(
+                    "Could not load the current model from %s; keeping v%s",
+                    self._registry.root,
+                    self._active.version,
+                    exc_info=True,
+                )
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,153 @@
+"""Shared pool of long-lived :class:`~aether.api.Aether` sessions."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+from .api import Aether
+
+PoolKey = tuple[str, Optional[str]]
+
+
+@dataclass
+class PoolConfig:
+    max_size: int = 16
+    idle_timeout: float = 300.0
+    max_concurrency: int = 4
+    acquire_timeout: Optional[float] = 30.0
+
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when no session can be opened or borrowed in time."""
+
+
+class _Entry:
+    def __init__(self, client: Aether, max_concurrency: int) -> None:
+        self.client = client
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+
+class AetherPool:
+    """Reuse ``Aether`` sessions keyed by ``(interface, csi_backend)``.
+
+    Opening an interface probes the backend, so sessions are kept open and handed out
+    by :meth:`session`. At most ``max_concurrency`` callers use one session at a time
+    (further callers wait up to ``acquire_timeout``). The pool holds at most
+    ``max_size`` sessions; opening a new one evicts the least recently used idle
+    session, and :meth:`evict_idle` closes sessions unused for ``idle_timeout``
+    seconds. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        config: Optional[PoolConfig] = None,
+        factory: Optional[Callable[[str, Optional[str]], Aether]] = None,
+    ) -> None:
+        self._config = config or PoolConfig()
+        self._factory = factory or _open_session
+        self._entries: "OrderedDict[PoolKey, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._opening = 0  # slots reserved by sessions being opened outside the lock
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def config(self) -> PoolConfig:
+        return self._config
+
+    @contextmanager
+    def session(self, interface: str, csi_backend: Optional[str] = None) -> Iterator[Aether]:
+        entry = self._checkout((interface, csi_backend))
+        try:
+            if not entry.slots.acquire(timeout=self._config.acquire_timeout):
+                raise PoolExhaustedError(f"Timed out waiting for interface {interface!r}")
+            try:
+                yield entry.client
+            finally:
+                entry.slots.release()
+        finally:
+            self._checkin(entry)
+
+    def evict_idle(self) -> int:
+        """Close sessions idle for longer than ``idle_timeout``; returns how many."""
+        cutoff = time.monotonic() - self._config.idle_timeout
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry.in_use == 0 and entry.last_used < cutoff]
+            evicted = [self._entries.pop(key) for key in stale]
+        for entry in evicted:
+            entry.client.close()
+        return len(evicted)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry.client.close()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "in_use": sum(entry.in_use for entry in self._entries.values()),
+                "max_size": self._config.max_size,
+            }
+
+    # --- internal helpers ---
+
+    def _checkout(self, key: PoolKey) -> _Entry:
+        evicted: Optional[_Entry] = None
+        with self._lock:
+            if self._closed:
+                raise PoolExhaustedError("Pool is closed")
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.in_use += 1
+                return entry
+            if len(self._entries) + self._opening >= self._config.max_size:
+                idle = next((k for k, e in self._entries.items() if e.in_use == 0), None)
+                if idle is None:
+                    raise PoolExhaustedError(f"All {self._config.max_size} pooled sessions are busy")
+                evicted = self._entries.pop(idle)
+            self._opening += 1
+        if evicted is not None:
+            evicted.client.close()
+        # Open outside the lock: backend setup can be slow and must not block other keys.
+        # The slot reserved above keeps concurrent openers from exceeding max_size.
+        try:
+            client = self._factory(*key)
+        except BaseException:
+            with self._lock:
+                self._opening -= 1
+            raise
+        with self._lock:
+            self._opening -= 1
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(client, self._config.max_concurrency)
+                client = None
+            entry.in_use += 1
+        if client is not None:
+            # Another caller opened the same key concurrently; keep theirs.
+            client.close()
+        return entry
+
+    def _checkin(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+
+
+def _open_session(interface: str, csi_backend: Optional[str]) -> Aether:
+    return Aether(interface=interface, csi_backend=csi_backend)
@@ -0,0 +1,139 @@
+"""Multi-point RSSI calibration: sweep reference distances and fit path-loss profiles."""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+import numpy as np
+
+from .engine import clear_environment_cache
+
+
+@dataclass
+class SweepPoint:
+    target: str
+    distance: float  # reference distance in metres
+    environment: str = "default"
+
+    @classmethod
+    def from_dict(cls, entry: dict[str, Any]) -> "SweepPoint":
+        return cls(
+            target=entry.get("target", entry.get("ip")),
+            distance=float(entry["distance"]),
+            environment=entry.get("environment", "default"),
+        )
+
+
+@dataclass
+class SweepSamples:
+    distance: np.ndarray  # (n,) reference distance per RSSI sample
+    rssi: np.ndarray  # (n,) dBm
+    environment: np.ndarray  # (n,) environment name per sample
+
+
+@dataclass
+class PathLossFit:
+    environment: str
+    tx_power: float  # fitted dBm at 1 m
+    path_loss_exponent: float
+    variance: float  # mean squared distance error of the fitted model, m^2
+    rmse_db: float
+    samples: int
+    distances: int  # distinct reference distances
+
+
+def load_sweep(path: Path) -> list[SweepPoint]:
+    """Read a sweep plan: a JSON list of ``{"target", "distance", "environment"?}``."""
+    return [SweepPoint.from_dict(entry) for entry in json.loads(Path(path).read_text())]
+
+
+def run_sweep(
+    measure: Callable[[str], Sequence[float]],
+    points: Sequence[SweepPoint],
+    workers: int = 8,
+) -> SweepSamples:
+    """Collect RSSI samples for every sweep point concurrently.
+
+    ``measure(target)`` returns a batch of RSSI readings (dBm) for one target, e.g.
+    the raw sample values of ``Aether.range(target, method="rssi")``.
+    """
+    with ThreadPoolExecutor(workers, thread_name_prefix="aether-calibrate") as executor:
+        readings = list(executor.map(lambda point: np.asarray(measure(point.target), dtype=float), points))
+    counts = np.array([values.size for values in readings])
+    return SweepSamples(
+        distance=np.repeat([point.distance for point in points], counts),
+        rssi=np.concatenate(readings) if readings else np.empty(0),
+        environment=np.repeat(np.array([point.environment for point in points], dtype=object), counts),
+    )
+
+
+def fit_path_loss(samples: SweepSamples) -> dict[str, PathLossFit]:
+    """Fit ``rssi = tx_power - 10 n log10(d)`` per environment by least squares.
+
+    All environments are solved at once from per-group sums (``np.bincount``) of the
+    closed-form simple regression, so cost is linear in the number of samples. Each
+    environment needs at least two distinct reference distances, and a fit whose
+    exponent is not positive (RSSI not falling with distance) is rejected.
+    """
+    if samples.rssi.size == 0:
+        return {}
+    names, group = np.unique(samples.environment.astype(str), return_inverse=True)
+    groups = names.size
+    x = -10.0 * np.log10(np.maximum(samples.distance, 1e-3))
+    y = samples.rssi
+
+    def total(weights: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.bincount(group, weights=weights, minlength=groups)
+
+    n, sx, sy, sxx, sxy = total(), total(x), total(y), total(x * x), total(x * y)
+    denominator = n * sxx - sx * sx
+    degenerate = denominator <= 1e-9 * np.maximum(n * sxx, 1.0)
+    if degenerate.any():
+        raise ValueError(f"Need at least two reference distances for {', '.join(names[degenerate])}")
+    exponent = (n * sxy - sx * sy) / denominator
+    tx_power = (sy - exponent * sx) / n
+    invalid = exponent <= 0
+    if invalid.any():
+        raise ValueError(
+            "Fitted path-loss exponent is not positive for "
+            + ", ".join(f"{name} ({value:.2f})" for name, value in zip(names[invalid], exponent[invalid]))
+            + "; check that RSSI falls with the reference distance"
+        )
+
+    residual = y - (tx_power[group] + exponent[group] * x)
+    predicted = 10 ** ((tx_power[group] - y) / (10 * exponent[group]))
+    rmse_db = np.sqrt(total(residual**2) / n)
+    variance = total((predicted - samples.distance) ** 2) / n
+    pairs = np.unique(np.column_stack([group, samples.distance]), axis=0)
+    distinct = np.bincount(pairs[:, 0].astype(np.intp), minlength=groups)
+    return {
+        name: PathLossFit(
+            environment=name,
+            tx_power=float(tx_power[index]),
+            path_loss_exponent=float(exponent[index]),
+            variance=float(variance[index]),
+            rmse_db=float(rmse_db[index]),
+            samples=int(n[index]),
+            distances=int(distinct[index]),
+        )
+        for index, name in enumerate(names.tolist())
+    }
+
+
+def write_profiles(fits: Iterable[PathLossFit], profile_dir: Path) -> list[Path]:
+    """Write ``<environment>.json`` profiles read by :func:`~aether.sense.engine.load_environment`."""
+    profile_dir = Path(profile_dir)
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for fit in fits:
+        path = profile_dir / f"{fit.environment}.json"
+        profile = dict(asdict(fit), fitted_at=datetime.utcnow().isoformat())
+        path.write_text(json.dumps(profile, indent=2))
+        written.append(path)
+    clear_environment_cache()
+    return written
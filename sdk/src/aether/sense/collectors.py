@@ -3,14 +3,23 @@
 from __future__ import annotations
 
 import math
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from datetime import datetime
+from pathlib import Path
 from statistics import mean, variance
-from typing import Iterable, Optional
+from typing import Callable, Iterable, Optional
 
+from .. import metrics
 from ..core.interface import WiFiInterface
+from .engine import ENVIRONMENTS, load_environment
 from .models import DeviceEstimate, RangeEstimate, SignalSample
 
+SPEED_OF_LIGHT = 299_792_458.0
+# Uncalibrated log-distance model parameters (the "default" environment).
+RSSI_TX_POWER = ENVIRONMENTS["default"].tx_power  # assumed dBm at 1 m
+RSSI_PATH_LOSS_EXPONENT = ENVIRONMENTS["default"].path_loss_exponent
+
 
 @dataclass
 class CollectorConfig:
@@ -18,6 +27,8 @@ class CollectorConfig:
     rtt_samples: int = 5
     csi_frames: int = 3
     smoothing: float = 0.5
+    environment: str = "default"  # calibration profile for the RSSI path-loss model
+    profile_dir: Optional[Path] = None
 
 
 class SignalCollector:
@@ -26,6 +37,7 @@ class SignalCollector:
     def __init__(self, interface: WiFiInterface, config: Optional[CollectorConfig] = None) -> None:
         self._iface = interface
         self._config = config or CollectorConfig()
+        self._environment = load_environment(self._config.environment, self._config.profile_dir)
 
     def estimate_range(self, target: str, method: str = "auto") -> RangeEstimate:
         if method == "auto":
@@ -37,18 +49,12 @@ class SignalCollector:
             else:
                 method = "rssi"
 
-        samples: list[SignalSample]
-        if method == "rssi":
-            samples = self._collect_rssi(target)
-            distance = self._distance_from_rssi(samples)
-        elif method == "rtt":
-            samples = self._collect_rtt(target)
-            distance = self._distance_from_rtt(samples)
-        elif method == "csi":
-            samples = self._collect_csi(target)
-            distance = self._distance_from_csi(samples)
-        else:
-            raise ValueError(f"Unknown method '{method}'")
+        collect, distance_from = self._stages(method)
+        with metrics.span("collector.collect", method=method):
+            samples = collect(target)
+        with metrics.span("collector.distance", method=method):
+            distance = distance_from(samples)
+        metrics.count("collector.samples", len(samples), method=method)
 
         variance_value = variance([sample.value for sample in samples]) if len(samples) > 1 else 0.0
         return RangeEstimate(
@@ -59,25 +65,57 @@ class SignalCollector:
             raw=samples,
         )
 
-    def enumerate_devices(self) -> Iterable[DeviceEstimate]:
-        for ip in self._iface.enumerate_devices():
-            try:
-                estimate = self.estimate_range(ip, method="auto")
-            except Exception:
-                continue
-            yield DeviceEstimate(ip=ip, estimate=estimate, metadata={})
+    def enumerate_devices(self, executor: Optional[Executor] = None) -> Iterable[DeviceEstimate]:
+        """Range every reachable device, concurrently on ``executor`` when given.
+
+        Devices whose measurement fails are skipped. Closing the generator early
+        cancels measurements that have not started yet.
+        """
+        targets = list(self._iface.enumerate_devices())
+        futures = None
+        if executor is not None:
+            futures = [executor.submit(self.estimate_range, ip, "auto") for ip in targets]
+        try:
+            for index, ip in enumerate(targets):
+                try:
+                    if futures is not None:
+                        estimate = futures[index].result()
+                    else:
+                        estimate = self.estimate_range(ip, method="auto")
+                except Exception:
+                    metrics.count("collector.errors")
+                    continue
+                yield DeviceEstimate(ip=ip, estimate=estimate, metadata={})
+        finally:
+            for future in futures or []:
+                future.cancel()
 
     def close(self) -> None:
         return None
 
     # --- internal helpers ---
 
+    def _stages(
+        self, method: str
+    ) -> tuple[Callable[[str], list[SignalSample]], Callable[[list[SignalSample]], float]]:
+        if method == "rssi":
+            return self._collect_rssi, self._distance_from_rssi
+        if method == "rtt":
+            return self._collect_rtt, self._distance_from_rtt
+        if method == "csi":
+            return self._collect_csi, self._distance_from_csi
+        raise ValueError(f"Unknown method '{method}'")
+
+    def _measure(self, method: str, measure: Callable[[str], float], target: str) -> float:
+        with metrics.span("interface.measure", method=method):
+            return measure(target)
+
     def _collect_rssi(self, target: str) -> list[SignalSample]:
         return [
             SignalSample(
                 timestamp=datetime.utcnow(),
                 method="rssi",
-                value=self._iface.measure_rssi(target),
+                value=self._measure("rssi", self._iface.measure_rssi, target),
                 metadata={},
             )
             for _ in range(self._config.rssi_samples)
@@ -88,7 +126,7 @@ class SignalCollector:
             SignalSample(
                 timestamp=datetime.utcnow(),
                 method="rtt",
-                value=self._iface.measure_rtt(target),
+                value=self._measure("rtt", self._iface.measure_rtt, target),
                 metadata={},
             )
             for _ in range(self._config.rtt_samples)
@@ -96,32 +134,32 @@ class SignalCollector:
 
     def _collect_csi(self, target: str) -> list[SignalSample]:
         frames = []
-        for frame in self._iface.capture_csi(target):
-            frames.append(frame)
-            if len(frames) >= self._config.csi_frames:
-                break
-        magnitudes = [abs(value) for frame in frames for value in frame]
+        with metrics.span("interface.measure", method="csi"):
+            for frame in self._iface.capture_csi(target):
+                frames.append(frame)
+                if len(frames) >= self._config.csi_frames:
+                    break
+        timestamp = datetime.utcnow()
         return [
             SignalSample(
-                timestamp=datetime.utcnow(),
+                timestamp=timestamp,
                 method="csi",
-                value=value,
-                metadata={},
+                value=abs(value),
+                metadata={"frame": frame_index, "subcarrier": subcarrier},
             )
-            for value in magnitudes
+            for frame_index, frame in enumerate(frames)
+            for subcarrier, value in enumerate(frame)
         ]
 
     def _distance_from_rssi(self, samples: list[SignalSample]) -> float:
-        # Placeholder log-distance formula
+        # Log-distance path loss with the environment's calibrated parameters
         avg_rssi = mean(sample.value for sample in samples)
-        tx_power = -40  # assumed dBm
-        path_loss_exponent = 2.2
-        return 10 ** ((tx_power - avg_rssi) / (10 * path_loss_exponent))
+        environment = self._environment
+        return 10 ** ((environment.tx_power - avg_rssi) / (10 * environment.path_loss_exponent))
 
     def _distance_from_rtt(self, samples: list[SignalSample]) -> float:
-        speed_of_light = 299_792_458.0
         avg_time = mean(sample.value for sample in samples)
-        return (avg_time * speed_of_light) / 2
+        return (avg_time * SPEED_OF_LIGHT) / 2
 
     def _distance_from_csi(self, samples: list[SignalSample]) -> float:
         # CSI distance estimation using magnitude (inverse relationship)
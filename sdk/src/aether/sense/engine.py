@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable
+import json
+import os
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional, Union
 
 import numpy as np
 
+from .. import metrics
 from .models import RangeEstimate
 
 
@@ -15,6 +20,7 @@ class EnvironmentPreset:
     name: str
     path_loss_exponent: float
     variance: float
+    tx_power: float = -40.0  # dBm at 1 m
 
 
 ENVIRONMENTS: dict[str, EnvironmentPreset] = {
@@ -24,12 +30,47 @@ ENVIRONMENTS: dict[str, EnvironmentPreset] = {
     "hospital": EnvironmentPreset("hospital", path_loss_exponent=2.4, variance=0.6),
 }
 
+DEFAULT_PROFILE_DIR = Path("data/calibration")
+
+
+def load_environment(name: str, profile_dir: Union[str, Path, None] = None) -> EnvironmentPreset:
+    """Return the preset for ``name`` with any calibration profile applied.
+
+    Profiles are ``<profile_dir>/<name>.json`` files written by
+    ``aether-calibrate --sweep``. ``profile_dir`` defaults to ``$AETHER_CALIBRATION_DIR`` or
+    ``data/calibration``. Fields present in the profile override the built-in preset
+    (unknown names start from ``"default"``). Profiles are read once per process; call
+    :func:`clear_environment_cache` after rewriting one.
+    """
+    if profile_dir is None:
+        profile_dir = os.environ.get("AETHER_CALIBRATION_DIR", DEFAULT_PROFILE_DIR)
+    return _load_environment(name, Path(profile_dir).resolve())
+
+
+def clear_environment_cache() -> None:
+    _load_environment.cache_clear()
+
+
+@lru_cache(maxsize=64)
+def _load_environment(name: str, profile_dir: Path) -> EnvironmentPreset:
+    preset = ENVIRONMENTS.get(name, replace(ENVIRONMENTS["default"], name=name))
+    path = profile_dir / f"{name}.json"
+    if not path.is_file():
+        return preset
+    profile = json.loads(path.read_text())
+    overrides = {
+        field.name: float(profile[field.name])
+        for field in fields(EnvironmentPreset)
+        if field.name != "name" and profile.get(field.name) is not None
+    }
+    return replace(preset, **overrides)
+
 
 class RangingEngine:
     """Fuse multiple range estimates into a calibrated prediction."""
 
-    def __init__(self, environment: str = "default") -> None:
-        self._environment = ENVIRONMENTS.get(environment, ENVIRONMENTS["default"])
+    def __init__(self, environment: str = "default", profile_dir: Optional[Path] = None) -> None:
+        self._environment = load_environment(environment, profile_dir)
         self._state_mean = None
         self._state_var = None
 
@@ -42,7 +83,12 @@ class RangingEngine:
         self._state_var = self._environment.variance
 
     def fuse(self, estimates: Iterable[RangeEstimate]) -> RangeEstimate:
-        estimates = list(estimates)
+        with metrics.span("engine.fuse"):
+            return self._fuse(list(estimates))
+
+    # --- internal helpers ---
+
+    def _fuse(self, estimates: list[RangeEstimate]) -> RangeEstimate:
         if not estimates:
             raise ValueError("No estimates provided")
 
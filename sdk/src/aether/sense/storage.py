@@ -2,13 +2,21 @@
 
 from __future__ import annotations
 
+import numbers
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Iterable
+from types import TracebackType
+from typing import Iterable, Mapping, Optional, Type
+from urllib.parse import quote
 
 import duckdb
 import pyarrow as pa
 import pyarrow.parquet as pq
 
+from .. import metrics
 from .models import RangeEstimate, SignalSample
 
 
@@ -26,24 +34,784 @@ def samples_to_table(samples: Iterable[SignalSample]) -> pa.Table:
 
 
 def write_samples_parquet(path: Path, samples: Iterable[SignalSample]) -> None:
+    """Write one in-memory Parquet file; see :class:`SampleArchiveWriter` for long captures."""
     table = samples_to_table(samples)
     path.parent.mkdir(parents=True, exist_ok=True)
     pq.write_table(table, path)
 
 
-def register_estimate(connection: duckdb.DuckDBPyConnection, estimate: RangeEstimate) -> None:
+SAMPLE_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.timestamp("us")),
+        ("target", pa.string()),
+        ("estimate_id", pa.string()),
+        ("value", pa.float64()),
+        ("metadata", pa.map_(pa.string(), pa.float64())),
+        ("tags", pa.map_(pa.string(), pa.string())),
+    ]
+)
+
+
+@dataclass
+class ArchiveConfig:
+    row_group_size: int = 131_072
+    max_rows_per_file: int = 4_194_304
+    compression: str = "zstd"
+
+
+class SampleArchiveWriter:
+    """Stream signal samples into a hive-partitioned Parquet archive.
+
+    Layout::
+
+        root/date=2024-05-01/interface=wlan0/method=rtt/part-<writer>-00000.parquet
+
+    Samples are buffered per partition and written one row group at a time with
+    ``pq.ParquetWriter`` against :data:`SAMPLE_SCHEMA`, so memory stays bounded by
+    ``row_group_size`` rows per open partition. Files roll over after
+    ``max_rows_per_file`` rows; every writer uses its own file prefix, so several
+    writers (or later sessions) can append to the same archive. Partition values live
+    only in the directory names; DuckDB's ``read_parquet(..., hive_partitioning = true)``
+    restores them as columns and prunes directories on filters. A file is readable once
+    it has been rolled over or the writer closed.
+
+    ``target`` and ``estimate_id`` are stored on every sample of a ``write`` call;
+    :class:`~aether.sense.validation.ValidationRunner` uses the id to tie samples to
+    their reference distance in ``validation_results``. Numeric metadata values
+    (booleans included) go to the ``metadata`` map as doubles; any other value is
+    stored as a string in ``tags``, and ``None`` values are dropped.
+    """
+
+    def __init__(self, root: Path, interface: str, config: Optional[ArchiveConfig] = None) -> None:
+        self._root = Path(root)
+        self._interface = interface
+        self._config = config or ArchiveConfig()
+        self._prefix = uuid.uuid4().hex[:12]
+        self._buffers: dict[tuple[str, str], _PartitionBuffer] = {}
+        self._files: dict[tuple[str, str], _PartitionFile] = {}
+        self._sequence = 0
+        self._closed = False
+        self.files_written: list[Path] = []
+
+    def write(
+        self,
+        samples: Iterable[SignalSample],
+        target: Optional[str] = None,
+        estimate_id: Optional[str] = None,
+    ) -> None:
+        if self._closed:
+            raise RuntimeError("SampleArchiveWriter is closed")
+        for sample in samples:
+            key = (sample.timestamp.date().isoformat(), sample.method)
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = _PartitionBuffer()
+            buffer.append(sample, target, estimate_id)
+            if len(buffer.values) >= self._config.row_group_size:
+                self._write_row_group(key)
+
+    def flush(self) -> None:
+        """Write every partially filled buffer as a (short) row group."""
+        for key in list(self._buffers):
+            self._write_row_group(key)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        for partition in self._files.values():
+            partition.writer.close()
+        self._files.clear()
+        self._closed = True
+
+    def __enter__(self) -> "SampleArchiveWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    # --- internal helpers ---
+
+    def _write_row_group(self, key: tuple[str, str]) -> None:
+        buffer = self._buffers.pop(key, None)
+        if buffer is None or not buffer.values:
+            return
+        with metrics.span("storage.flush", writer="archive"):
+            batch = buffer.to_batch()
+            partition = self._files.get(key)
+            if partition is None:
+                partition = self._files[key] = self._open(key)
+            partition.writer.write_batch(batch, row_group_size=self._config.row_group_size)
+        metrics.count("storage.rows", batch.num_rows, writer="archive")
+        partition.rows += batch.num_rows
+        if partition.rows >= self._config.max_rows_per_file:
+            partition.writer.close()
+            del self._files[key]
+
+    def _open(self, key: tuple[str, str]) -> "_PartitionFile":
+        date, method = key
+        directory = (
+            self._root
+            / f"date={date}"
+            / f"interface={quote(self._interface, safe='')}"
+            / f"method={quote(method, safe='')}"
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{self._prefix}-{self._sequence:05d}.parquet"
+        self._sequence += 1
+        self.files_written.append(path)
+        writer = pq.ParquetWriter(path, SAMPLE_SCHEMA, compression=self._config.compression)
+        return _PartitionFile(writer)
+
+
+class _PartitionBuffer:
+    def __init__(self) -> None:
+        self.timestamps: list[datetime] = []
+        self.targets: list[Optional[str]] = []
+        self.estimate_ids: list[Optional[str]] = []
+        self.values: list[float] = []
+        self.offsets: list[int] = [0]
+        self.keys: list[str] = []
+        self.items: list[float] = []
+        self.tag_offsets: list[int] = [0]
+        self.tag_keys: list[str] = []
+        self.tag_items: list[str] = []
+
+    def append(self, sample: SignalSample, target: Optional[str], estimate_id: Optional[str]) -> None:
+        self.timestamps.append(sample.timestamp)
+        self.targets.append(target)
+        self.estimate_ids.append(estimate_id)
+        self.values.append(sample.value)
+        for key, value in sample.metadata.items():
+            if value is None:
+                continue
+            if isinstance(value, numbers.Real):
+                self.keys.append(key)
+                self.items.append(float(value))
+            else:
+                self.tag_keys.append(key)
+                self.tag_items.append(str(value))
+        self.offsets.append(len(self.keys))
+        self.tag_offsets.append(len(self.tag_keys))
+
+    def to_batch(self) -> pa.RecordBatch:
+        metadata = pa.MapArray.from_arrays(
+            pa.array(self.offsets, type=pa.int32()),
+            pa.array(self.keys, type=pa.string()),
+            pa.array(self.items, type=pa.float64()),
+        )
+        tags = pa.MapArray.from_arrays(
+            pa.array(self.tag_offsets, type=pa.int32()),
+            pa.array(self.tag_keys, type=pa.string()),
+            pa.array(self.tag_items, type=pa.string()),
+        )
+        return pa.RecordBatch.from_arrays(
+            [
+                pa.array(self.timestamps, type=pa.timestamp("us")),
+                pa.array(self.targets, type=pa.string()),
+                pa.array(self.estimate_ids, type=pa.string()),
+                pa.array(self.values, type=pa.float64()),
+                metadata,
+                tags,
+            ],
+            schema=SAMPLE_SCHEMA,
+        )
+
+
+@dataclass
+class _PartitionFile:
+    writer: pq.ParquetWriter
+    rows: int = 0
+
+
+SCAN_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.timestamp("us")),
+        ("ip", pa.string()),
+        ("event", pa.string()),
+        ("method", pa.string()),
+        ("distance", pa.float64()),
+        ("variance", pa.float64()),
+    ]
+)
+
+
+class ScanArchiveWriter:
+    """Append device scan records to a Parquet archive partitioned by date and interface.
+
+    Layout::
+
+        root/date=2024-05-01/interface=wlan0/scan-<writer>-00000.parquet
+
+    ``write`` takes rows shaped like :data:`SCAN_SCHEMA` (mappings with those keys).
+    Rows are buffered per date and written a row group at a time, files roll over after
+    ``max_rows_per_file`` rows, and each writer uses its own file prefix, as with
+    :class:`SampleArchiveWriter`. ``flush`` writes short row groups early; files become
+    readable when rolled over or closed.
+    """
+
+    def __init__(self, root: Path, interface: str, config: Optional[ArchiveConfig] = None) -> None:
+        self._root = Path(root)
+        self._interface = interface
+        self._config = config or ArchiveConfig()
+        self._prefix = uuid.uuid4().hex[:12]
+        self._buffers: dict[str, dict[str, list]] = {}
+        self._files: dict[str, _PartitionFile] = {}
+        self._sequence = 0
+        self._closed = False
+        self.files_written: list[Path] = []
+
+    def write(self, rows: Iterable[Mapping[str, object]]) -> None:
+        if self._closed:
+            raise RuntimeError("ScanArchiveWriter is closed")
+        for row in rows:
+            date = row["timestamp"].date().isoformat()
+            buffer = self._buffers.get(date)
+            if buffer is None:
+                buffer = self._buffers[date] = {name: [] for name in SCAN_SCHEMA.names}
+            for name, column in buffer.items():
+                column.append(row.get(name))
+            if len(buffer["timestamp"]) >= self._config.row_group_size:
+                self._write_row_group(date)
+
+    def flush(self) -> None:
+        for date in list(self._buffers):
+            self._write_row_group(date)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        for partition in self._files.values():
+            partition.writer.close()
+        self._files.clear()
+        self._closed = True
+
+    def __enter__(self) -> "ScanArchiveWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    # --- internal helpers ---
+
+    def _write_row_group(self, date: str) -> None:
+        buffer = self._buffers.pop(date, None)
+        if buffer is None or not buffer["timestamp"]:
+            return
+        with metrics.span("storage.flush", writer="scans"):
+            batch = pa.RecordBatch.from_pydict(buffer, schema=SCAN_SCHEMA)
+            partition = self._files.get(date)
+            if partition is None:
+                partition = self._files[date] = self._open(date)
+            partition.writer.write_batch(batch, row_group_size=self._config.row_group_size)
+        metrics.count("storage.rows", batch.num_rows, writer="scans")
+        partition.rows += batch.num_rows
+        if partition.rows >= self._config.max_rows_per_file:
+            partition.writer.close()
+            del self._files[date]
+
+    def _open(self, date: str) -> _PartitionFile:
+        directory = self._root / f"date={date}" / f"interface={quote(self._interface, safe='')}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"scan-{self._prefix}-{self._sequence:05d}.parquet"
+        self._sequence += 1
+        self.files_written.append(path)
+        return _PartitionFile(pq.ParquetWriter(path, SCAN_SCHEMA, compression=self._config.compression))
+
+
+ESTIMATE_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.timestamp("us")),
+        ("method", pa.string()),
+        ("distance", pa.float64()),
+        ("variance", pa.float64()),
+        ("target", pa.string()),
+    ]
+)
+
+
+def ensure_schema(connection: duckdb.DuckDBPyConnection) -> None:
     connection.execute(
         """
         CREATE TABLE IF NOT EXISTS range_estimates (
             timestamp TIMESTAMP,
             method TEXT,
             distance DOUBLE,
-            variance DOUBLE
+            variance DOUBLE,
+            target TEXT
         )
         """
     )
+    # Databases created before estimates carried a target lack the column.
+    connection.execute("ALTER TABLE range_estimates ADD COLUMN IF NOT EXISTS target TEXT")
+
+
+def register_estimate(
+    connection: duckdb.DuckDBPyConnection,
+    estimate: RangeEstimate,
+    target: Optional[str] = None,
+) -> None:
+    """Insert a single estimate. Use :class:`EstimateWriter` for anything in a loop."""
+    ensure_schema(connection)
+    connection.execute(
+        "INSERT INTO range_estimates (timestamp, method, distance, variance, target) VALUES (?, ?, ?, ?, ?)",
+        [estimate.timestamp, estimate.method, estimate.distance, estimate.variance, target],
+    )
+
+
+class EstimateWriter:
+    """Buffer range estimates and append them to DuckDB in Arrow batches.
+
+    The schema is created once up front. ``write`` only appends to in-memory column
+    buffers; a background thread flushes them through DuckDB's Arrow scan whenever
+    ``batch_size`` rows are pending or ``flush_interval`` seconds have passed, and
+    ``close`` flushes whatever is left. Flushes run on a cursor of ``connection`` so the
+    caller can keep using the connection itself from its own thread. Rows whose insert
+    fails go back to the front of the buffer, and the background thread keeps retrying
+    them. Its error is re-raised from the next ``write``, ``flush`` or ``close``.
+    With ``rollups=True`` every flush also folds the new rows into the rollup tables.
+    """
+
+    def __init__(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        batch_size: int = 10_000,
+        flush_interval: float = 1.0,
+        background: bool = True,
+        rollups: bool = False,
+    ) -> None:
+        ensure_schema(connection)
+        if rollups:
+            ensure_rollups(connection)
+        self._rollups = rollups
+        self._cursor = connection.cursor()
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._columns = self._empty_columns()
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if background:
+            self._thread = threading.Thread(target=self._run, name="aether-estimate-writer", daemon=True)
+            self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        return len(self._columns[0])
+
+    def write(self, estimate: RangeEstimate, target: Optional[str] = None) -> None:
+        self.write_many([estimate], [target])
+
+    def write_many(
+        self,
+        estimates: Iterable[RangeEstimate],
+        targets: Optional[Iterable[Optional[str]]] = None,
+    ) -> None:
+        self._raise_pending_error()
+        if self._closed:
+            raise RuntimeError("EstimateWriter is closed")
+        estimates = list(estimates)
+        targets = [None] * len(estimates) if targets is None else list(targets)
+        with self._buffer_lock:
+            timestamps, methods, distances, variances, target_column = self._columns
+            for estimate, target in zip(estimates, targets):
+                timestamps.append(estimate.timestamp)
+                methods.append(estimate.method)
+                distances.append(estimate.distance)
+                variances.append(estimate.variance)
+                target_column.append(target)
+            full = len(timestamps) >= self._batch_size
+        if full:
+            if self._thread is None:
+                self.flush()
+            else:
+                self._wake.set()
+
+    def flush(self) -> int:
+        """Append all buffered estimates now; returns the number of rows written."""
+        self._raise_pending_error()
+        return self._flush()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.flush()
+        finally:
+            self._cursor.close()
+
+    def __enter__(self) -> "EstimateWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    # --- internal helpers ---
+
+    @staticmethod
+    def _empty_columns() -> tuple[list[datetime], list[str], list[float], list[float], list[Optional[str]]]:
+        return [], [], [], [], []
+
+    def _flush(self) -> int:
+        with self._flush_lock:
+            with self._buffer_lock:
+                columns, self._columns = self._columns, self._empty_columns()
+            if not columns[0]:
+                return 0
+            try:
+                with metrics.span("storage.flush", writer="estimates"):
+                    rows = self._insert(columns)
+            except BaseException:
+                # Nothing was inserted; keep the rows ahead of anything written since.
+                with self._buffer_lock:
+                    for kept, newer in zip(columns, self._columns):
+                        kept.extend(newer)
+                    self._columns = columns
+                raise
+            metrics.count("storage.rows", rows, writer="estimates")
+            if self._rollups:
+                # Rollups track their own watermark, so a failure here is caught up by
+                # the next flush without re-inserting the rows.
+                update_rollups(self._cursor)
+            return rows
+
+    def _insert(self, columns: tuple[list, ...]) -> int:
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, ESTIMATE_SCHEMA)],
+            schema=ESTIMATE_SCHEMA,
+        )
+        self._cursor.register("_estimate_batch", batch)
+        try:
+            self._cursor.execute(
+                "INSERT INTO range_estimates (timestamp, method, distance, variance, target) "
+                "SELECT timestamp, method, distance, variance, target FROM _estimate_batch"
+            )
+        finally:
+            self._cursor.unregister("_estimate_batch")
+        return batch.num_rows
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self._flush()
+            except BaseException as exc:  # surfaced to the caller on its next call
+                self._error = exc
+                if not isinstance(exc, Exception):
+                    return
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
+# Rollup granularities, finest first. Each level is a table of per-target
+# count/sum/sum-of-squares per bucket, so mean and variance combine by addition.
+ROLLUP_LEVELS: dict[str, timedelta] = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1)}
+
+
+def ensure_rollups(connection: duckdb.DuckDBPyConnection) -> None:
+    ensure_schema(connection)
+    for level in ROLLUP_LEVELS:
+        connection.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS range_rollup_{level} (
+                bucket TIMESTAMP,
+                target TEXT,
+                count BIGINT,
+                sum DOUBLE,
+                sumsq DOUBLE,
+                PRIMARY KEY (bucket, target)
+            )
+            """
+        )
     connection.execute(
-        "INSERT INTO range_estimates VALUES (?, ?, ?, ?)",
-        [estimate.timestamp, estimate.method, estimate.distance, estimate.variance],
+        "CREATE TABLE IF NOT EXISTS range_rollup_watermark (name TEXT PRIMARY KEY, last_rowid BIGINT)"
     )
 
+
+def update_rollups(connection: duckdb.DuckDBPyConnection) -> int:
+    """Fold estimates inserted since the last update into every rollup level.
+
+    Progress is tracked as the highest ``range_estimates`` rowid already folded in, so
+    each update scans only new rows. This relies on ``range_estimates`` being
+    append-only; deleting rows would need a rebuild (drop the rollup tables). Returns
+    the number of estimates folded in.
+    """
+    ensure_rollups(connection)
+    connection.execute("BEGIN TRANSACTION")
+    try:
+        low = _rollup_watermark(connection)
+        high = connection.execute("SELECT max(rowid) FROM range_estimates").fetchone()[0]
+        if high is None or high <= low:
+            connection.execute("COMMIT")
+            return 0
+        for level in ROLLUP_LEVELS:
+            connection.execute(
+                f"""
+                INSERT INTO range_rollup_{level}
+                SELECT date_trunc('{level}', timestamp), coalesce(target, ''),
+                       count(*), sum(distance), sum(distance * distance)
+                FROM range_estimates
+                WHERE rowid > ? AND rowid <= ?
+                GROUP BY ALL
+                ON CONFLICT (bucket, target) DO UPDATE SET
+                    count = count + excluded.count,
+                    sum = sum + excluded.sum,
+                    sumsq = sumsq + excluded.sumsq
+                """,
+                [low, high],
+            )
+        folded = connection.execute(
+            "SELECT count(*) FROM range_estimates WHERE rowid > ? AND rowid <= ?", [low, high]
+        ).fetchone()[0]
+        connection.execute(
+            "INSERT OR REPLACE INTO range_rollup_watermark VALUES ('range_estimates', ?)", [high]
+        )
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    return folded
+
+
+def choose_rollup(start: datetime, end: datetime, resolution: timedelta) -> Optional[str]:
+    """Coarsest rollup level whose buckets tile both ``resolution`` and ``[start, end)``."""
+    epoch = datetime(2000, 1, 1, tzinfo=start.tzinfo)
+    for level, width in reversed(ROLLUP_LEVELS.items()):
+        if resolution % width or (start - epoch) % width or (end - epoch) % width:
+            continue
+        return level
+    return None
+
+
+def query_range_stats(
+    connection: duckdb.DuckDBPyConnection,
+    start: datetime,
+    end: datetime,
+    resolution: timedelta = timedelta(minutes=1),
+    targets: Optional[Iterable[str]] = None,
+) -> pa.Table:
+    """Per-target count, mean and variance of distance per ``resolution`` bucket.
+
+    Reads from the coarsest rollup that answers ``[start, end)`` exactly and adds any
+    estimates not yet folded in, so results match a raw scan even between updates.
+    Falls back to scanning ``range_estimates`` when no rollup fits or the rollup tables
+    have not been created (see :func:`ensure_rollups`); the query itself never writes,
+    so read-only connections work. Estimates without a target are reported under ``''``.
+    """
+    if resolution.total_seconds() < 1 or resolution % timedelta(seconds=1):
+        raise ValueError("resolution must be a whole number of seconds")
+    level = choose_rollup(start, end, resolution)
+    if level is not None and not _has_rollups(connection, level):
+        level = None
+    params: list[object] = []
+    target_filter = ""
+    if targets is not None:
+        targets = list(targets)
+        target_filter = f"AND coalesce(target, '') IN ({', '.join('?' * len(targets))})" if targets else "AND FALSE"
+
+    raw = f"""
+        SELECT timestamp AS bucket, coalesce(target, '') AS target,
+               1 AS count, distance AS sum, distance * distance AS sumsq
+        FROM range_estimates
+        WHERE timestamp >= ? AND timestamp < ? {target_filter} {{extra}}
+    """
+    if level is None:
+        source = raw.format(extra="")
+        params += [start, end, *(targets or [])]
+    else:
+        watermark = _rollup_watermark(connection)
+        source = f"""
+            SELECT bucket, target, count, sum, sumsq
+            FROM range_rollup_{level}
+            WHERE bucket >= ? AND bucket < ? {target_filter}
+            UNION ALL
+            {raw.format(extra="AND rowid > ?")}
+        """
+        params += [start, end, *(targets or []), start, end, *(targets or []), watermark]
+
+    seconds = int(resolution.total_seconds())
+    return connection.execute(
+        f"""
+        SELECT time_bucket(INTERVAL {seconds} SECOND, bucket) AS bucket, target,
+               sum(count) AS count,
+               sum(sum) / sum(count) AS mean,
+               greatest(sum(sumsq) / sum(count) - (sum(sum) / sum(count)) ** 2, 0) AS variance
+        FROM ({source})
+        GROUP BY ALL
+        ORDER BY bucket, target
+        """,
+        params,
+    ).to_arrow_table()
+
+
+def _has_rollups(connection: duckdb.DuckDBPyConnection, level: str) -> bool:
+    """Whether ``level``'s rollup table and the watermark table exist."""
+    found = connection.execute(
+        """
+        SELECT count(*) FROM duckdb_tables()
+        WHERE database_name = current_database() AND schema_name = current_schema()
+          AND table_name IN (?, 'range_rollup_watermark')
+        """,
+        [f"range_rollup_{level}"],
+    ).fetchone()[0]
+    return found == 2
+
+
+def _rollup_watermark(connection: duckdb.DuckDBPyConnection) -> int:
+    row = connection.execute(
+        "SELECT last_rowid FROM range_rollup_watermark WHERE name = 'range_estimates'"
+    ).fetchone()
+    return -1 if row is None else int(row[0])
+
+
+def query_estimates(
+    connection: duckdb.DuckDBPyConnection,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    targets: Optional[Iterable[str]] = None,
+    methods: Optional[Iterable[str]] = None,
+    after: Optional[int] = None,
+    limit: Optional[int] = None,
+    batch_rows: int = 65_536,
+) -> tuple[pa.RecordBatchReader, Optional[int]]:
+    """Stream filtered ``range_estimates`` rows in rowid order as Arrow record batches.
+
+    Pagination is keyset-based: pass the returned cursor as ``after`` to continue.
+    The cursor (the last rowid of a full page) is found with a rowid-only query first,
+    so it is known before any row is streamed; it is ``None`` on the final page.
+    Each row carries its ``rowid`` as ``id``.
+    """
+    clauses = ["TRUE"]
+    params: list[object] = []
+    if start is not None:
+        clauses.append("timestamp >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append("timestamp < ?")
+        params.append(end)
+    for column, values in (("target", targets), ("method", methods)):
+        if values is not None:
+            values = list(values)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})" if values else "FALSE")
+            params.extend(values)
+    if after is not None:
+        clauses.append("rowid > ?")
+        params.append(after)
+    where = " AND ".join(clauses)
+
+    cursor = None
+    if limit is not None:
+        row = connection.execute(
+            f"SELECT rowid FROM range_estimates WHERE {where} ORDER BY rowid LIMIT 1 OFFSET ?",
+            [*params, limit - 1],
+        ).fetchone()
+        if row is not None:
+            cursor = int(row[0])
+            where += " AND rowid <= ?"
+            params.append(cursor)
+    reader = connection.execute(
+        f"""
+        SELECT rowid AS id, timestamp, method, distance, variance, target
+        FROM range_estimates WHERE {where} ORDER BY rowid
+        """,
+        params,
+    ).to_arrow_reader(batch_rows)
+    return reader, cursor
+
+
+class ReadOnlyConnectionPool:
+    """Hand out read-only cursors on a DuckDB file without holding its lock.
+
+    DuckDB lets only one process open a file for writing, and any open connection
+    keeps the file locked. The pool opens the file read-only on demand, shares that
+    database between up to ``size`` concurrent cursors, and closes it once no cursor
+    has been in use for ``idle_timeout`` seconds, so a writer process (for example
+    ``scripts/validate.py``) can take the file between bursts of reads.
+    """
+
+    def __init__(self, path: Path, size: int = 4, idle_timeout: float = 2.0) -> None:
+        self._path = Path(path)
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._connection: Optional[duckdb.DuckDBPyConnection] = None
+        self._in_use = 0
+        self._timer: Optional[threading.Timer] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def acquire(self, timeout: Optional[float] = None) -> duckdb.DuckDBPyConnection:
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No read connection available")
+        try:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if self._connection is None:
+                    self._connection = duckdb.connect(str(self._path), read_only=True)
+                cursor = self._connection.cursor()
+                self._in_use += 1
+            return cursor
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, cursor: duckdb.DuckDBPyConnection) -> None:
+        cursor.close()
+        with self._lock:
+            self._in_use -= 1
+            if self._in_use == 0 and self._connection is not None:
+                self._timer = threading.Timer(self._idle_timeout, self._close_idle)
+                self._timer.daemon = True
+                self._timer.start()
+        self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _close_idle(self) -> None:
+        with self._lock:
+            if self._in_use == 0 and self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            self._timer = None
@@ -0,0 +1,292 @@
+"""Concurrent validation runs against reference distances, reported from DuckDB."""
+
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+import duckdb
+import pyarrow as pa
+
+from .models import RangeEstimate
+from .storage import EstimateWriter, SampleArchiveWriter
+
+RESULT_SCHEMA = pa.schema(
+    [
+        ("run_id", pa.string()),
+        ("timestamp", pa.timestamp("us")),
+        ("target", pa.string()),
+        ("environment", pa.string()),
+        ("requested_method", pa.string()),
+        ("method", pa.string()),
+        ("repetition", pa.int32()),
+        ("distance", pa.float64()),
+        ("variance", pa.float64()),
+        ("reference", pa.float64()),
+        ("latency", pa.float64()),
+        ("error", pa.string()),
+        ("estimate_id", pa.string()),
+    ]
+)
+
+Ranger = Callable[[str, str], RangeEstimate]
+
+
+@dataclass
+class ValidationTarget:
+    ip: str
+    method: str = "auto"
+    reference: Optional[float] = None  # ground-truth distance in metres
+    environment: str = "default"
+
+    @classmethod
+    def from_dict(cls, entry: dict[str, Any]) -> "ValidationTarget":
+        reference = entry.get("reference", entry.get("distance"))
+        return cls(
+            ip=entry["ip"],
+            method=entry.get("method", "auto"),
+            reference=float(reference) if reference is not None else None,
+            environment=entry.get("environment", "default"),
+        )
+
+
+@dataclass
+class ValidationConfig:
+    repetitions: int = 5
+    workers: int = 16
+    batch_size: int = 10_000
+
+
+def load_targets(path: Path) -> list[ValidationTarget]:
+    """Read a targets JSON list: ``{"ip", "method"?, "distance"?, "environment"?}``."""
+    return [ValidationTarget.from_dict(entry) for entry in json.loads(Path(path).read_text())]
+
+
+def ensure_validation_schema(connection: duckdb.DuckDBPyConnection) -> None:
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS validation_runs (
+            run_id VARCHAR PRIMARY KEY,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            interface VARCHAR,
+            targets INTEGER,
+            repetitions INTEGER
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS validation_results (
+            run_id VARCHAR,
+            timestamp TIMESTAMP,
+            target VARCHAR,
+            environment VARCHAR,
+            requested_method VARCHAR,
+            method VARCHAR,
+            repetition INTEGER,
+            distance DOUBLE,
+            variance DOUBLE,
+            reference DOUBLE,
+            latency DOUBLE,
+            error VARCHAR,
+            estimate_id VARCHAR
+        )
+        """
+    )
+    # Databases created before results were linked to archived samples lack the column.
+    connection.execute("ALTER TABLE validation_results ADD COLUMN IF NOT EXISTS estimate_id VARCHAR")
+
+
+class ValidationRunner:
+    """Range every target ``repetitions`` times on a thread pool and store the results.
+
+    ``ranger(target, method)`` performs one measurement, typically ``Aether.range``.
+    Its wall time is recorded as the estimate's collection latency. A failed
+    measurement is stored with its error message instead of aborting the run.
+    Results are appended to ``validation_results`` in Arrow batches of ``batch_size``
+    rows. Successful estimates also go through :class:`EstimateWriter` into
+    ``range_estimates``. With an ``archive``, each successful estimate's raw samples
+    are written to it under the result's ``estimate_id``, which gives
+    ``ml/pipelines/train_streaming.py`` labelled training data.
+    """
+
+    def __init__(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        ranger: Ranger,
+        config: Optional[ValidationConfig] = None,
+        archive: Optional[SampleArchiveWriter] = None,
+    ) -> None:
+        ensure_validation_schema(connection)
+        self._connection = connection
+        self._ranger = ranger
+        self._config = config or ValidationConfig()
+        self._archive = archive
+
+    def run(
+        self,
+        targets: Sequence[ValidationTarget],
+        interface: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> str:
+        """Validate ``targets`` and return the new run id."""
+        run_id = uuid.uuid4().hex
+        started = datetime.utcnow()
+        jobs = [(target, repetition) for target in targets for repetition in range(self._config.repetitions)]
+        buffer = _ResultBuffer(run_id)
+        cursor = self._connection.cursor()
+        try:
+            with EstimateWriter(self._connection, batch_size=self._config.batch_size) as estimates:
+                with ThreadPoolExecutor(self._config.workers, thread_name_prefix="aether-validate") as executor:
+                    futures = [executor.submit(self._measure, target) for target, _ in jobs]
+                    pending = dict(zip(futures, jobs))
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        target, repetition = pending.pop(future)
+                        estimate, latency, error = future.result()
+                        estimate_id = uuid.uuid4().hex if estimate is not None else None
+                        buffer.append(target, repetition, estimate, latency, error, estimate_id)
+                        if estimate is not None:
+                            estimates.write(estimate, target=target.ip)
+                            if self._archive is not None:
+                                self._archive.write(estimate.raw, target=target.ip, estimate_id=estimate_id)
+                        if len(buffer) >= self._config.batch_size:
+                            buffer.flush(cursor)
+                        if progress is not None:
+                            progress(done, len(jobs))
+            buffer.flush(cursor)
+            cursor.execute(
+                "INSERT INTO validation_runs VALUES (?, ?, ?, ?, ?, ?)",
+                [run_id, started, datetime.utcnow(), interface, len(targets), self._config.repetitions],
+            )
+        finally:
+            cursor.close()
+        return run_id
+
+    def _measure(self, target: ValidationTarget) -> tuple[Optional[RangeEstimate], float, Optional[str]]:
+        start = time.perf_counter()
+        try:
+            estimate = self._ranger(target.ip, target.method)
+        except Exception as exc:
+            return None, time.perf_counter() - start, f"{type(exc).__name__}: {exc}"
+        return estimate, time.perf_counter() - start, None
+
+
+def validation_report(connection: duckdb.DuckDBPyConnection, run_id: str) -> pa.Table:
+    """Per environment and method: error and latency distributions for one run.
+
+    Error columns are in metres and cover only results with a reference distance.
+    Latency columns are in milliseconds.
+    """
+    return connection.execute(
+        """
+        SELECT
+            environment,
+            method,
+            count(*) AS estimates,
+            count(reference) AS referenced,
+            avg(abs(distance - reference)) AS mae,
+            sqrt(avg((distance - reference) ^ 2)) AS rmse,
+            avg(distance - reference) AS bias,
+            quantile_cont(abs(distance - reference), 0.5) AS error_p50,
+            quantile_cont(abs(distance - reference), 0.9) AS error_p90,
+            quantile_cont(abs(distance - reference), 0.95) AS error_p95,
+            avg(latency) * 1000 AS latency_mean_ms,
+            quantile_cont(latency, 0.5) * 1000 AS latency_p50_ms,
+            quantile_cont(latency, 0.9) * 1000 AS latency_p90_ms,
+            quantile_cont(latency, 0.99) * 1000 AS latency_p99_ms
+        FROM validation_results
+        WHERE run_id = ? AND error IS NULL
+        GROUP BY environment, method
+        UNION ALL
+        SELECT environment, requested_method || ' (failed)', count(*), 0,
+            NULL, NULL, NULL, NULL, NULL, NULL,
+            avg(latency) * 1000, quantile_cont(latency, 0.5) * 1000,
+            quantile_cont(latency, 0.9) * 1000, quantile_cont(latency, 0.99) * 1000
+        FROM validation_results
+        WHERE run_id = ? AND error IS NOT NULL
+        GROUP BY environment, requested_method
+        ORDER BY environment, method
+        """,
+        [run_id, run_id],
+    ).to_arrow_table()
+
+
+def format_report(report: pa.Table) -> str:
+    """Render :func:`validation_report` output as a fixed-width text table."""
+    header = (
+        f"{'environment':<12}{'method':<16}{'n':>7}{'MAE':>8}{'p50':>8}{'p90':>8}{'p95':>8}"
+        f"{'lat p50':>10}{'lat p99':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for row in report.to_pylist():
+        lines.append(
+            f"{row['environment']:<12}{row['method']:<16}{row['estimates']:>7}"
+            f"{_metres(row['mae'])}{_metres(row['error_p50'])}{_metres(row['error_p90'])}{_metres(row['error_p95'])}"
+            f"{row['latency_p50_ms']:>8.1f}ms{row['latency_p99_ms']:>8.1f}ms"
+        )
+    return "\n".join(lines)
+
+
+# --- internal helpers ---
+
+
+class _ResultBuffer:
+    def __init__(self, run_id: str) -> None:
+        self._run_id = run_id
+        self._rows: list[dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def append(
+        self,
+        target: ValidationTarget,
+        repetition: int,
+        estimate: Optional[RangeEstimate],
+        latency: float,
+        error: Optional[str],
+        estimate_id: Optional[str] = None,
+    ) -> None:
+        self._rows.append(
+            {
+                "run_id": self._run_id,
+                "timestamp": estimate.timestamp if estimate is not None else datetime.utcnow(),
+                "target": target.ip,
+                "environment": target.environment,
+                "requested_method": target.method,
+                "method": estimate.method if estimate is not None else None,
+                "repetition": repetition,
+                "distance": estimate.distance if estimate is not None else None,
+                "variance": estimate.variance if estimate is not None else None,
+                "reference": target.reference,
+                "latency": latency,
+                "error": error,
+                "estimate_id": estimate_id,
+            }
+        )
+
+    def flush(self, cursor: duckdb.DuckDBPyConnection) -> int:
+        rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        batch = pa.RecordBatch.from_pylist(rows, schema=RESULT_SCHEMA)
+        cursor.register("_validation_batch", batch)
+        try:
+            cursor.execute(
+                f"INSERT INTO validation_results ({', '.join(RESULT_SCHEMA.names)}) "
+                f"SELECT {', '.join(RESULT_SCHEMA.names)} FROM _validation_batch"
+            )
+        finally:
+            cursor.unregister("_validation_batch")
+        return batch.num_rows
+
+
+def _metres(value: Optional[float]) -> str:
+    return f"{value:>7.2f}m" if value is not None else f"{'-':>8}"
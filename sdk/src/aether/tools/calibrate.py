@@ -4,10 +4,14 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import Optional
 
 import typer
 
 from ..api import Aether
+from ..sense.calibration import fit_path_loss, load_sweep, run_sweep, write_profiles
+from ..sense.collectors import CollectorConfig
+from ..sense.engine import DEFAULT_PROFILE_DIR
 
 app = typer.Typer()
 
@@ -15,11 +19,22 @@ app = typer.Typer()
 @app.command()
 def calibrate(
     interface: str = typer.Option(..., help="Interface name"),
-    target: str = typer.Option(..., help="Target IP or MAC"),
-    distance: float = typer.Option(..., help="Reference distance in meters"),
+    target: Optional[str] = typer.Option(None, help="Target IP or MAC"),
+    distance: Optional[float] = typer.Option(None, help="Reference distance in meters"),
     environment: str = typer.Option("default", help="Environment profile name"),
-    output: Path = typer.Option(Path("data/calibration/profile.json"), help="Output profile path"),
+    output: Optional[Path] = typer.Option(None, help="Output profile path (single point) or directory (--sweep)"),
+    sweep: Optional[Path] = typer.Option(
+        None, help="JSON sweep plan of {target, distance, environment} points; fits path-loss profiles"
+    ),
+    samples: int = typer.Option(20, help="RSSI samples per sweep point"),
+    workers: int = typer.Option(8, help="Sweep points measured concurrently"),
 ) -> None:
+    if sweep is not None:
+        _calibrate_sweep(interface, sweep, samples, workers, output or DEFAULT_PROFILE_DIR)
+        return
+    if target is None or distance is None:
+        raise typer.BadParameter("--target and --distance are required without --sweep")
+    output = output or Path("data/calibration/profile.json")
     client = Aether(interface)
     estimate = client.range(target)
     client.close()
@@ -34,6 +49,23 @@ def calibrate(
     typer.echo(f"Wrote calibration profile to {output}")
 
 
+def _calibrate_sweep(interface: str, plan: Path, samples: int, workers: int, profile_dir: Path) -> None:
+    points = load_sweep(plan)
+    client = Aether(interface, collector_config=CollectorConfig(rssi_samples=samples))
+    try:
+        measured = run_sweep(
+            lambda target: [sample.value for sample in client.range(target, method="rssi").raw], points, workers
+        )
+    finally:
+        client.close()
+    fits = fit_path_loss(measured)
+    for path, fit in zip(write_profiles(fits.values(), profile_dir), fits.values()):
+        typer.echo(
+            f"{fit.environment}: tx_power={fit.tx_power:.1f} dBm exponent={fit.path_loss_exponent:.2f} "
+            f"rmse={fit.rmse_db:.2f} dB ({fit.samples} samples, {fit.distances} distances) -> {path}"
+        )
+
+
 def main() -> None:
     app()
 
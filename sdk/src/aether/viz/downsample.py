@@ -0,0 +1,67 @@
+"""Shape-preserving downsampling for long range histories."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+
+def lttb_indices(x: Any, y: Any, threshold: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept. The points between them are split
+    into ``threshold - 2`` equal buckets. From each bucket LTTB keeps the point that
+    forms the largest triangle with the previously kept point and the mean of the
+    next bucket, so peaks and dips survive where plain striding would drop them.
+    ``x`` must be sorted. Datetime values are fine.
+    """
+    x = _numeric(x)
+    y = np.asarray(y, dtype=float)
+    count = x.size
+    if x.shape != y.shape or x.ndim != 1:
+        raise ValueError("x and y must be one-dimensional and the same length")
+    if threshold >= count or count <= 2:
+        return np.arange(count)
+    if threshold < 3:
+        raise ValueError("threshold must be at least 3")
+
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.intp)
+    # Mean of each bucket, computed up front from cumulative sums; the last bucket's
+    # successor is the final point itself.
+    x_sums = np.concatenate([[0.0], np.cumsum(x)])
+    y_sums = np.concatenate([[0.0], np.cumsum(y)])
+    sizes = edges[1:] - edges[:-1]
+    x_means = np.append((x_sums[edges[1:]] - x_sums[edges[:-1]]) / sizes, x[-1])
+    y_means = np.append((y_sums[edges[1:]] - y_sums[edges[:-1]]) / sizes, y[-1])
+
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0], selected[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        cx, cy = x_means[bucket + 1], y_means[bucket + 1]
+        areas = np.abs((ax - cx) * (y[start:stop] - ay) - (ax - x[start:stop]) * (cy - ay))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def lttb(x: Any, y: Any, threshold: int) -> tuple[np.ndarray, np.ndarray]:
+    """Downsample ``(x, y)`` to at most ``threshold`` points with :func:`lttb_indices`."""
+    x, y = np.asarray(x), np.asarray(y)
+    indices = lttb_indices(x, y, threshold)
+    return x[indices], y[indices]
+
+
+# --- internal helpers ---
+
+
+def _numeric(values: Any) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype == object:
+        values = values.astype("datetime64[ns]")
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return values.astype(float)
@@ -1,33 +1,250 @@
-"""Export utilities for spatial data."""
+"""Export utilities for spatial data.
+
+:class:`GeoJSONWriter` streams features to disk one at a time, so exports of
+millions of positions run in constant memory. Positions come from
+:mod:`aether.mesh`, either trilaterated against anchors or read from a tracker.
+"""
 
 from __future__ import annotations
 
+import gzip
+import io
 import json
+import math
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable
-
-from ..mesh.trilateration import Anchor
-from ..sense.models import DeviceEstimate
-
-
-def export_geojson(path: Path, devices: Iterable[DeviceEstimate]) -> None:
-    features = []
-    for device in devices:
-        features.append(
-            {
-                "type": "Feature",
-                "properties": {"ip": device.ip, "distance": device.estimate.distance},
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [
-                        device.estimate.distance,
-                        0,
-                        0,
-                    ],
-                },
-            }
+from types import TracebackType
+from typing import Any, Iterable, Iterator, Mapping, Optional, Sequence, TextIO, Type
+
+import numpy as np
+
+from ..mesh.tracking import ParticleFilterTracker
+from ..mesh.trilateration import Anchor, trilaterate
+from ..sense.models import DeviceEstimate, RangeEstimate
+
+GEOJSON_FORMATS = ("geojson", "geojsonseq", "ndjson")
+EARTH_RADIUS = 6_378_137.0  # WGS84 equatorial radius, metres
+
+_RECORD_SEPARATOR = "\x1e"  # RFC 8142 GeoJSON text sequence prefix
+
+
+@dataclass
+class PositionedDevice:
+    device_id: str
+    position: Optional[Sequence[float]]  # local metres; None writes a null geometry
+    properties: dict[str, Any] = field(default_factory=dict)
+
+
+class GeoJSONWriter:
+    """Write Point features incrementally as compact GeoJSON.
+
+    ``format`` selects the layout:
+
+    - ``"geojson"``: a single FeatureCollection, header and footer written around
+      the features as they arrive.
+    - ``"geojsonseq"``: RFC 8142 text sequence, one record-separator-prefixed
+      feature per line.
+    - ``"ndjson"``: one feature per line.
+
+    Output is gzip-compressed when ``compress`` is true or, by default, when the
+    path ends in ``.gz``. Positions are local metres. With ``origin=(lon, lat)`` they
+    are taken as east/north offsets from that point and converted to WGS84
+    longitude/latitude; otherwise they are written unchanged. ``precision`` rounds
+    coordinates to that many decimals.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        format: str = "geojson",
+        compress: Optional[bool] = None,
+        origin: Optional[tuple[float, float]] = None,
+        precision: Optional[int] = None,
+    ) -> None:
+        if format not in GEOJSON_FORMATS:
+            raise ValueError(f"Unknown GeoJSON format {format!r}; expected one of {', '.join(GEOJSON_FORMATS)}")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if compress is None:
+            compress = path.suffix == ".gz"
+        self._format = format
+        self._origin = origin
+        self._precision = precision
+        self._stream: TextIO = (
+            io.TextIOWrapper(gzip.open(path, "wb", compresslevel=6), encoding="utf-8")
+            if compress
+            else open(path, "w", encoding="utf-8")
         )
-    payload = {"type": "FeatureCollection", "features": features}
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2))
+        self._prefix = _RECORD_SEPARATOR if format == "geojsonseq" else ""
+        self._suffix = "" if format == "geojson" else "\n"
+        self._count = 0
+        if format == "geojson":
+            self._stream.write('{"type":"FeatureCollection","features":[')
+
+    @property
+    def features_written(self) -> int:
+        return self._count
+
+    def write(
+        self,
+        device_id: str,
+        position: Optional[Sequence[float]],
+        properties: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        coordinates = None
+        if position is not None:
+            coordinates = [float(value) for value in position]
+            if self._origin is not None:
+                coordinates[:2] = map(float, _to_lonlat(coordinates[0], coordinates[1], self._origin))
+        self._write_feature(device_id, coordinates, properties)
+
+    def write_many(self, devices: Iterable[PositionedDevice]) -> int:
+        """Write every device from ``devices``; returns the number written."""
+        written = 0
+        for device in devices:
+            self.write(device.device_id, device.position, device.properties)
+            written += 1
+        return written
+
+    def write_array(
+        self,
+        device_ids: Sequence[str],
+        positions: np.ndarray,
+        properties: Optional[Mapping[str, Sequence[Any]]] = None,
+    ) -> int:
+        """Write an ``(n, dims)`` position array with columnar ``properties``.
+
+        The coordinate projection is vectorized, which keeps bulk exports of
+        tracker output cheap.
+        """
+        positions = np.asarray(positions, dtype=float)
+        if positions.ndim != 2 or positions.shape[0] != len(device_ids):
+            raise ValueError("positions must have shape (len(device_ids), dims)")
+        if self._origin is not None and positions.shape[1] >= 2:
+            positions = positions.copy()
+            positions[:, 0], positions[:, 1] = _to_lonlat(positions[:, 0], positions[:, 1], self._origin)
+        columns = {
+            name: values.tolist() if isinstance(values, np.ndarray) else list(values)
+            for name, values in (properties or {}).items()
+        }
+        for row, (device_id, coordinates) in enumerate(zip(device_ids, positions.tolist())):
+            self._write_feature(device_id, coordinates, {name: values[row] for name, values in columns.items()})
+        return len(device_ids)
+
+    def close(self) -> None:
+        if self._stream.closed:
+            return
+        if self._format == "geojson":
+            self._stream.write("]}")
+        self._stream.close()
+
+    def __enter__(self) -> "GeoJSONWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def _write_feature(
+        self,
+        device_id: str,
+        coordinates: Optional[list[float]],
+        properties: Optional[Mapping[str, Any]],
+    ) -> None:
+        if coordinates is None or not all(math.isfinite(value) for value in coordinates):
+            geometry = "null"
+        else:
+            if self._precision is not None:
+                coordinates = [round(value, self._precision) for value in coordinates]
+            geometry = f'{{"type":"Point","coordinates":[{",".join(map(repr, coordinates))}]}}'
+        separator = "," if self._format == "geojson" and self._count else ""
+        self._stream.write(
+            f'{separator}{self._prefix}{{"type":"Feature","id":{json.dumps(str(device_id))},'
+            f'"geometry":{geometry},"properties":{_compact(properties) if properties else "{}"}}}{self._suffix}'
+        )
+        self._count += 1
+
+
+def trilaterated_positions(
+    anchors: Iterable[Anchor],
+    observations: Iterable[tuple[str, Mapping[str, RangeEstimate]]],
+) -> Iterator[PositionedDevice]:
+    """Lazily trilaterate each ``(device_id, ranges by anchor id)`` observation.
+
+    Only anchors with a range are used; devices ranged by fewer than three anchors
+    are skipped.
+    """
+    anchors = list(anchors)
+    for device_id, ranges in observations:
+        visible = [anchor for anchor in anchors if anchor.device_id in ranges]
+        if len(visible) < 3:
+            continue
+        yield PositionedDevice(
+            device_id,
+            trilaterate(visible, dict(ranges)),
+            {"source": "trilaterated", "anchors": len(visible)},
+        )
+
+
+def tracked_positions(device_ids: Sequence[str], tracker: ParticleFilterTracker) -> Iterator[PositionedDevice]:
+    """Yield the current tracker estimate for each track, in track order."""
+    positions = tracker.estimate()
+    if positions.shape[0] != len(device_ids):
+        raise ValueError(f"Tracker has {positions.shape[0]} tracks but {len(device_ids)} device ids were given")
+    for device_id, position in zip(device_ids, positions.tolist()):
+        yield PositionedDevice(device_id, position, {"source": "tracked"})
+
+
+def stream_geojson(path: Path, devices: Iterable[PositionedDevice], **options: Any) -> int:
+    """Write ``devices`` through a :class:`GeoJSONWriter`; returns the feature count."""
+    with GeoJSONWriter(path, **options) as writer:
+        return writer.write_many(devices)
+
+
+def export_geojson(
+    path: Path,
+    devices: Iterable[DeviceEstimate],
+    positions: Optional[Mapping[str, Sequence[float]]] = None,
+    **options: Any,
+) -> int:
+    """Export ranged devices, placed at ``positions[ip]`` when known.
+
+    A range alone does not locate a device, so devices without a position get a
+    null geometry and keep their distance in the properties.
+    """
+    positions = positions or {}
+    return stream_geojson(
+        path,
+        (
+            PositionedDevice(
+                device.ip,
+                positions.get(device.ip),
+                {
+                    "ip": device.ip,
+                    "distance": device.estimate.distance,
+                    "variance": device.estimate.variance,
+                    "method": device.estimate.method,
+                },
+            )
+            for device in devices
+        ),
+        **options,
+    )
+
+
+# --- internal helpers ---
+
+
+def _to_lonlat(east: Any, north: Any, origin: tuple[float, float]) -> tuple[Any, Any]:
+    lon0, lat0 = origin
+    lat = lat0 + np.degrees(north / EARTH_RADIUS)
+    lon = lon0 + np.degrees(east / (EARTH_RADIUS * np.cos(np.radians(lat0))))
+    return lon, lat
+
 
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
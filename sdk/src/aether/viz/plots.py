@@ -1,12 +1,22 @@
-"""Visualization helpers."""
+"""Visualization helpers.
+
+The large-data builders use WebGL (``Scattergl``) traces fed from NumPy arrays,
+so position maps and range histories stay responsive with thousands of devices.
+:class:`LiveFigure` patches an existing figure in place rather than rebuilding it.
+"""
 
 from __future__ import annotations
 
-from typing import Iterable
+import hashlib
+from typing import Any, Iterable, Mapping, Optional, Sequence
 
+import numpy as np
 import plotly.graph_objects as go
 
 from ..sense.models import DeviceEstimate
+from .downsample import lttb
+
+HISTORY_POINTS = 2_000  # points kept per range history after downsampling
 
 
 def range_bar_chart(estimates: Iterable[DeviceEstimate]) -> go.Figure:
@@ -19,3 +29,148 @@ def range_bar_chart(estimates: Iterable[DeviceEstimate]) -> go.Figure:
     fig.update_layout(title="Device Distances", xaxis_title="Device", yaxis_title="Distance (m)")
     return fig
 
+
+def position_map(
+    device_ids: Sequence[str],
+    positions: np.ndarray,
+    color: Optional[Sequence[float]] = None,
+    color_title: str = "Variance",
+) -> go.Figure:
+    """Plot ``(n, 2+)`` positions, e.g. tracker estimates, as one WebGL marker trace."""
+    return _figure(
+        position_trace(device_ids, positions, color, color_title),
+        title="Device Positions",
+        xaxis_title="x (m)",
+        yaxis_title="y (m)",
+        yaxis={"scaleanchor": "x", "scaleratio": 1},
+    )
+
+
+def position_trace(
+    device_ids: Sequence[str],
+    positions: np.ndarray,
+    color: Optional[Sequence[float]] = None,
+    color_title: str = "Variance",
+) -> dict[str, Any]:
+    """Trace properties for :func:`position_map`, also usable with :meth:`LiveFigure.update`."""
+    positions = np.asarray(positions, dtype=float)
+    if positions.ndim != 2 or positions.shape[1] < 2:
+        raise ValueError("positions must have shape (devices, dims) with dims >= 2")
+    marker: dict[str, Any] = {"size": 6}
+    if color is not None:
+        marker.update(color=np.asarray(color, dtype=float), colorscale="Viridis", colorbar={"title": color_title})
+    return {
+        "name": "devices",
+        "x": positions[:, 0],
+        "y": positions[:, 1],
+        "mode": "markers",
+        "text": list(device_ids),
+        "hoverinfo": "text+x+y",
+        "marker": marker,
+    }
+
+
+def range_history_chart(
+    histories: Mapping[str, tuple[Sequence[Any], Sequence[float]]],
+    max_points: int = HISTORY_POINTS,
+) -> go.Figure:
+    """Plot ``{device: (timestamps, distances)}`` as WebGL lines, one trace per device.
+
+    Each history is reduced to at most ``max_points`` points with LTTB, which keeps
+    its peaks and dips.
+    """
+    traces = [history_trace(device, times, distances, max_points) for device, (times, distances) in histories.items()]
+    return _figure(
+        *traces,
+        title="Range History",
+        xaxis_title="Time",
+        yaxis_title="Distance (m)",
+    )
+
+
+def history_trace(
+    device: str,
+    timestamps: Sequence[Any],
+    distances: Sequence[float],
+    max_points: int = HISTORY_POINTS,
+) -> dict[str, Any]:
+    """Downsampled trace properties for one device's range history."""
+    x, y = lttb(timestamps, np.asarray(distances, dtype=float), max_points)
+    return {"name": device, "x": x, "y": y, "mode": "lines"}
+
+
+class LiveFigure:
+    """Keep a figure's traces in sync with changing data, sending only what changed.
+
+    :meth:`update` takes trace properties keyed by trace name. Unknown names become
+    new ``Scattergl`` traces. For existing traces, only the properties whose content
+    changed since the last update are assigned, inside one ``batch_update``. A
+    ``go.FigureWidget`` passed as ``figure`` therefore sends a single small message
+    to the browser per update instead of re-rendering the whole plot. Named traces
+    already in ``figure`` are adopted rather than duplicated; their first update
+    assigns every property given.
+    """
+
+    def __init__(self, figure: Optional[go.Figure] = None) -> None:
+        self._figure = figure if figure is not None else go.Figure()
+        self._traces: dict[str, Any] = {}
+        self._digests: dict[str, dict[str, str]] = {}
+        self._index()
+
+    @property
+    def figure(self) -> go.Figure:
+        return self._figure
+
+    def update(self, traces: Mapping[str, Mapping[str, Any]]) -> list[str]:
+        """Apply ``{name: properties}`` and return the names of traces that changed."""
+        changed = []
+        with self._figure.batch_update():
+            for name, properties in traces.items():
+                digests = {key: _digest(value) for key, value in properties.items()}
+                previous = self._digests.get(name)
+                if previous is None:
+                    self._figure.add_trace(go.Scattergl(**{**properties, "name": name}))
+                    self._traces[name] = self._figure.data[-1]
+                    self._digests[name] = digests
+                    changed.append(name)
+                    continue
+                patch = {key: properties[key] for key, digest in digests.items() if previous.get(key) != digest}
+                if patch:
+                    self._traces[name].update(patch)
+                    previous.update(digests)
+                    changed.append(name)
+        return changed
+
+    def remove(self, names: Iterable[str]) -> None:
+        names = set(names)
+        self._figure.data = [trace for trace in self._figure.data if trace.name not in names]
+        for name in names:
+            self._digests.pop(name, None)
+        self._index()
+
+    def _index(self) -> None:
+        self._traces.clear()
+        for trace in self._figure.data:
+            if trace.name is not None and trace.name not in self._traces:
+                self._traces[trace.name] = trace
+                self._digests.setdefault(trace.name, {})
+
+
+# --- internal helpers ---
+
+
+def _figure(*traces: Mapping[str, Any], title: str, **layout: Any) -> go.Figure:
+    fig = go.Figure([go.Scattergl(**trace) for trace in traces])
+    fig.update_layout(title=title, uirevision=title, **layout)
+    return fig
+
+
+def _digest(value: Any) -> str:
+    if isinstance(value, Mapping):
+        return "{" + ",".join(f"{key}:{_digest(item)}" for key, item in sorted(value.items())) + "}"
+    array = np.asarray(value)
+    if array.dtype.kind in "biufcmM":
+        payload = np.ascontiguousarray(array).tobytes() + array.dtype.str.encode() + str(array.shape).encode()
+    else:
+        payload = repr(array.tolist()).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
@@ -0,0 +1,180 @@
+"""Continuous scanning over one long-lived :class:`~aether.api.Aether` session."""
+
+from __future__ import annotations
+
+import json
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Optional, Protocol, TextIO
+
+from .api import Aether
+from .sense.storage import ArchiveConfig, ScanArchiveWriter
+
+
+@dataclass
+class WatchConfig:
+    interval: float = 2.0  # seconds between scan starts
+    workers: int = 4  # targets ranged concurrently per scan
+    changes_only: bool = False
+    threshold: float = 0.1  # metres a device must move to count as changed
+
+
+@dataclass
+class ScanEvent:
+    timestamp: datetime
+    ip: str
+    event: str  # "new", "update" or "lost"
+    method: Optional[str] = None
+    distance: Optional[float] = None
+    variance: Optional[float] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        row = asdict(self)
+        row["timestamp"] = self.timestamp.isoformat()
+        return row
+
+
+class ScanSink(Protocol):
+    def write(self, events: list[ScanEvent]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class ScanWatcher:
+    """Scan at a fixed interval and turn each scan into :class:`ScanEvent` rows.
+
+    A device seen for the first time is ``"new"`` and one that stops answering is
+    ``"lost"``. Every other device is an ``"update"``. With ``changes_only``, an update
+    is only reported when the device moved at least ``threshold`` metres or its method
+    changed since it was last reported; a device without a distance stays unchanged
+    until it reports one. Targets within a scan are ranged concurrently
+    on ``workers`` threads; scans never overlap, and a slow scan delays the next one
+    rather than queueing.
+    """
+
+    def __init__(self, client: Aether, config: Optional[WatchConfig] = None) -> None:
+        self._client = client
+        self._config = config or WatchConfig()
+        self._executor = ThreadPoolExecutor(max_workers=self._config.workers, thread_name_prefix="aether-watch")
+        self._reported: dict[str, tuple[Optional[float], Optional[str]]] = {}
+        self._stop = threading.Event()
+
+    def scan_once(self) -> list[ScanEvent]:
+        timestamp = datetime.utcnow()
+        events = []
+        seen = set()
+        for record in self._client.scan(self._executor):
+            seen.add(record.ip)
+            method = record.metadata.get("method")
+            previous = self._reported.get(record.ip)
+            if previous is None:
+                kind = "new"
+            elif self._config.changes_only and method == previous[1] and self._unchanged(record.distance, previous[0]):
+                continue
+            else:
+                kind = "update"
+            self._reported[record.ip] = (record.distance, method)
+            events.append(
+                ScanEvent(timestamp, record.ip, kind, method, record.distance, record.metadata.get("variance"))
+            )
+        for ip in [ip for ip in self._reported if ip not in seen]:
+            del self._reported[ip]
+            events.append(ScanEvent(timestamp, ip, "lost"))
+        return events
+
+    def cycles(self) -> Iterator[list[ScanEvent]]:
+        """Yield each scan's events until :meth:`stop` is called."""
+        while not self._stop.is_set():
+            started = time.monotonic()
+            yield self.scan_once()
+            self._stop.wait(max(0.0, self._config.interval - (time.monotonic() - started)))
+
+    def run(self, sink: ScanSink) -> int:
+        """Feed scans into ``sink`` until stopped; returns the number of scans."""
+        scans = 0
+        for events in self.cycles():
+            scans += 1
+            if events:
+                sink.write(events)
+        return scans
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._executor.shutdown(wait=True)
+
+    # --- internal helpers ---
+
+    def _unchanged(self, distance: Optional[float], previous: Optional[float]) -> bool:
+        if distance is None or previous is None:
+            return distance is None and previous is None
+        return abs(distance - previous) < self._config.threshold
+
+
+class JsonlSink:
+    """Write one JSON object per event, flushing the stream after every scan."""
+
+    def __init__(self, stream: TextIO, close_stream: bool = False) -> None:
+        self._stream = stream
+        self._close_stream = close_stream
+
+    def write(self, events: list[ScanEvent]) -> None:
+        self._stream.write("".join(self._format(event) + "\n" for event in events))
+        self._stream.flush()
+
+    def close(self) -> None:
+        if self._close_stream:
+            self._stream.close()
+        else:
+            self._stream.flush()
+
+    def _format(self, event: ScanEvent) -> str:
+        return json.dumps(event.as_dict())
+
+
+class TextSink(JsonlSink):
+    """Tab-separated ``timestamp ip distance method event`` lines."""
+
+    def _format(self, event: ScanEvent) -> str:
+        distance = f"{event.distance:.2f} m" if event.distance is not None else "-"
+        return f"{event.timestamp.isoformat()}\t{event.ip}\t{distance}\t{event.method or '-'}\t{event.event}"
+
+
+class ParquetSink:
+    """Append events to a :class:`~aether.sense.storage.ScanArchiveWriter` archive."""
+
+    def __init__(self, root: Path, interface: str, config: Optional[ArchiveConfig] = None) -> None:
+        self._writer = ScanArchiveWriter(root, interface, config)
+
+    @property
+    def files_written(self) -> list[Path]:
+        return self._writer.files_written
+
+    def write(self, events: list[ScanEvent]) -> None:
+        self._writer.write(asdict(event) for event in events)
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+@contextmanager
+def stop_on_signals(
+    watcher: ScanWatcher, signals: tuple[int, ...] = (signal.SIGINT, signal.SIGTERM)
+) -> Iterator[None]:
+    """Stop ``watcher`` after its current scan on any of ``signals``; main thread only."""
+    previous = {signum: signal.getsignal(signum) for signum in signals}
+    for signum in signals:
+        signal.signal(signum, lambda *_: watcher.stop())
+    try:
+        yield
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
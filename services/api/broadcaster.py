@@ -0,0 +1,120 @@
+"""Fan one scan loop per interface out to many WebSocket subscribers."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+
+from aether.pool import AetherPool
+
+ScanKey = tuple[str, Optional[str]]
+
+
+class Subscription:
+    """Bounded per-client queue that drops the oldest update when the client lags."""
+
+    def __init__(self, key: ScanKey, maxsize: int) -> None:
+        self.key = key
+        self.dropped = 0
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize)
+
+    def publish(self, message: dict[str, Any]) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(message)
+
+    async def get(self) -> dict[str, Any]:
+        return await self._queue.get()
+
+
+class ScanBroadcaster:
+    """Run one scan producer per ``(interface, csi_backend)`` for all its subscribers.
+
+    The producer task starts with the first subscriber and is cancelled when the last
+    one leaves. Scans run on ``executor`` with a session borrowed from ``pool``; each
+    scan is published to every subscriber's queue as one cycle,
+    ``{"timestamp": ..., "devices": [{"ip", "distance", "method"}, ...]}``, which the
+    client's protocol encoder turns into frames. A scan error is published as
+    ``{"error": ...}`` and the producer retries on the next interval.
+    """
+
+    def __init__(
+        self,
+        pool: AetherPool,
+        executor: Optional[Executor] = None,
+        interval: float = 2.0,
+        queue_size: int = 8,
+    ) -> None:
+        self._pool = pool
+        self._executor = executor
+        self._interval = interval
+        self._queue_size = queue_size
+        self._subscribers: dict[ScanKey, set[Subscription]] = {}
+        self._producers: dict[ScanKey, asyncio.Task[None]] = {}
+
+    @property
+    def producers(self) -> int:
+        return len(self._producers)
+
+    @asynccontextmanager
+    async def subscribe(self, interface: str, csi_backend: Optional[str] = None) -> AsyncIterator[Subscription]:
+        key = (interface, csi_backend)
+        subscription = Subscription(key, self._queue_size)
+        self._subscribers.setdefault(key, set()).add(subscription)
+        if key not in self._producers:
+            self._producers[key] = asyncio.create_task(self._produce(key))
+        try:
+            yield subscription
+        finally:
+            await self._unsubscribe(subscription)
+
+    async def close(self) -> None:
+        producers = list(self._producers.values())
+        self._producers.clear()
+        self._subscribers.clear()
+        for task in producers:
+            task.cancel()
+        await asyncio.gather(*producers, return_exceptions=True)
+
+    # --- internal helpers ---
+
+    async def _unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.key)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if subscribers:
+            return
+        del self._subscribers[subscription.key]
+        task = self._producers.pop(subscription.key, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _produce(self, key: ScanKey) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                message = await loop.run_in_executor(self._executor, self._scan, key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                message = {"error": str(exc)}
+            for subscription in list(self._subscribers.get(key, ())):
+                subscription.publish(message)
+            await asyncio.sleep(self._interval)
+
+    def _scan(self, key: ScanKey) -> dict[str, Any]:
+        with self._pool.session(*key) as client:
+            records = list(client.scan())
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "devices": [
+                {"ip": record.ip, "distance": record.distance, "method": record.metadata.get("method", "unknown")}
+                for record in records
+            ],
+        }
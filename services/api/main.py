@@ -1,22 +1,92 @@
 from __future__ import annotations
 
+import asyncio
+import io
+import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional, Union
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import duckdb
+import pyarrow as pa
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 
 # Add SDK to path if running from services/api directory
 sdk_path = Path(__file__).parent.parent.parent / "sdk" / "src"
 if str(sdk_path) not in sys.path:
     sys.path.insert(0, str(sdk_path))
 
-from aether.api import Aether
+from aether import metrics
+from aether.pool import AetherPool, PoolConfig, PoolExhaustedError
+from aether.sense.storage import ReadOnlyConnectionPool, query_estimates
 
-app = FastAPI(title="Aether API")
+try:
+    from .broadcaster import ScanBroadcaster
+    from .protocol import ProtocolError, make_encoder
+except ImportError:  # running as a top-level module from services/api
+    from broadcaster import ScanBroadcaster
+    from protocol import ProtocolError, make_encoder
+
+# Measurements block on the radio (or on subprocesses such as iw/ping), so they run on
+# a bounded worker pool instead of the event loop.
+MEASUREMENT_WORKERS = int(os.environ.get("AETHER_MEASUREMENT_WORKERS", "16"))
+POOL_EVICT_INTERVAL = 30.0
+SCAN_INTERVAL = float(os.environ.get("AETHER_SCAN_INTERVAL", "2.0"))
+MAX_BATCH_TARGETS = int(os.environ.get("AETHER_MAX_BATCH_TARGETS", "1000"))
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+NDJSON = "application/x-ndjson"
+PROMETHEUS_TEXT = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    metrics_were_enabled = metrics.enabled()
+    if os.environ.get("AETHER_METRICS", "1").lower() not in ("0", "false", "no"):
+        metrics.enable()
+    pool = AetherPool(
+        PoolConfig(
+            max_size=int(os.environ.get("AETHER_POOL_SIZE", "16")),
+            idle_timeout=float(os.environ.get("AETHER_POOL_IDLE_TIMEOUT", "300")),
+            max_concurrency=int(os.environ.get("AETHER_POOL_CONCURRENCY", "4")),
+        )
+    )
+    executor = ThreadPoolExecutor(max_workers=MEASUREMENT_WORKERS, thread_name_prefix="aether-measure")
+    broadcaster = ScanBroadcaster(pool, executor, interval=SCAN_INTERVAL)
+    readers = ReadOnlyConnectionPool(
+        Path(os.environ.get("AETHER_DATABASE", "data/validation/runs.duckdb")),
+        size=int(os.environ.get("AETHER_READ_CONNECTIONS", "4")),
+    )
+    app.state.pool = pool
+    app.state.readers = readers
+    app.state.executor = executor
+    app.state.broadcaster = broadcaster
+    reaper = asyncio.create_task(_evict_idle_sessions(pool))
+    try:
+        yield
+    finally:
+        reaper.cancel()
+        await broadcaster.close()
+        executor.shutdown(wait=True)
+        pool.close()
+        readers.close()
+        if not metrics_were_enabled:
+            metrics.disable()
+
+
+async def _evict_idle_sessions(pool: AetherPool) -> None:
+    while True:
+        await asyncio.sleep(POOL_EVICT_INTERVAL)
+        await asyncio.get_running_loop().run_in_executor(None, pool.evict_idle)
+
+
+app = FastAPI(title="Aether API", lifespan=lifespan)
 
 # Enable CORS for Next.js frontend
 app.add_middleware(
@@ -32,6 +102,7 @@ class RangeRequest(BaseModel):
     interface: str
     target: str
     method: str = "auto"
+    csi_backend: Optional[str] = None
 
 
 class RangeResponse(BaseModel):
@@ -40,46 +111,212 @@ class RangeResponse(BaseModel):
     variance: float
 
 
-@app.post("/range", response_model=RangeResponse)
-def range_endpoint(payload: RangeRequest) -> RangeResponse:
-    client = Aether(interface=payload.interface)
-    estimate = client.range(payload.target, method=payload.method)
-    client.close()
+def _measure(pool: AetherPool, payload: RangeRequest) -> RangeResponse:
+    with pool.session(payload.interface, payload.csi_backend) as client:
+        estimate = client.range(payload.target, method=payload.method)
     return RangeResponse(distance=estimate.distance, method=estimate.method, variance=estimate.variance)
 
 
+@app.post("/range", response_model=RangeResponse)
+async def range_endpoint(payload: RangeRequest, request: Request) -> RangeResponse:
+    state = request.app.state
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(state.executor, _measure, state.pool, payload)
+    except PoolExhaustedError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+
+class RangeBatchItem(BaseModel):
+    target: str
+    method: Optional[str] = None
+
+
+class RangeBatchRequest(BaseModel):
+    interface: str
+    csi_backend: Optional[str] = None
+    method: str = "auto"
+    targets: list[Union[str, RangeBatchItem]] = Field(min_length=1, max_length=MAX_BATCH_TARGETS)
+
+
+def _batch_line(index: int, item: RangeBatchItem, result: Union[RangeResponse, BaseException]) -> bytes:
+    line: dict[str, object] = {"index": index, "target": item.target}
+    if isinstance(result, BaseException):
+        line.update(ok=False, error=str(result) or type(result).__name__)
+    else:
+        line.update(ok=True, **result.model_dump())
+    return (json.dumps(line) + "\n").encode()
+
+
+@app.post("/range/batch")
+async def range_batch_endpoint(payload: RangeBatchRequest, request: Request) -> StreamingResponse:
+    """Range many targets concurrently, streaming NDJSON lines in completion order.
+
+    Each line carries the target's ``index`` in the request. A failing target yields an
+    ``{"ok": false, "error": ...}`` line instead of failing the batch. At most the
+    pool's per-interface concurrency is in flight at once, so a large batch does not
+    tie up the shared measurement workers.
+    """
+    state = request.app.state
+    items = [
+        RangeBatchItem(target=item) if isinstance(item, str) else item for item in payload.targets
+    ]
+    limit = asyncio.Semaphore(state.pool.config.max_concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def run(index: int, item: RangeBatchItem) -> tuple[int, Union[RangeResponse, BaseException]]:
+        single = RangeRequest(
+            interface=payload.interface,
+            target=item.target,
+            method=item.method or payload.method,
+            csi_backend=payload.csi_backend,
+        )
+        async with limit:
+            try:
+                return index, await loop.run_in_executor(state.executor, _measure, state.pool, single)
+            except Exception as exc:
+                return index, exc
+
+    async def stream() -> AsyncIterator[bytes]:
+        tasks = [asyncio.create_task(run(index, item)) for index, item in enumerate(items)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, result = await finished
+                yield _batch_line(index, items[index], result)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def _arrow_stream(reader: pa.RecordBatchReader) -> Iterator[bytes]:
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+
+def _ndjson_stream(reader: pa.RecordBatchReader) -> Iterator[bytes]:
+    for batch in reader:
+        rows = batch.to_pylist()
+        yield "".join(
+            json.dumps({**row, "timestamp": row["timestamp"].isoformat() if row["timestamp"] else None}) + "\n"
+            for row in rows
+        ).encode()
+
+
+@app.get("/estimates")
+def estimates_endpoint(
+    request: Request,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    target: Optional[list[str]] = Query(None),
+    method: Optional[list[str]] = Query(None),
+    cursor: Optional[int] = None,
+    limit: int = Query(100_000, ge=1, le=1_000_000),
+    format: Optional[str] = Query(None, pattern="^(arrow|ndjson)$"),
+) -> StreamingResponse:
+    """Stream stored estimates as Arrow IPC (default) or NDJSON, one page at a time.
+
+    Pages are keyed on rowid: when more rows may follow, the ``X-Next-Cursor`` header
+    holds the value to pass as ``cursor`` for the next page. Rows are read in batches
+    from a pooled read-only connection, so exports never materialize in memory.
+    """
+    readers: ReadOnlyConnectionPool = request.app.state.readers
+    if not readers.path.exists():
+        raise HTTPException(status_code=404, detail=f"No estimate store at {readers.path}")
+    if format is None:
+        format = "ndjson" if NDJSON in request.headers.get("accept", "") else "arrow"
+    try:
+        connection = readers.acquire(timeout=30.0)
+    except (TimeoutError, duckdb.Error) as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    try:
+        reader, next_cursor = query_estimates(
+            connection, start, end, target, method, after=cursor, limit=limit
+        )
+    except Exception:
+        readers.release(connection)
+        raise
+
+    def body() -> Iterator[bytes]:
+        # Sync generator: Starlette iterates it on a worker thread, keeping DuckDB off the loop.
+        try:
+            yield from (_arrow_stream(reader) if format == "arrow" else _ndjson_stream(reader))
+        finally:
+            readers.release(connection)
+
+    headers = {} if next_cursor is None else {"X-Next-Cursor": str(next_cursor)}
+    return StreamingResponse(body(), media_type=ARROW_STREAM if format == "arrow" else NDJSON, headers=headers)
+
+
+async def _wait_for_disconnect(ws: WebSocket) -> None:
+    while (await ws.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@app.get("/metrics")
+async def metrics_endpoint() -> Response:
+    """Pipeline spans and counters in the Prometheus text format."""
+    return Response(metrics.render_prometheus(), media_type=PROMETHEUS_TEXT)
+
+
 @app.websocket("/ws/scan")
 async def websocket_scan(ws: WebSocket) -> None:
     await ws.accept()
-    client: Optional[Aether] = None
+    disconnected: Optional[asyncio.Task[None]] = None
     try:
         # Receive initial configuration
         config = await ws.receive_json()
         interface = config.get("interface", "simulate")
         csi_backend = config.get("csi_backend")
-        
-        client = Aether(interface=interface, csi_backend=csi_backend)
-        
-        # Continuously scan and send updates
-        import asyncio
-        while True:
-            for record in client.scan():
-                await ws.send_json({
-                    "ip": record.ip,
-                    "distance": record.distance,
-                    "method": record.metadata.get("method", "unknown"),
-                    "timestamp": datetime.utcnow().isoformat(),
-                })
-            await asyncio.sleep(2)  # Scan interval
+        try:
+            encoder = make_encoder(config)
+        except (ProtocolError, ValueError) as exc:
+            await ws.send_json({"error": str(exc)})
+            return
+        if encoder.version > 1:
+            await ws.send_json({"type": "hello", "protocol": encoder.version, "encoding": encoder.encoding})
+
+        # Viewers of the same interface share one scan loop; slow clients lose the
+        # oldest updates instead of slowing everyone down.
+        disconnected = asyncio.create_task(_wait_for_disconnect(ws))
+        async with ws.app.state.broadcaster.subscribe(interface, csi_backend) as subscription:
+            while True:
+                update = asyncio.create_task(subscription.get())
+                await asyncio.wait({update, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    update.cancel()
+                    break
+                message = update.result()
+                if "error" in message:
+                    # The producer retries on its next interval; keep the viewer subscribed.
+                    await ws.send_json(message)
+                    continue
+                try:
+                    frames = encoder.encode(message)
+                except ProtocolError as exc:
+                    # Nothing was sent and the encoder state is unchanged; skip this cycle.
+                    await ws.send_json({"error": str(exc)})
+                    continue
+                for frame in frames:
+                    if isinstance(frame, bytes):
+                        await ws.send_bytes(frame)
+                    else:
+                        await ws.send_json(frame)
     except WebSocketDisconnect:
         pass
     except Exception as e:
         await ws.send_json({"error": str(e)})
     finally:
-        if client:
-            client.close()
+        if disconnected is not None:
+            disconnected.cancel()
         try:
             await ws.close()
         except Exception:
             pass
-
@@ -0,0 +1,183 @@
+"""Per-client encoders for the ``/ws/scan`` stream.
+
+Protocol 1 (the default) sends one JSON message per device per scan cycle.
+Protocol 2 sends one snapshot of every device, then per-cycle deltas holding only
+devices that were added, removed, or whose distance moved by at least ``threshold``
+metres (or whose method changed). Cycles with no changes send nothing. Protocol 2
+frames are JSON by default, or fixed-layout binary with ``encoding="binary"``:
+
+    header : <BBHHId  version=2, kind (0 snapshot, 1 delta), upserts, removals, seq, unix time
+    upsert : <16sfB   device address (IPv6 or IPv4-mapped), distance (float32), method code
+    removal: <16s     device address
+
+Binary framing needs IP-address device ids and at most 65,535 devices per frame.
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import struct
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Optional, Union
+
+PROTOCOL_VERSIONS = (1, 2)
+HEADER = struct.Struct("<BBHHId")
+UPSERT = struct.Struct("<16sfB")
+REMOVAL = struct.Struct("<16s")
+METHOD_CODES = {"rssi": 0, "rtt": 1, "csi": 2, "fusion": 3, "ml": 4}
+METHOD_NAMES = {code: name for name, code in METHOD_CODES.items()}
+UNKNOWN_METHOD = 255
+SNAPSHOT, DELTA = 0, 1
+
+Frame = Union[dict[str, Any], bytes]
+
+
+class ProtocolError(ValueError):
+    """Raised for unsupported protocol negotiation options."""
+
+
+class LegacyEncoder:
+    """Protocol 1: one JSON message per device per cycle."""
+
+    version = 1
+    encoding = "json"
+
+    def encode(self, cycle: dict[str, Any]) -> list[Frame]:
+        return [dict(device, timestamp=cycle["timestamp"]) for device in cycle["devices"]]
+
+
+class DeltaEncoder:
+    """Protocol 2: a snapshot followed by thresholded deltas, as JSON or binary frames.
+
+    State tracks what this client was last sent, so cycles dropped from a slow
+    client's queue are folded into the next delta rather than lost. It is updated
+    only once a cycle's frame has been built, so a cycle that cannot be encoded
+    raises without changing what the next delta is computed against.
+    """
+
+    version = 2
+
+    def __init__(self, threshold: float = 0.1, encoding: str = "json") -> None:
+        if encoding not in ("json", "binary"):
+            raise ProtocolError(f"Unknown encoding '{encoding}'")
+        self.encoding = encoding
+        self._threshold = threshold
+        self._sent: Optional[dict[str, tuple[float, str]]] = None
+        self._seq = 0
+
+    def encode(self, cycle: dict[str, Any]) -> list[Frame]:
+        current = {device["ip"]: (float(device["distance"]), device["method"]) for device in cycle["devices"]}
+        if self._sent is None:
+            kind, upserts, removals = SNAPSHOT, current, []
+        else:
+            upserts = {
+                ip: value
+                for ip, value in current.items()
+                if ip not in self._sent
+                or abs(value[0] - self._sent[ip][0]) >= self._threshold
+                or value[1] != self._sent[ip][1]
+            }
+            removals = [ip for ip in self._sent if ip not in current]
+            if not upserts and not removals:
+                return []
+            kind = DELTA
+        seq = self._seq + 1
+        stamp = _unix_time(cycle["timestamp"])
+        frame: Frame
+        if self.encoding == "binary":
+            frame = _pack(kind, seq, stamp, upserts, removals)
+        else:
+            frame = {
+                "type": "snapshot" if kind == SNAPSHOT else "delta",
+                "seq": seq,
+                "ts": stamp,
+                "upsert": [[ip, round(distance, 3), method] for ip, (distance, method) in upserts.items()],
+            }
+            if removals:
+                frame["remove"] = removals
+        if self._sent is None:
+            self._sent = dict(current)
+        else:
+            self._sent.update(upserts)
+            for ip in removals:
+                del self._sent[ip]
+        self._seq = seq
+        return [frame]
+
+
+def make_encoder(config: dict[str, Any]) -> Union[LegacyEncoder, DeltaEncoder]:
+    version = int(config.get("protocol", 1))
+    if version not in PROTOCOL_VERSIONS:
+        raise ProtocolError(f"Unsupported protocol version {version}; supported: {PROTOCOL_VERSIONS}")
+    if version == 1:
+        return LegacyEncoder()
+    return DeltaEncoder(float(config.get("threshold", 0.1)), config.get("encoding", "json"))
+
+
+def decode_binary(frame: bytes) -> dict[str, Any]:
+    """Decode a binary protocol 2 frame into the JSON frame layout."""
+    version, kind, upserts, removals, seq, stamp = HEADER.unpack_from(frame)
+    if version != 2:
+        raise ProtocolError(f"Unexpected binary frame version {version}")
+    offset = HEADER.size
+    upsert = []
+    for _ in range(upserts):
+        address, distance, method = UPSERT.unpack_from(frame, offset)
+        upsert.append([_address_str(address), distance, METHOD_NAMES.get(method, "unknown")])
+        offset += UPSERT.size
+    remove = []
+    for _ in range(removals):
+        remove.append(_address_str(REMOVAL.unpack_from(frame, offset)[0]))
+        offset += REMOVAL.size
+    decoded: dict[str, Any] = {
+        "type": "snapshot" if kind == SNAPSHOT else "delta",
+        "seq": seq,
+        "ts": stamp,
+        "upsert": upsert,
+    }
+    if remove:
+        decoded["remove"] = remove
+    return decoded
+
+
+def _pack(
+    kind: int,
+    seq: int,
+    stamp: float,
+    upserts: dict[str, tuple[float, str]],
+    removals: list[str],
+) -> bytes:
+    parts = [HEADER.pack(2, kind, len(upserts), len(removals), seq & 0xFFFFFFFF, stamp)]
+    parts.extend(
+        UPSERT.pack(_address_bytes(ip), distance, METHOD_CODES.get(method, UNKNOWN_METHOD))
+        for ip, (distance, method) in upserts.items()
+    )
+    parts.extend(REMOVAL.pack(_address_bytes(ip)) for ip in removals)
+    return b"".join(parts)
+
+
+@lru_cache(maxsize=65_536)
+def _address_bytes(ip: str) -> bytes:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        raise ProtocolError(f"Binary encoding needs IP device ids, got {ip!r}") from None
+    if isinstance(address, ipaddress.IPv4Address):
+        address = ipaddress.IPv6Address(f"::ffff:{address}")
+    return address.packed
+
+
+def _address_str(packed: bytes) -> str:
+    address = ipaddress.IPv6Address(packed)
+    return str(address.ipv4_mapped or address)
+
+
+def _unix_time(timestamp: Any) -> float:
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if isinstance(timestamp, datetime):
+        # Scan timestamps are naive UTC.
+        return (timestamp - datetime(1970, 1, 1)).total_seconds()
+    return float(timestamp if timestamp is not None else time.time())
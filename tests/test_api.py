@@ -0,0 +1,294 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import duckdb
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from aether import metrics
+from aether.api import Aether
+from aether.pool import AetherPool, PoolConfig, PoolExhaustedError
+from aether.sense.models import RangeEstimate
+from aether.sense.storage import EstimateWriter
+from services.api.broadcaster import Subscription
+from services.api.main import app
+from services.api.protocol import ProtocolError, decode_binary, make_encoder
+
+
+class CountingFactory:
+    def __init__(self) -> None:
+        self.opened: list[Aether] = []
+        self.closed = 0
+
+    def __call__(self, interface, csi_backend):
+        client = Aether(interface=interface, csi_backend=csi_backend)
+        close = client.close
+
+        def counted_close():
+            self.closed += 1
+            close()
+
+        client.close = counted_close
+        self.opened.append(client)
+        return client
+
+
+def test_pool_reuses_sessions_and_evicts():
+    factory = CountingFactory()
+    pool = AetherPool(PoolConfig(max_size=1, idle_timeout=0.0, max_concurrency=1, acquire_timeout=0.05), factory)
+    with pool.session("simulate") as first:
+        with pytest.raises(PoolExhaustedError):
+            with pool.session("simulate"):
+                pass
+        with pytest.raises(PoolExhaustedError):
+            with pool.session("simulate:fleet?devices=10"):
+                pass
+    with pool.session("simulate") as again:
+        assert again is first
+    assert len(factory.opened) == 1
+
+    # A new key replaces the idle least-recently-used session.
+    with pool.session("simulate:fleet?devices=10"):
+        pass
+    assert factory.closed == 1 and len(pool) == 1
+    assert pool.evict_idle() == 1 and len(pool) == 0
+    pool.close()
+
+
+def test_pool_reserves_slots_while_opening_sessions():
+    opening = threading.Event()
+    release = threading.Event()
+
+    def factory(interface, csi_backend):
+        if interface == "broken":
+            raise OSError("no such interface")
+        opening.set()
+        release.wait(5)
+        return Aether(interface="simulate")
+
+    pool = AetherPool(PoolConfig(max_size=1, acquire_timeout=0.05), factory)
+    with pytest.raises(OSError):
+        with pool.session("broken"):
+            pass
+
+    def hold():
+        with pool.session("simulate"):
+            pass
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    assert opening.wait(5)
+    with pytest.raises(PoolExhaustedError):
+        with pool.session("simulate:fleet?devices=10"):
+            pass
+    release.set()
+    thread.join()
+    assert len(pool) == 1
+    pool.close()
+
+
+def test_pool_limits_concurrency_per_interface():
+    pool = AetherPool(PoolConfig(max_concurrency=2))
+    active = []
+    peak = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(6)
+
+    def worker():
+        barrier.wait()
+        with pool.session("simulate") as client:
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            client.range("192.168.1.10", method="rssi")
+            with lock:
+                active.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) <= 2
+    assert pool.stats() == {"sessions": 1, "in_use": 0, "max_size": 16}
+    pool.close()
+
+
+def test_range_endpoint_uses_pool():
+    with TestClient(app) as client:
+        for _ in range(3):
+            response = client.post("/range", json={"interface": "simulate", "target": "192.168.1.10", "method": "rtt"})
+            assert response.status_code == 200
+            assert response.json()["method"] == "rtt"
+        assert app.state.pool.stats()["sessions"] == 1
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    metrics.disable()
+    try:
+        with TestClient(app) as client:
+            client.post("/range", json={"interface": "simulate", "target": "192.168.1.10", "method": "rssi"})
+            response = client.get("/metrics")
+        assert not metrics.enabled()  # the app restores the state it found
+    finally:
+        metrics.disable()
+        metrics.reset()
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'aether_span_duration_seconds_count{span="interface.measure",method="rssi"}' in response.text
+    assert "# TYPE aether_collector_samples_total counter" in response.text
+
+
+def test_subscription_drops_oldest():
+    subscription = Subscription(("simulate", None), maxsize=2)
+    for i in range(5):
+        subscription.publish({"seq": i})
+    assert subscription.dropped == 3
+
+    async def drain():
+        return [await subscription.get(), await subscription.get()]
+
+    assert [m["seq"] for m in asyncio.run(drain())] == [3, 4]
+
+
+def test_websocket_viewers_share_one_scan_producer():
+    with TestClient(app) as client:
+        broadcaster = app.state.broadcaster
+        with client.websocket_connect("/ws/scan") as first, client.websocket_connect("/ws/scan") as second:
+            first.send_json({"interface": "simulate"})
+            second.send_json({"interface": "simulate"})
+            assert {first.receive_json()["ip"] for _ in range(3)} == {"192.168.1.10", "192.168.1.11", "192.168.1.12"}
+            assert "distance" in second.receive_json()
+            assert broadcaster.producers == 1
+        deadline = time.monotonic() + 2.0
+        while broadcaster.producers and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert broadcaster.producers == 0
+
+
+def test_websocket_forwards_scan_errors_and_keeps_streaming(monkeypatch):
+    monkeypatch.setattr("services.api.main.SCAN_INTERVAL", 0.01)
+    with TestClient(app) as client:
+        broadcaster = app.state.broadcaster
+        scan = broadcaster._scan
+        failures = iter([RuntimeError("interface went away")])
+
+        def flaky_scan(key):
+            for exc in failures:
+                raise exc
+            return scan(key)
+
+        monkeypatch.setattr(broadcaster, "_scan", flaky_scan)
+        with client.websocket_connect("/ws/scan") as ws:
+            ws.send_json({"interface": "simulate"})
+            assert ws.receive_json() == {"error": "interface went away"}
+            assert "distance" in ws.receive_json()
+
+
+def test_delta_encoder_sends_snapshot_then_changes():
+    def cycle(devices):
+        return {"timestamp": "2024-05-01T12:00:00", "devices": [{"ip": ip, "distance": d, "method": "rtt"} for ip, d in devices]}
+
+    for encoding in ("json", "binary"):
+        encoder = make_encoder({"protocol": 2, "encoding": encoding, "threshold": 0.5})
+        frames = [
+            encoder.encode(cycle([("10.0.0.1", 1.0), ("10.0.0.2", 2.0)])),
+            encoder.encode(cycle([("10.0.0.1", 1.2), ("10.0.0.2", 2.0)])),
+            encoder.encode(cycle([("10.0.0.1", 1.6), ("10.0.0.3", 3.0)])),
+        ]
+        if encoding == "binary":
+            assert all(isinstance(frame, bytes) for batch in frames for frame in batch)
+            frames = [[decode_binary(frame) for frame in batch] for batch in frames]
+        snapshot, quiet, delta = frames
+        assert snapshot[0]["type"] == "snapshot" and len(snapshot[0]["upsert"]) == 2
+        assert quiet == []
+        assert delta[0]["type"] == "delta" and delta[0]["seq"] == 2
+        assert sorted(ip for ip, _, _ in delta[0]["upsert"]) == ["10.0.0.1", "10.0.0.3"]
+        assert delta[0]["remove"] == ["10.0.0.2"]
+        assert delta[0]["ts"] == 1714564800.0
+
+
+def test_delta_encoder_keeps_state_when_a_cycle_cannot_be_encoded():
+    def cycle(devices):
+        return {"timestamp": "2024-05-01T12:00:00", "devices": [{"ip": ip, "distance": d, "method": "rtt"} for ip, d in devices]}
+
+    encoder = make_encoder({"protocol": 2, "encoding": "binary"})
+    encoder.encode(cycle([("10.0.0.1", 1.0)]))
+    with pytest.raises(ProtocolError):
+        encoder.encode(cycle([("10.0.0.1", 5.0), ("sensor-7", 2.0)]))
+    delta = decode_binary(encoder.encode(cycle([("10.0.0.1", 5.0)]))[0])
+    assert delta["seq"] == 2 and [ip for ip, _, _ in delta["upsert"]] == ["10.0.0.1"]
+
+
+def test_websocket_protocol_v2_negotiation():
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/scan") as ws:
+            ws.send_json({"interface": "simulate", "protocol": 2, "encoding": "binary"})
+            assert ws.receive_json() == {"type": "hello", "protocol": 2, "encoding": "binary"}
+            snapshot = decode_binary(ws.receive_bytes())
+            assert snapshot["type"] == "snapshot" and len(snapshot["upsert"]) == 3
+        with client.websocket_connect("/ws/scan") as ws:
+            ws.send_json({"interface": "simulate", "protocol": 9})
+            assert "error" in ws.receive_json()
+
+
+def test_range_batch_streams_ndjson_with_inline_errors():
+    targets = ["192.168.1.10", {"target": "192.168.1.11", "method": "rssi"}, "10.9.9.9", "192.168.1.12"]
+    with TestClient(app) as client:
+        response = client.post("/range/batch", json={"interface": "simulate", "method": "rtt", "targets": targets})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        empty = client.post("/range/batch", json={"interface": "simulate", "targets": []})
+        assert empty.status_code == 422
+    assert sorted(line["index"] for line in lines) == [0, 1, 2, 3]
+    by_index = {line["index"]: line for line in lines}
+    assert by_index[1]["ok"] and by_index[1]["method"] == "rssi"
+    assert by_index[0]["method"] == "rtt"
+    assert not by_index[2]["ok"] and "10.9.9.9" in by_index[2]["error"]
+    assert by_index[3]["ok"]
+
+
+def test_estimates_endpoint_pages_arrow_and_ndjson(tmp_path, monkeypatch):
+    database = tmp_path / "runs.duckdb"
+    conn = duckdb.connect(str(database))
+    start = datetime(2024, 5, 1)
+    with EstimateWriter(conn, background=False) as writer:
+        for i in range(25):
+            estimate = RangeEstimate(start + timedelta(seconds=i), "rtt" if i % 2 else "rssi", float(i), 0.1, [])
+            writer.write(estimate, target=f"10.0.0.{i % 3}")
+    conn.close()
+
+    monkeypatch.setenv("AETHER_DATABASE", str(database))
+    with TestClient(app) as client:
+        ids = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"method": "rtt", "limit": 5, **({"cursor": cursor} if cursor is not None else {})}
+            response = client.get("/estimates", params=params)
+            assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+            table = pa.ipc.open_stream(response.content).read_all()
+            assert set(table.column("method").to_pylist()) <= {"rtt"}
+            ids += table.column("id").to_pylist()
+            pages += 1
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+        assert len(ids) == 12 and ids == sorted(ids) and pages == 3
+
+        response = client.get(
+            "/estimates",
+            params={"target": ["10.0.0.1"], "start": "2024-05-01T00:00:10"},
+            headers={"accept": "application/x-ndjson"},
+        )
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["distance"] for row in rows] == [10.0, 13.0, 16.0, 19.0, 22.0]
+        assert rows[0]["timestamp"] == "2024-05-01T00:00:10"
+
+    # Shutdown releases the read-only database so a writer can open the file again.
+    duckdb.connect(str(database)).close()
@@ -0,0 +1,66 @@
+import duckdb
+from typer.testing import CliRunner
+
+from aether.bench import (
+    CASES,
+    BenchConfig,
+    BenchResult,
+    Case,
+    RunInfo,
+    collect_run_info,
+    compare,
+    load_baseline,
+    record_run,
+    run_case,
+    select_cases,
+)
+from aether.cli import app
+
+
+def make_result(name: str, p50: float) -> BenchResult:
+    return BenchResult(name, 10, 1, "ops", 1 / p50, p50, p50, p50, p50 * 2)
+
+
+def test_run_case_reports_throughput_and_percentiles():
+    calls = []
+    case = Case("noop", lambda seed: lambda: calls.append(seed), items=4)
+    result = run_case(case, BenchConfig(warmup=2, min_iterations=20, min_time=0.0, seed=7))
+    assert result.iterations == 20 and len(calls) == 22 and set(calls) == {7}
+    assert result.p50 <= result.p90 <= result.p99
+    assert result.throughput > 0
+    assert [case.name for case in select_cases(CASES, ["mesh.*"])] == ["mesh.trilaterate", "mesh.track"]
+
+
+def test_baseline_is_per_host_and_flags_regressions():
+    connection = duckdb.connect()
+    info = RunInfo(git_revision="abc123", hostname="bench-host")
+    record_run(connection, [make_result("engine.fuse", 1e-3)], info, baseline=True)
+    record_run(connection, [make_result("engine.fuse", 5e-3)], info)
+    assert load_baseline(connection, "other-host") == (None, {})
+
+    revision, baseline = load_baseline(connection, "bench-host")
+    assert revision == "abc123" and baseline["engine.fuse"].p50 == 1e-3
+    slower = compare([make_result("engine.fuse", 1.5e-3)], baseline)[0]
+    faster = compare([make_result("engine.fuse", 0.9e-3)], baseline)[0]
+    assert slower.regression and round(slower.change, 3) == -0.333
+    assert not faster.regression
+
+    record_run(connection, [make_result("engine.fuse", 2e-3)], info, baseline=True)
+    assert connection.execute("SELECT count(*) FROM bench_runs WHERE baseline").fetchone()[0] == 1
+    assert load_baseline(connection, "bench-host")[1]["engine.fuse"].p50 == 2e-3
+
+
+def test_bench_dry_run_compares_against_baseline_without_recording(tmp_path):
+    database = tmp_path / "results.duckdb"
+    args = ["bench", "--case", "engine.fuse", "--min-time", "0", "--no-store", "--database", str(database)]
+    assert CliRunner().invoke(app, args).exit_code == 0
+    assert not database.exists()
+
+    connection = duckdb.connect(str(database))
+    info = collect_run_info()
+    record_run(connection, [make_result("engine.fuse", 1e-12)], info, baseline=True)
+    connection.close()
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 1 and "REGRESSION" in result.output
+    with duckdb.connect(str(database)) as connection:
+        assert connection.execute("SELECT count(*) FROM bench_runs").fetchone()[0] == 1
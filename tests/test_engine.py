@@ -1,8 +1,27 @@
+import json
+import threading
+import time
 from datetime import datetime
 
-from aether.ml.model import MLRangeRefiner, MLConfig
-from aether.sense.engine import RangingEngine
+import duckdb
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor
+
+from aether import metrics
+from aether.core.simulated import SimulatedWiFiInterface
+from aether.ml.compiled import flatten_ensemble, load_compiled, save_compiled
+from aether.ml.features import extract_features
+from aether.ml.model import MLRangeRefiner, MLConfig, MicroBatchRefiner
+from aether.ml.registry import HotSwapRefiner, ModelIntegrityError, ModelRegistry
+from aether.sense.calibration import SweepPoint, SweepSamples, fit_path_loss, run_sweep, write_profiles
+from aether.sense.collectors import CollectorConfig, SignalCollector
+from aether.sense.engine import RangingEngine, load_environment
 from aether.sense.models import RangeEstimate, SignalSample
+from aether.sense.storage import SampleArchiveWriter
+from aether.sense.validation import ValidationConfig, ValidationRunner, ValidationTarget
+from ml.pipelines.train_streaming import StreamConfig, cross_validate, train
 
 
 def make_estimate(distance: float, variance: float) -> RangeEstimate:
@@ -30,9 +49,277 @@ def test_engine_calibration_updates_state():
     assert abs(fused.distance - 2.5) < 1.0
 
 
+def test_path_loss_fit_per_environment_feeds_profiles(tmp_path):
+    rng = np.random.default_rng(0)
+    truth = {"lab": (-38.0, 2.0), "plant": (-45.0, 3.1)}
+    points = [SweepPoint(f"{env}-{d}", d, env) for env in truth for d in (0.5, 1.0, 2.0, 4.0, 8.0)]
+
+    def measure(target):
+        env, distance = target.split("-")
+        tx_power, exponent = truth[env]
+        return tx_power - 10 * exponent * np.log10(float(distance)) + rng.normal(0, 0.5, size=50)
+
+    fits = fit_path_loss(run_sweep(measure, points, workers=4))
+    for env, (tx_power, exponent) in truth.items():
+        assert abs(fits[env].tx_power - tx_power) < 0.3
+        assert abs(fits[env].path_loss_exponent - exponent) < 0.1
+        assert fits[env].samples == 250 and fits[env].distances == 5
+
+    write_profiles(fits.values(), tmp_path)
+    preset = load_environment("plant", tmp_path)
+    assert abs(preset.path_loss_exponent - 3.1) < 0.1 and preset.variance == fits["plant"].variance
+    assert load_environment("home", tmp_path).tx_power == -40.0
+    assert RangingEngine("lab", profile_dir=tmp_path)._environment.tx_power == fits["lab"].tx_power
+
+    collector = SignalCollector(
+        SimulatedWiFiInterface("simulate"), CollectorConfig(environment="lab", profile_dir=tmp_path)
+    )
+    samples = [SignalSample(datetime.utcnow(), "rssi", -38.0 - 20 * np.log10(3.0), {})]
+    assert abs(collector._distance_from_rssi(samples) - 3.0) < 0.2
+
+    single = SweepSamples(np.full(3, 2.0), np.full(3, -50.0), np.array(["lab"] * 3, dtype=object))
+    with pytest.raises(ValueError, match="two reference distances"):
+        fit_path_loss(single)
+
+    inverted = SweepSamples(np.array([1.0, 4.0]), np.array([-60.0, -45.0]), np.array(["lab"] * 2, dtype=object))
+    with pytest.raises(ValueError, match="not positive for lab"):
+        fit_path_loss(inverted)
+
+
+def test_metrics_record_pipeline_spans():
+    collector = SignalCollector(SimulatedWiFiInterface("simulate", seed=1))
+    metrics.disable()
+    metrics.reset()
+    collector.estimate_range("192.168.1.10", method="rtt")
+    assert metrics.snapshot().span("collector.collect", method="rtt") is None
+
+    metrics.enable()
+    try:
+        estimate = collector.estimate_range("192.168.1.10", method="rtt")
+        RangingEngine().fuse([estimate])
+        snapshot = metrics.snapshot()
+    finally:
+        metrics.disable()
+        metrics.reset()
+
+    measure = snapshot.span("interface.measure", method="rtt")
+    assert measure.count == 5 and sum(measure.counts) == 5
+    assert snapshot.span("engine.fuse").count == 1
+    assert snapshot.counter("collector.samples", method="rtt") == 5
+    assert 0 < measure.quantile(0.5) <= measure.quantile(0.99)
+
+
+def test_metrics_render_prometheus_histograms():
+    registry = metrics.MetricsRegistry(enabled=True, bounds=(0.1, 1.0))
+    registry.histogram(("engine.fuse", ())).observe(0.05)
+    registry.histogram(("engine.fuse", ())).observe(0.5)
+    registry.count("storage.rows", 10, writer="estimates")
+    text = registry.render_prometheus()
+    assert 'aether_storage_rows_total{writer="estimates"} 10' in text
+    assert 'aether_span_duration_seconds_bucket{span="engine.fuse",le="0.1"} 1' in text
+    assert 'aether_span_duration_seconds_bucket{span="engine.fuse",le="+Inf"} 2' in text
+    assert 'aether_span_duration_seconds_count{span="engine.fuse"} 2' in text
+
+
 def test_ml_refiner_falls_back(tmp_path):
     estimate = make_estimate(3.0, 0.2)
     refiner = MLRangeRefiner()
     refined = refiner.refine(estimate)
     assert refined.distance == estimate.distance
 
+
+def make_multi_sample_estimate(values: list[float]) -> RangeEstimate:
+    samples = [SignalSample(timestamp=datetime.utcnow(), method="rssi", value=v, metadata={}) for v in values]
+    return RangeEstimate(timestamp=datetime.utcnow(), method="rssi", distance=1.0, variance=0.1, raw=samples)
+
+
+def train_refiner(tmp_path) -> MLRangeRefiner:
+    X = np.array([[-40.0, 2.0, -45.0, -35.0], [-50.0, 3.0, -55.0, -45.0], [-60.0, 1.0, -62.0, -58.0]])
+    model = GradientBoostingRegressor(n_estimators=10).fit(X, [2.5, 4.0, 6.0])
+    joblib.dump(model, tmp_path / "model.joblib")
+    return MLRangeRefiner(MLConfig(model_path=tmp_path / "model.joblib"))
+
+
+def test_extract_features_matches_numpy():
+    values = [[-41.0, -39.0, -44.0, -47.5, -38.0], [-60.0]]
+    batch = extract_features([make_multi_sample_estimate(v) for v in values], "extended")
+    for row, v in zip(batch, values):
+        v = np.array(v)
+        median = np.median(v)
+        expected = [v.mean(), v.std(), v.min(), v.max(), *np.quantile(v, [0.1, 0.5, 0.9]), np.median(np.abs(v - median))]
+        assert np.allclose(row[:8], expected)
+        assert np.allclose(row[8:], 0.0)
+
+
+def test_extended_features_csi_and_rssi_rtt():
+    now = datetime.utcnow()
+    frames = [[1.0, 3.0], [2.0, 5.0]]
+    csi = [
+        SignalSample(now, "csi", value, {"frame": f, "subcarrier": s})
+        for f, frame in enumerate(frames)
+        for s, value in enumerate(frame)
+    ]
+    # -40 dBm maps to 1 m under the collector's path-loss model; RTT puts it at 2 m.
+    mixed = [SignalSample(now, "rssi", -40.0, {}), SignalSample(now, "rtt", 2 * 2.0 / 299_792_458.0, {})]
+    rows = extract_features(
+        [RangeEstimate(now, "csi", 1.0, 0.1, csi), RangeEstimate(now, "fusion", 1.0, 0.1, mixed)], "extended"
+    )
+    means = np.mean(frames, axis=0)
+    assert np.isclose(rows[0, 8], np.std(means))
+    assert np.isclose(rows[0, 9], np.std(frames, axis=0).mean())
+    assert np.isclose(rows[1, 10], 0.5)
+
+
+def test_rssi_rtt_disagreement_uses_calibrated_environment(tmp_path):
+    now = datetime.utcnow()
+    # Calibrated so -40 dBm reads as 2 m, agreeing with the RTT sample.
+    (tmp_path / "lab.json").write_text(json.dumps({"tx_power": -40.0 + 20 * np.log10(2.0), "path_loss_exponent": 2.0}))
+    mixed = [SignalSample(now, "rssi", -40.0, {}), SignalSample(now, "rtt", 2 * 2.0 / 299_792_458.0, {})]
+    estimate = RangeEstimate(now, "fusion", 1.0, 0.1, mixed)
+    assert np.isclose(extract_features([estimate], "extended")[0, 10], 0.5)
+    calibrated = extract_features([estimate], "extended", load_environment("lab", tmp_path))
+    assert np.isclose(calibrated[0, 10], 0.0)
+
+
+def test_refine_many_and_micro_batcher_match_refine(tmp_path):
+    refiner = train_refiner(tmp_path)
+    estimates = [make_multi_sample_estimate([-40.0 - i, -42.0 - i]) for i in range(5)]
+    expected = [refiner.refine(estimate).distance for estimate in estimates]
+    assert [r.distance for r in refiner.refine_many(estimates)] == expected
+    with MicroBatchRefiner(refiner, max_batch=4) as batcher:
+        futures = [batcher.submit(estimate) for estimate in estimates]
+        assert [future.result().distance for future in futures] == expected
+    with pytest.raises(RuntimeError):
+        batcher.submit(estimates[0])
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_micro_batch_refiner_fails_queued_items_when_worker_stops():
+    started = threading.Event()
+    release = threading.Event()
+
+    class DyingRefiner:
+        def refine_many(self, estimates):
+            started.set()
+            release.wait(5)
+            raise SystemExit
+
+    batcher = MicroBatchRefiner(DyingRefiner(), max_batch=1)
+    first = batcher.submit(make_estimate(1.0, 0.1))
+    assert started.wait(5)
+    queued = batcher.submit(make_estimate(2.0, 0.1))
+    release.set()
+    with pytest.raises(SystemExit):
+        first.result(timeout=5)
+    with pytest.raises(RuntimeError):
+        queued.result(timeout=5)
+    with pytest.raises(RuntimeError):
+        batcher.refine(make_estimate(3.0, 0.1))
+    batcher.close()
+
+
+def test_streaming_training_from_validation_archive(tmp_path):
+    rng = np.random.default_rng(0)
+
+    def ranger(target, method):
+        reference = float(target.rsplit(".", 1)[1])
+        values = -40.0 - 20.0 * np.log10(reference) + rng.normal(0.0, 0.5, size=8)
+        samples = [SignalSample(datetime(2024, 5, 1), "rssi", float(value), {}) for value in values]
+        return RangeEstimate(datetime(2024, 5, 1), "rssi", reference, 0.1, samples)
+
+    targets = [ValidationTarget(f"10.0.0.{metres}", "rssi", reference=float(metres)) for metres in range(1, 11)]
+    targets.append(ValidationTarget("10.0.0.20", "rssi"))  # no reference, so no label
+    database = tmp_path / "runs.duckdb"
+    conn = duckdb.connect(str(database))
+    with SampleArchiveWriter(tmp_path / "archive", "sim0") as archive:
+        ValidationRunner(conn, ranger, ValidationConfig(repetitions=3, workers=1), archive=archive).run(targets)
+    conn.close()
+
+    config = StreamConfig(
+        source=str(tmp_path / "archive"),
+        labels=str(database),
+        batch_rows=50,
+        epochs=20,
+        folds=3,
+        n_jobs=1,
+    )
+    assert sum(result["count"] for result in cross_validate(config)) == 30
+    train(config, str(tmp_path / "model.joblib"))
+    model = joblib.load(tmp_path / "model.joblib")
+    near, far = model.predict(extract_features([make_multi_sample_estimate(v) for v in ([-42.0], [-58.0])]))
+    assert near < far
+
+
+def test_hot_swap_refiner_logs_rejected_versions_once(tmp_path, caplog):
+    X = np.array([[-40.0, 2.0, -45.0, -35.0], [-50.0, 3.0, -55.0, -45.0]])
+    model = GradientBoostingRegressor(n_estimators=5).fit(X, [1.0, 2.0])
+    save_compiled(tmp_path / "range_gbm.npz", flatten_ensemble(model))
+    registry = ModelRegistry(tmp_path / "registry")
+    refiner = HotSwapRefiner(registry, poll_interval=0.01)
+    try:
+        version = registry.publish(tmp_path / "range_gbm.npz")
+        registry.path_for(version).write_bytes(b"corrupt")
+        deadline = time.monotonic() + 5
+        while refiner.rejected is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+    finally:
+        refiner.close()
+    assert refiner.rejected == version.version and refiner.version is None
+    warnings = [record for record in caplog.records if record.name == "aether.ml.registry"]
+    assert len(warnings) == 1 and warnings[0].exc_info is not None
+
+
+def test_compiled_ensemble_matches_sklearn(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = np.sin(X[:, 0]) + X[:, 1] ** 2
+    model = GradientBoostingRegressor(n_estimators=30, max_depth=4, random_state=0).fit(X, y)
+    save_compiled(tmp_path / "model.npz", flatten_ensemble(model))
+    compiled = load_compiled(tmp_path / "model.npz")
+    X_test = rng.normal(size=(50, 4))
+    assert np.allclose(compiled.predict(X_test), model.predict(X_test))
+
+    refiner = MLRangeRefiner(MLConfig(model_path=tmp_path / "model.npz"))
+    estimate = make_multi_sample_estimate([0.2, -0.4, 1.1])
+    expected = model.predict(extract_features([estimate]))[0]
+    assert abs(refiner.refine(estimate).distance - expected) < 1e-9
+
+
+def test_hot_swap_refiner_switches_versions(tmp_path):
+    X = np.array([[-40.0, 2.0, -45.0, -35.0], [-50.0, 3.0, -55.0, -45.0]])
+    registry = ModelRegistry(tmp_path / "registry")
+    for target in ([1.0, 1.0], [5.0, 5.0]):
+        model = GradientBoostingRegressor(n_estimators=5).fit(X, target)
+        save_compiled(tmp_path / "range_gbm.npz", flatten_ensemble(model))
+        registry.publish(tmp_path / "range_gbm.npz", activate=registry.current() is None)
+
+    refiner = HotSwapRefiner(registry, background=False)
+    estimate = make_multi_sample_estimate([-40.0, -42.0])
+    assert refiner.version == 1
+    assert abs(refiner.refine(estimate).distance - 1.0) < 1e-6
+
+    registry.activate(2)
+    assert refiner.poll_once()
+    assert abs(refiner.refine(estimate).distance - 5.0) < 1e-6
+    metrics = refiner.metrics()
+    assert metrics["v1"]["predictions"] == 1
+    assert metrics["v2"]["predictions"] == 1
+
+
+def test_hot_swap_refiner_refuses_tampered_model_and_skips_fallback_metrics(tmp_path):
+    registry = ModelRegistry(tmp_path / "registry")
+    refiner = HotSwapRefiner(registry, background=False)
+    refiner.refine(make_multi_sample_estimate([-40.0, -42.0]))
+    assert refiner.metrics()["none"]["predictions"] == 0
+
+    X = np.array([[-40.0, 2.0, -45.0, -35.0], [-50.0, 3.0, -55.0, -45.0]])
+    model = GradientBoostingRegressor(n_estimators=5).fit(X, [1.0, 2.0])
+    save_compiled(tmp_path / "range_gbm.npz", flatten_ensemble(model))
+    version = registry.publish(tmp_path / "range_gbm.npz")
+    with open(registry.path_for(version), "ab") as handle:
+        handle.write(b"tampered")
+    with pytest.raises(ModelIntegrityError):
+        refiner.poll_once()
+    assert refiner.version is None and refiner.rejected == version.version
+    assert not refiner.poll_once()  # not re-hashed on every poll
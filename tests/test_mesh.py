@@ -1,6 +1,16 @@
 import networkx as nx
+import numpy as np
+import pytest
 
-from aether.mesh.tracking import ConstantVelocityFilter
+from aether.core.interface import InterfaceError
+from aether.mesh.localization import LocalizerConfig, RelativeLocalizer
+from aether.mesh.planner import RangingPlanner, canonical_pair
+from aether.mesh.tracking import (
+    ConstantVelocityFilter,
+    ParticleFilterConfig,
+    ParticleFilterTracker,
+    systematic_resample,
+)
 from aether.mesh.trilateration import Anchor, build_mesh_graph, shortest_path, trilaterate
 from aether.sense.models import RangeEstimate, SignalSample
 from datetime import datetime
@@ -40,3 +50,111 @@ def test_constant_velocity_filter():
     assert state is not None
     assert state.position[0] >= 0.0
 
+
+def _grid_ranges(side: int) -> tuple[list[str], dict[tuple[str, str], float], np.ndarray]:
+    positions = np.array([(x, y) for x in range(side) for y in range(side)], dtype=float)
+    names = [f"n{i}" for i in range(len(positions))]
+    ranges = {}
+    for i in range(len(positions)):
+        for j in range(i + 1, len(positions)):
+            distance = float(np.linalg.norm(positions[i] - positions[j]))
+            if distance <= 2.0:
+                ranges[(names[i], names[j])] = distance
+    return names, ranges, positions
+
+
+def test_relative_localizer_recovers_geometry():
+    names, ranges, positions = _grid_ranges(4)
+    layout = RelativeLocalizer(LocalizerConfig(seed=0)).localize(names, ranges)
+    assert layout.converged
+    index = {name: i for i, name in enumerate(layout.devices)}
+    for (a, b), distance in ranges.items():
+        embedded = np.linalg.norm(layout.positions[index[a]] - layout.positions[index[b]])
+        assert abs(embedded - distance) < 0.05
+
+
+def test_relative_localizer_pins_anchors_and_warm_starts():
+    names, ranges, positions = _grid_ranges(4)
+    anchors = [Anchor(names[i], (positions[i][0], positions[i][1], 0.0)) for i in (0, 3, 12, 15)]
+    localizer = RelativeLocalizer(LocalizerConfig(seed=0))
+    layout = localizer.localize(names, ranges, anchors=anchors)
+    assert np.allclose(layout.positions, positions, atol=0.05)
+    again = localizer.localize(names, ranges, anchors=anchors)
+    assert again.iterations < layout.iterations
+
+
+def test_relative_localizer_normalizes_stress_when_everything_is_pinned():
+    names, ranges, positions = _grid_ranges(3)
+    # Every device pinned 10% too far apart: each edge is off by 10% of its range.
+    anchors = [Anchor(name, (1.1 * position[0], 1.1 * position[1], 0.0)) for name, position in zip(names, positions)]
+    layout = RelativeLocalizer(LocalizerConfig(seed=0)).localize(names, ranges, anchors=anchors)
+    assert layout.iterations == 0
+    assert layout.stress == pytest.approx(0.01)
+
+
+class _GridCollector:
+    def __init__(self, origin: np.ndarray, positions: dict[str, np.ndarray]) -> None:
+        self._origin = origin
+        self._positions = positions
+
+    def estimate_range(self, target: str, method: str = "auto") -> RangeEstimate:
+        return make_range(float(np.linalg.norm(self._positions[target] - self._origin)))
+
+
+def test_ranging_planner_skips_known_and_constrained_pairs():
+    planner = RangingPlanner()
+    known = {("a", "b"): 3.0, ("b", "a"): 3.0, ("a", "c"): 4.0, ("c", "b"): 1.0}
+    plan = planner.plan(["a", "b", "c", "d"], known)
+    assert plan.skipped_symmetric == 1
+    assert all(pair not in {("a", "b"), ("a", "c"), ("b", "c")} for pair in plan.pairs)
+    assert plan.full_pairwise == 6
+
+
+def test_ranging_planner_execute_only_absorbs_interface_errors():
+    class FlakyCollector:
+        def __init__(self, error: Exception) -> None:
+            self._error = error
+
+        def estimate_range(self, target: str, method: str = "auto") -> RangeEstimate:
+            raise self._error
+
+    planner = RangingPlanner()
+    ranges, failed = planner.execute([("a", "b"), ("c", "d")], {"a": FlakyCollector(InterfaceError("timeout"))})
+    assert ranges == {} and sorted(failed) == [("a", "b"), ("c", "d")]
+    with pytest.raises(KeyError):
+        planner.execute([("a", "b")], {"a": FlakyCollector(KeyError("bug"))})
+
+
+def test_ranging_planner_survey_localizes_with_fewer_measurements():
+    names, ranges, positions = _grid_ranges(5)
+    coords = dict(zip(names, positions))
+    collectors = {name: _GridCollector(coords[name], coords) for name in names}
+    candidates = [pair for pair, distance in ranges.items() if distance <= 2.0]
+    result = RangingPlanner().survey(names, collectors, candidates=candidates)
+    assert result.measured < len(candidates) < result.full_pairwise
+    assert all(canonical_pair(*pair) == pair for pair in result.ranges)
+    anchors = [Anchor(names[i], (positions[i][0], positions[i][1], 0.0)) for i in (0, 4, 20, 24)]
+    layout = RelativeLocalizer(LocalizerConfig(seed=0)).localize(names, result.ranges, anchors=anchors)
+    assert np.median(np.linalg.norm(layout.positions - positions, axis=1)) < 0.1
+
+
+def test_particle_filter_tracks_from_raw_ranges():
+    anchors = np.array([[0.0, 0.0, 0.0], [10.0, 0.0, 0.0], [0.0, 10.0, 0.0], [10.0, 10.0, 0.0]])
+    truth = np.array([[3.0, 4.0, 0.0], [7.0, 2.0, 0.0]])
+    config = ParticleFilterConfig(particles=500, dims=2, range_noise=0.3, process_noise=0.1, seed=0)
+    tracker = ParticleFilterTracker(anchors, tracks=2, config=config)
+    tracker.initialize(np.array([[5.0, 5.0], [5.0, 5.0]]), spread=3.0)
+    ranges = np.linalg.norm(truth[:, None, :] - anchors[None, :, :], axis=2)
+    ranges[0, 1] = np.nan
+    ranges[1, 2] += 8.0  # multipath spike
+    for _ in range(10):
+        estimate = tracker.step(ranges)
+    assert tracker.particles.shape == (2, 500, 2)
+    assert np.all(np.linalg.norm(estimate - truth[:, :2], axis=1) < 0.5)
+
+
+def test_systematic_resample_follows_weights():
+    weights = np.array([[0.0, 0.0, 1.0, 0.0], [1.0, 1.0, 1.0, 1.0]])
+    indices = systematic_resample(weights, np.random.default_rng(0))
+    assert indices.tolist()[0] == [2, 2, 2, 2]
+    assert sorted(indices.tolist()[1]) == [0, 1, 2, 3]
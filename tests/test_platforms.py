@@ -1,11 +1,13 @@
 """Tests for platform-specific Wi-Fi interfaces."""
 
 import platform
+import time
 
+import numpy as np
 import pytest
 
-from aether.core.interface import WiFiInterface
-from aether.core.simulated import SimulatedWiFiInterface
+from aether.core.interface import InterfaceError, WiFiInterface
+from aether.core.simulated import FleetConfig, FleetSimulation, SimulatedFleetInterface, SimulatedWiFiInterface
 
 
 def test_simulated_interface():
@@ -113,3 +115,73 @@ def test_csi_backend_wrapper():
     
     wrapped.close()
 
+
+def test_replay_interface_reproduces_archive(tmp_path):
+    """Replayed captures give identical estimates and honour the speed factor."""
+    from datetime import datetime, timedelta
+
+    from aether.sense.collectors import SignalCollector
+    from aether.sense.models import SignalSample
+    from aether.sense.storage import SampleArchiveWriter
+
+    source = SignalCollector(SimulatedWiFiInterface("simulate"))
+    recorded = {method: source.estimate_range("192.168.1.10", method=method) for method in ("rssi", "rtt", "csi")}
+    start = datetime(2024, 5, 1, 12, 0, 0)
+    with SampleArchiveWriter(tmp_path / "archive", "sim0") as writer:
+        for method, estimate in recorded.items():
+            for i, sample in enumerate(estimate.raw):
+                if method != "csi":
+                    sample.timestamp = start + timedelta(seconds=i)
+            writer.write(estimate.raw, target="192.168.1.10")
+
+    replay = WiFiInterface.open(f"replay:{tmp_path / 'archive'}?speed=max&interface=sim0")
+    assert list(replay.enumerate_devices()) == ["192.168.1.10"]
+    assert replay.info().capabilities == {"rssi": True, "rtt": True, "csi": True}
+    collector = SignalCollector(replay)
+    for method, estimate in recorded.items():
+        assert collector.estimate_range("192.168.1.10", method=method).distance == pytest.approx(estimate.distance)
+    with pytest.raises(InterfaceError):
+        replay.measure_rssi("192.168.1.10")
+
+    with SampleArchiveWriter(tmp_path / "paced", "sim0") as writer:
+        writer.write([SignalSample(start + timedelta(seconds=i), "rtt", 1e-8, {}) for i in range(3)], target="t")
+    paced = WiFiInterface.open(f"replay:{tmp_path / 'paced'}?speed=20&loop=1")
+    began = time.monotonic()
+    for _ in range(4):
+        paced.measure_rtt("t")
+    assert 0.12 <= time.monotonic() - began < 1.0
+
+
+def test_fleet_simulation_vectorized_and_seeded():
+    """Fleet interfaces are reproducible per seed and keep devices on their mobility model."""
+    first = WiFiInterface.open("simulate:fleet?devices=2000&seed=3&realtime=0&rssi_noise=0")
+    second = WiFiInterface.open("simulate:fleet?devices=2000&seed=3&realtime=0&rssi_noise=0")
+    assert isinstance(first, SimulatedFleetInterface)
+    targets = list(first.enumerate_devices())
+    assert len(targets) == 2000 and len(set(targets)) == 2000
+    assert np.array_equal(first.measure_rtt_many(targets), second.measure_rtt_many(targets))
+
+    # Noise-free RSSI inverts exactly through the log-distance model.
+    rssi = first.measure_rssi_many(targets[:10])
+    assert np.allclose(10 ** ((-40.0 - rssi) / 22.0), np.maximum(first.distances(targets[:10]), 0.1))
+    assert first.capture_csi_many(targets[:4], frames=3).shape == (4, 3, 30)
+
+    before = first.fleet.positions()
+    first.fleet.step(5.0)
+    moved = np.linalg.norm(first.fleet.positions() - before, axis=1)
+    assert moved.max() <= 1.5 * 5.0 + 1e-9 and moved.mean() > 0
+
+    corridor = FleetSimulation(FleetConfig(devices=500, mobility="corridor", realtime=False, seed=1))
+    lanes = corridor.positions()
+    corridor.step(37.0)
+    after = corridor.positions()
+    assert np.all((after[:, :2] >= 0) & (after[:, :2] <= 100.0))
+    # Exactly one coordinate (the one along the corridor) changes per device.
+    assert np.all(np.isclose(after[:, :2], lanes[:, :2]).sum(axis=1) >= 1)
+
+    node = first.node(targets[0])
+    nearby = FleetConfig(devices=200, radio_range=20.0, realtime=False)
+    local = SimulatedFleetInterface("fleet", FleetSimulation(nearby)).node("10.0.0.1")
+    assert targets[0] not in node.enumerate_devices()
+    visible = list(local.enumerate_devices())
+    assert np.all(local.distances(visible) <= 20.0)
@@ -1,9 +1,30 @@
-from datetime import datetime
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
 import duckdb
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
 
-from aether.api import Aether
-from aether.sense.storage import register_estimate, samples_to_table
+from aether.api import Aether, DeviceRecord
+from aether.sense.models import RangeEstimate, SignalSample
+from aether.sense.storage import (
+    ArchiveConfig,
+    EstimateWriter,
+    SampleArchiveWriter,
+    choose_rollup,
+    ensure_rollups,
+    ensure_schema,
+    query_range_stats,
+    register_estimate,
+    samples_to_table,
+    update_rollups,
+)
+from aether.sense.validation import ValidationConfig, ValidationRunner, ValidationTarget, validation_report
+from aether.watch import JsonlSink, ParquetSink, ScanWatcher, WatchConfig
 
 
 def test_simulated_range_outputs():
@@ -31,3 +52,239 @@ def test_register_estimate_duckdb(tmp_path):
     assert result[0] == 1
     client.close()
 
+
+def test_estimate_writer_flushes_batches(tmp_path):
+    client = Aether(interface="simulate")
+    estimate = client.range("192.168.1.10", method="rtt")
+    client.close()
+    conn = duckdb.connect(str(tmp_path / "ranges.db"))
+    conn.execute("CREATE TABLE range_estimates (timestamp TIMESTAMP, method TEXT, distance DOUBLE, variance DOUBLE)")
+    register_estimate(conn, estimate)
+
+    writer = EstimateWriter(conn, batch_size=4, background=False)
+    for i in range(6):
+        writer.write(estimate, target=f"10.0.0.{i}")
+    assert writer.pending == 2
+    writer.close()
+    rows = conn.execute("SELECT COUNT(*), COUNT(target) FROM range_estimates").fetchone()
+    assert rows == (7, 6)
+
+    with EstimateWriter(conn, batch_size=1_000, flush_interval=0.01) as background:
+        background.write_many([estimate] * 3, ["a", "b", "c"])
+    assert conn.execute("SELECT COUNT(*) FROM range_estimates WHERE target IN ('a', 'b', 'c')").fetchone()[0] == 3
+
+
+def test_estimate_writer_keeps_rows_when_a_flush_fails(tmp_path):
+    estimate = RangeEstimate(datetime(2024, 5, 1), "rtt", 3.0, 0.1, [])
+    conn = duckdb.connect(str(tmp_path / "ranges.db"))
+    writer = EstimateWriter(conn, batch_size=1_000, background=False)
+    conn.execute("ALTER TABLE range_estimates RENAME TO offline")
+    writer.write_many([estimate] * 2, ["a", "b"])
+    with pytest.raises(duckdb.CatalogException):
+        writer.flush()
+    assert writer.pending == 2
+    writer.write(estimate, target="c")
+    conn.execute("ALTER TABLE offline RENAME TO range_estimates")
+    assert writer.flush() == 3
+    writer.close()
+    assert conn.execute("SELECT list(target ORDER BY rowid) FROM range_estimates").fetchone()[0] == ["a", "b", "c"]
+
+    # The background thread reports the failure and keeps retrying.
+    background = EstimateWriter(conn, batch_size=1_000, flush_interval=0.01)
+    conn.execute("ALTER TABLE range_estimates RENAME TO offline")
+    background.write(estimate, target="d")
+    deadline = time.monotonic() + 5
+    with pytest.raises(duckdb.CatalogException):
+        while time.monotonic() < deadline:
+            background.write_many([])  # re-raises the background flush error once it happens
+            time.sleep(0.01)
+    conn.execute("ALTER TABLE offline RENAME TO range_estimates")
+    while time.monotonic() < deadline:
+        if conn.execute("SELECT count(*) FROM range_estimates WHERE target = 'd'").fetchone()[0]:
+            break
+        time.sleep(0.01)
+    try:
+        background.close()
+    except duckdb.CatalogException:
+        pass  # a retry that failed just before the rename
+    assert conn.execute("SELECT count(*) FROM range_estimates WHERE target = 'd'").fetchone()[0] == 1
+
+
+def test_sample_archive_partitions_and_rolls_over(tmp_path):
+    client = Aether(interface="simulate")
+    rssi = client.range("192.168.1.10", method="rssi").raw
+    csi = client.range("192.168.1.10", method="csi").raw
+    client.close()
+
+    config = ArchiveConfig(row_group_size=4, max_rows_per_file=8)
+    with SampleArchiveWriter(tmp_path / "archive", "sim0", config) as writer:
+        writer.write(rssi, target="192.168.1.10")
+        writer.write(csi, target="192.168.1.10")
+    assert all(pq.ParquetFile(path).metadata.num_rows <= 8 for path in writer.files_written)
+    assert len(writer.files_written) >= 2
+
+    conn = duckdb.connect()
+    rows = conn.execute(
+        f"""
+        SELECT method, interface, COUNT(*), COUNT(metadata['subcarrier'])
+        FROM read_parquet('{tmp_path / "archive" / "**" / "*.parquet"}', hive_partitioning = true)
+        GROUP BY ALL ORDER BY method
+        """
+    ).fetchall()
+    assert rows == [("csi", "sim0", len(csi), len(csi)), ("rssi", "sim0", len(rssi), 0)]
+
+
+def test_sample_archive_splits_numeric_and_text_metadata(tmp_path):
+    metadata = {"channel": 6, "rssi": -41.5, "ht": True, "bssid": "aa:bb:cc:dd:ee:ff", "band": None}
+    with SampleArchiveWriter(tmp_path / "archive", "sim0") as writer:
+        writer.write([SignalSample(datetime(2024, 5, 1), "rssi", -41.5, metadata)])
+    row = pq.read_table(writer.files_written[0]).to_pylist()[0]
+    assert dict(row["metadata"]) == {"channel": 6.0, "rssi": -41.5, "ht": 1.0}
+    assert dict(row["tags"]) == {"bssid": "aa:bb:cc:dd:ee:ff"}
+
+
+def test_rollups_match_raw_scan():
+    conn = duckdb.connect()
+    ensure_rollups(conn)
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 5, 1)
+    minutes = rng.integers(0, 180, 400)
+    conn.executemany(
+        "INSERT INTO range_estimates VALUES (?, 'rtt', ?, 0.1, ?)",
+        [
+            [start + timedelta(minutes=int(m), seconds=int(s)), float(d), f"t{m % 3}"]
+            for m, s, d in zip(minutes, rng.integers(0, 60, 400), rng.uniform(1, 10, 400))
+        ],
+    )
+    assert update_rollups(conn) == 400
+    assert update_rollups(conn) == 0
+    # Rows arriving after the last update are still reflected in queries.
+    conn.execute("INSERT INTO range_estimates VALUES (?, 'rtt', 5.0, 0.1, 't0')", [start + timedelta(minutes=30)])
+
+    end = start + timedelta(hours=3)
+    assert choose_rollup(start, end, timedelta(hours=1)) == "hour"
+    assert choose_rollup(start, end, timedelta(minutes=15)) == "minute"
+    assert choose_rollup(start + timedelta(seconds=5), end, timedelta(minutes=1)) is None
+    for resolution in (timedelta(hours=1), timedelta(minutes=15)):
+        stats = query_range_stats(conn, start, end, resolution, targets=["t0", "t1"]).to_pylist()
+        seconds = int(resolution.total_seconds())
+        expected = conn.execute(
+            f"""
+            SELECT time_bucket(INTERVAL {seconds} SECOND, timestamp), target, count(*), avg(distance), var_pop(distance)
+            FROM range_estimates WHERE target IN ('t0', 't1') GROUP BY ALL ORDER BY ALL
+            """
+        ).fetchall()
+        assert [(r["bucket"], r["target"], r["count"]) for r in stats] == [row[:3] for row in expected]
+        assert np.allclose([[r["mean"], r["variance"]] for r in stats], [row[3:] for row in expected])
+    assert query_range_stats(conn, start, end, timedelta(hours=1), targets=[]).num_rows == 0
+
+
+def test_range_stats_on_read_only_connection_without_rollups(tmp_path):
+    path = tmp_path / "aether.duckdb"
+    start = datetime(2024, 5, 1)
+    with duckdb.connect(str(path)) as conn:
+        ensure_schema(conn)
+        conn.execute("INSERT INTO range_estimates VALUES (?, 'rtt', 4.0, 0.1, 't0')", [start + timedelta(minutes=5)])
+    with duckdb.connect(str(path), read_only=True) as conn:
+        stats = query_range_stats(conn, start, start + timedelta(hours=1), timedelta(hours=1)).to_pylist()
+        assert [(r["target"], r["count"], r["mean"]) for r in stats] == [("t0", 1, 4.0)]
+        assert query_range_stats(conn, start, start + timedelta(hours=1), targets=[]).num_rows == 0
+
+
+class ScriptedClient:
+    def __init__(self, scans):
+        self._scans = iter(scans)
+
+    def scan(self, executor=None):
+        return [DeviceRecord(ip, distance, {"method": "rtt", "variance": 0.1}) for ip, distance in next(self._scans)]
+
+
+def test_scan_watcher_reports_changes_to_jsonl_and_parquet(tmp_path):
+    scans = [
+        {"10.0.0.1": 2.0, "10.0.0.2": 5.0},
+        {"10.0.0.1": 2.05, "10.0.0.2": 6.0},
+        {"10.0.0.1": 2.3},
+    ]
+    client = ScriptedClient([list(scan.items()) for scan in scans])
+    watcher = ScanWatcher(client, WatchConfig(changes_only=True, threshold=0.2))
+    stream = io.StringIO()
+    sinks = [JsonlSink(stream), ParquetSink(tmp_path / "scans", "wlan0")]
+    try:
+        for _ in scans:
+            events = watcher.scan_once()
+            for sink in sinks:
+                sink.write(events)
+    finally:
+        watcher.close()
+        for sink in sinks:
+            sink.close()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(line["ip"], line["event"]) for line in lines] == [
+        ("10.0.0.1", "new"),
+        ("10.0.0.2", "new"),
+        ("10.0.0.2", "update"),
+        ("10.0.0.1", "update"),
+        ("10.0.0.2", "lost"),
+    ]
+    assert lines[2]["distance"] == 6.0 and lines[4]["distance"] is None
+
+    (path,) = sinks[1].files_written
+    assert "interface=wlan0" in str(path)
+    table = pq.read_table(path)
+    assert table.column("event").to_pylist() == [line["event"] for line in lines]
+
+
+def test_scan_watcher_tracks_devices_without_a_distance():
+    scans = [[("10.0.0.3", None)], [("10.0.0.3", None)], [("10.0.0.3", 4.0)], []]
+    watcher = ScanWatcher(ScriptedClient(scans), WatchConfig(changes_only=True))
+    try:
+        events = [[(event.ip, event.event) for event in watcher.scan_once()] for _ in scans]
+    finally:
+        watcher.close()
+    assert events == [[("10.0.0.3", "new")], [], [("10.0.0.3", "update")], [("10.0.0.3", "lost")]]
+
+
+def test_enumerate_devices_cancels_pending_measurements_when_closed():
+    client = Aether(interface="simulate:fleet?devices=20")
+    collector = client._collector  # noqa: SLF001
+    started = []
+    estimate_range = collector.estimate_range
+
+    def slow_estimate(ip, method="auto"):
+        started.append(ip)
+        time.sleep(0.02)
+        return estimate_range(ip, method)
+
+    collector.estimate_range = slow_estimate
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        devices = collector.enumerate_devices(executor)
+        next(devices)
+        devices.close()
+    client.close()
+    assert 0 < len(started) < 10
+
+
+def test_validation_runner_reports_error_and_latency_per_method():
+    offsets = {"10.0.0.1": 0.5, "10.0.0.2": -1.0}
+
+    def ranger(target, method):
+        if target not in offsets:
+            raise TimeoutError("no reply")
+        return RangeEstimate(datetime(2024, 5, 1), method, 3.0 + offsets[target], 0.1, [])
+
+    targets = [
+        ValidationTarget("10.0.0.1", "rtt", reference=3.0, environment="home"),
+        ValidationTarget("10.0.0.2", "rtt", reference=3.0, environment="home"),
+        ValidationTarget("10.0.0.3", "rssi", environment="home"),
+    ]
+    conn = duckdb.connect()
+    run_id = ValidationRunner(conn, ranger, ValidationConfig(repetitions=4, workers=4, batch_size=3)).run(targets)
+
+    assert conn.execute("SELECT count(*) FROM validation_results WHERE run_id = ?", [run_id]).fetchone()[0] == 12
+    assert conn.execute("SELECT count(*) FROM range_estimates").fetchone()[0] == 8
+    rows = {row["method"]: row for row in validation_report(conn, run_id).to_pylist()}
+    assert rows["rtt"]["estimates"] == 8 and rows["rtt"]["referenced"] == 8
+    assert abs(rows["rtt"]["mae"] - 0.75) < 1e-9 and abs(rows["rtt"]["bias"] + 0.25) < 1e-9
+    assert rows["rssi (failed)"]["estimates"] == 4 and rows["rssi (failed)"]["mae"] is None
+    assert rows["rtt"]["latency_p99_ms"] >= rows["rtt"]["latency_p50_ms"] >= 0
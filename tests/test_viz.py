@@ -1,8 +1,29 @@
+import gzip
+import json
+import tracemalloc
 from pathlib import Path
 
+import numpy as np
+import plotly.graph_objects as go
+
+from aether.mesh.trilateration import Anchor
 from aether.sense.models import DeviceEstimate, RangeEstimate, SignalSample
-from aether.viz.export import export_geojson
-from aether.viz.plots import range_bar_chart
+from aether.viz.export import (
+    GeoJSONWriter,
+    PositionedDevice,
+    export_geojson,
+    stream_geojson,
+    trilaterated_positions,
+)
+from aether.viz.downsample import lttb, lttb_indices
+from aether.viz.plots import (
+    LiveFigure,
+    history_trace,
+    position_map,
+    position_trace,
+    range_bar_chart,
+    range_history_chart,
+)
 from datetime import datetime
 
 
@@ -23,3 +44,101 @@ def test_export_geojson(tmp_path: Path):
     export_geojson(tmp_path / "devices.geojson", [make_device("192.168.1.10", 3.0)])
     assert (tmp_path / "devices.geojson").exists()
 
+
+def test_stream_geojson_formats_and_positions(tmp_path: Path):
+    now = datetime.utcnow()
+    anchors = [
+        Anchor("a", (0.0, 0.0, 0.0)),
+        Anchor("b", (10.0, 0.0, 0.0)),
+        Anchor("c", (0.0, 10.0, 0.0)),
+        Anchor("d", (0.0, 0.0, 5.0)),
+    ]
+    point = np.array([3.0, 4.0, 1.0])
+    ranges = {
+        anchor.device_id: RangeEstimate(now, "rtt", float(np.linalg.norm(point - anchor.position)), 0.1, [])
+        for anchor in anchors
+    }
+    observations = [("dev-1", ranges), ("dev-2", {"a": ranges["a"]})]
+    count = stream_geojson(tmp_path / "mesh.geojson", trilaterated_positions(anchors, observations))
+    assert count == 1
+    collection = json.loads((tmp_path / "mesh.geojson").read_text())
+    assert collection["type"] == "FeatureCollection"
+    assert np.allclose(collection["features"][0]["geometry"]["coordinates"], point)
+
+    rows = 2_000
+    with GeoJSONWriter(tmp_path / "tracks.geojsonl.gz", format="geojsonseq", origin=(-0.1276, 51.5072)) as writer:
+        writer.write_array([f"t{i}" for i in range(rows)], np.zeros((rows, 2)), {"speed": np.arange(rows) * 0.5})
+    with gzip.open(tmp_path / "tracks.geojsonl.gz", "rt") as handle:
+        records = handle.read().split("\x1e")[1:]
+    assert len(records) == rows
+    last = json.loads(records[-1])
+    assert last["geometry"]["coordinates"] == [-0.1276, 51.5072]
+    assert last["properties"]["speed"] == (rows - 1) * 0.5
+
+    count = export_geojson(
+        tmp_path / "devices.ndjson",
+        [make_device("192.168.1.10", 3.0), make_device("192.168.1.11", 4.0)],
+        positions={"192.168.1.10": (1.0, 2.0)},
+        format="ndjson",
+    )
+    lines = [json.loads(line) for line in (tmp_path / "devices.ndjson").read_text().splitlines()]
+    assert count == 2 and lines[0]["geometry"]["coordinates"] == [1.0, 2.0]
+    assert lines[1]["geometry"] is None and lines[1]["properties"]["distance"] == 4.0
+
+
+def test_geojson_writer_memory_is_constant(tmp_path: Path):
+    def devices(count: int):
+        for index in range(count):
+            yield PositionedDevice(f"dev-{index}", (index * 0.01, index * 0.02), {"index": index})
+
+    tracemalloc.start()
+    try:
+        stream_geojson(tmp_path / "many.geojson.gz", devices(20_000))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 2_000_000
+    with gzip.open(tmp_path / "many.geojson.gz", "rt") as handle:
+        assert len(json.load(handle)["features"]) == 20_000
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(10_000, dtype=float)
+    y = np.zeros_like(x)
+    y[4321] = 25.0
+    indices = lttb_indices(x, y, 100)
+    assert indices.size == 100 and indices[0] == 0 and indices[-1] == x.size - 1
+    assert np.all(np.diff(indices) > 0) and 4321 in indices
+    times = np.datetime64("2024-05-01T00:00") + np.arange(50) * np.timedelta64(1, "s")
+    kept, _ = lttb(times, np.ones(50), 10)
+    assert kept.dtype == times.dtype and kept.size == 10
+    assert lttb_indices(x[:5], y[:5], 100).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_large_figures_use_webgl_and_patch_changes():
+    rng = np.random.default_rng(0)
+    ids = [f"dev-{index}" for index in range(10_000)]
+    positions = rng.uniform(0.0, 50.0, size=(10_000, 2))
+    fig = position_map(ids, positions, color=rng.uniform(size=10_000))
+    assert len(fig.data) == 1 and isinstance(fig.data[0], go.Scattergl)
+
+    times = np.datetime64("2024-05-01") + np.arange(100_000) * np.timedelta64(100, "ms")
+    history = range_history_chart({"dev-0": (times, rng.normal(3.0, 0.2, size=100_000))}, max_points=500)
+    assert len(history.data[0].x) == 500
+
+    live = LiveFigure()
+    assert live.update({"devices": position_trace(ids, positions)}) == ["devices"]
+    assert live.update({"devices": position_trace(ids, positions)}) == []
+    moved = positions.copy()
+    moved[7] += 1.0
+    changes = {"devices": position_trace(ids, moved), "dev-0": history_trace("dev-0", times[:10], np.ones(10))}
+    assert live.update(changes) == ["devices", "dev-0"]
+    assert live.figure.data[0].x[7] == moved[7, 0]
+    live.remove(["dev-0"])
+    assert [trace.name for trace in live.figure.data] == ["devices"]
+
+    adopted = LiveFigure(history)
+    trace = history_trace("dev-0", times[:10], np.ones(10))
+    assert adopted.update({"dev-0": trace}) == ["dev-0"]
+    assert adopted.update({"dev-0": trace}) == []
+    assert len(history.data) == 1 and len(history.data[0].x) == 10